@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+导入耗时基准：在全新的解释器中用 python -X importtime 导入各模块，统计累计导入耗时
+
+每个模块重复测量多次取中位数，并列出自身耗时最高的依赖，便于定位拖慢启动的导入。
+指定--budget-ms时，任一模块超出预算即以非零状态退出，可直接用于CI。
+
+用法：
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 40 --output import_time.json
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# CLI和查询工具的入口模块
+DEFAULT_MODULES = [
+    "map",
+    "map.__main__",
+    "map.fsm.batch_planner",
+    "map.fsm.plan_cache",
+    "map.fsm.page_fingerprint",
+    "map.fsm.view_locator",
+    "map.fsm.macro_planner",
+    "map.fsm.fsm_analysis",
+    "map.fsm.latency",
+    "map.fsm.runtime_evidence",
+    "map.fsm.ui_map_to_fsm",
+    "map.fsm.enhance_fsm_transition",
+    "map.generator.asset_bundler",
+    "map.serve",
+]
+
+def parse_importtime(stderr):
+    """
+    解析-X importtime的输出
+
+    Returns:
+        list: [(模块名, 自身耗时us, 累计耗时us)]，按导入完成顺序
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return entries
+
+def measure_module(module_name):
+    """
+    在新的解释器中导入一次模块
+
+    Returns:
+        tuple: (累计导入耗时us, importtime条目)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=PROJECT_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    entries = parse_importtime(result.stderr)
+    total = next(cumulative for name, _, cumulative in reversed(entries) if name == module_name)
+    return total, entries
+
+def benchmark(modules, repeat=5, top=5):
+    """
+    测量每个模块的导入耗时
+
+    Args:
+        modules (list): 模块名列表
+        repeat (int): 每个模块的测量次数
+        top (int): 记录自身耗时最高的依赖个数
+
+    Returns:
+        list: 每个模块的结果字典（耗时单位ms）
+    """
+    results = []
+    for module_name in modules:
+        totals = []
+        self_times = {}
+        for _ in range(repeat):
+            total, entries = measure_module(module_name)
+            totals.append(total)
+            for name, self_us, _ in entries:
+                self_times.setdefault(name, []).append(self_us)
+        slowest = sorted(
+            ((name, statistics.median(times)) for name, times in self_times.items()),
+            key=lambda item: -item[1],
+        )[:top]
+        results.append({
+            'module': module_name,
+            'median_ms': round(statistics.median(totals) / 1000, 2),
+            'min_ms': round(min(totals) / 1000, 2),
+            'slowest': [{'module': name, 'self_ms': round(self_us / 1000, 2)} for name, self_us in slowest],
+        })
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='测量map包各入口模块的导入耗时（python -X importtime）')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='要测量的模块，默认为CLI和查询工具的入口模块')
+    parser.add_argument('--repeat', type=int, default=5, help='每个模块的测量次数，取中位数')
+    parser.add_argument('--top', type=int, default=5, help='列出自身耗时最高的依赖个数')
+    parser.add_argument('--budget-ms', type=float, default=None, help='导入耗时预算（ms），超出时以状态1退出')
+    parser.add_argument('--output', '-o', default=None, help='将结果写入JSON文件，便于跟踪变化')
+    args = parser.parse_args()
+
+    results = benchmark(args.modules, repeat=args.repeat, top=args.top)
+    over_budget = []
+    for result in results:
+        slowest = ', '.join(f"{item['module']} {item['self_ms']:.1f}" for item in result['slowest'])
+        print(f"{result['module']:<36} 中位数 {result['median_ms']:7.2f} ms  最小 {result['min_ms']:7.2f} ms  [{slowest}]")
+        if args.budget_ms is not None and result['median_ms'] > args.budget_ms:
+            over_budget.append(result['module'])
+
+    if args.output:
+        sys.path.insert(0, PROJECT_DIR)
+        from map.utils.json_output import write_json
+        write_json({'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results}, args.output)
+        print(f"结果已保存到 {args.output}")
+    if over_budget:
+        print(f"超出导入耗时预算 {args.budget_ms} ms: {', '.join(over_budget)}")
+        sys.exit(1)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+内存预算回归测试：在tracemalloc下逐个运行流水线各阶段，统计峰值内存和主要分配位置
+
+阶段：discovery（查找源文件）、xml_parsing（解析布局）、extraction（页面/组件/效果提取）、
+validate（validate_and_enhance_map）、convert（UIMapToFSM.convert）、enhance（enhance_fsm_transition）。
+
+每个阶段的峰值为该阶段运行期间tracemalloc峰值减去阶段开始时已占用的内存；
+分配位置为该阶段结束时仍然存活的新增分配（按源码行汇总）。
+任一阶段超出预算时以状态1退出，可以像正确性测试一样放进CI。
+
+输入可以是真实源码目录（--src），也可以是生成的合成工程（--synthetic N，N个页面）。
+
+用法：
+    python benchmarks/memory_budget.py
+    python benchmarks/memory_budget.py --synthetic 2000 --budget extraction=48 --output memory.json
+    python benchmarks/memory_budget.py --synthetic 5000 --budgets budgets.json   # budgets.json: {"convert": 160, ...}
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from map.extractor.component_extractor import apply_visible_text, extract_components_to_pages
+from map.extractor.effect_extractor import extract_effects_to_components
+from map.extractor.map_validator import validate_and_enhance_map
+from map.extractor.page_extractor import extract_pages
+from map.fsm.enhance_fsm_transition import enhance_fsm_transition
+from map.fsm.ui_map_to_fsm import UIMapToFSM
+from map.generator.json_generator import generate_ui_map
+from map.utils.file_utils import find_kotlin_files, find_xml_files, parse_all_xml_layouts
+from map.utils.json_output import read_json, write_json
+
+STAGES = ['discovery', 'xml_parsing', 'extraction', 'validate', 'convert', 'enhance']
+
+# 默认预算（MB）：--synthetic 2000 的实测峰值约为
+# discovery 0.7 / xml_parsing 3 / extraction 16 / validate 8 / convert 34 / enhance 54，留出约1.5~2倍余量
+DEFAULT_BUDGETS_MB = {
+    'discovery': 2,
+    'xml_parsing': 8,
+    'extraction': 32,
+    'validate': 16,
+    'convert': 64,
+    'enhance': 96,
+}
+
+def write_synthetic_project(src_dir, page_count, components_per_page=8):
+    """
+    生成合成Android源码：每个页面一个Activity和一个布局，
+    按钮跳转到后续页面、返回或只修改页面状态
+
+    Args:
+        src_dir (str): 输出的src/main目录
+        page_count (int): 页面数量
+        components_per_page (int): 每个页面的按钮数量
+    """
+    code_dir = os.path.join(src_dir, 'java', 'com', 'example', 'synthetic')
+    layout_dir = os.path.join(src_dir, 'res', 'layout')
+    os.makedirs(code_dir, exist_ok=True)
+    os.makedirs(layout_dir, exist_ok=True)
+
+    for page_idx in range(page_count):
+        name = 'MainActivity' if page_idx == 0 else f'Page{page_idx}Activity'
+        listeners = []
+        views = []
+        for component_idx in range(components_per_page):
+            component_id = f'btnP{page_idx}C{component_idx}'
+            if component_idx == components_per_page - 1 and page_idx > 0:
+                body = 'finish()'
+                text = '返回'
+            elif component_idx % 3 == 2:
+                body = f'binding.{component_id}.text = "已选择"'
+                text = f'选项{page_idx}-{component_idx}'
+            else:
+                target = (page_idx * 7 + component_idx * 13 + 1) % page_count
+                target_name = 'MainActivity' if target == 0 else f'Page{target}Activity'
+                body = f'startActivity(Intent(this, {target_name}::class.java))'
+                text = f'前往页面{target}'
+            listeners.append(f'        binding.{component_id}.setOnClickListener {{\n            {body}\n        }}\n')
+            views.append(
+                f'    <Button\n'
+                f'        android:id="@+id/{component_id}"\n'
+                f'        android:layout_width="match_parent"\n'
+                f'        android:layout_height="wrap_content"\n'
+                f'        android:text="{text}" />\n'
+            )
+        with open(os.path.join(code_dir, f'{name}.kt'), 'w', encoding='utf-8') as f:
+            f.write(
+                'package com.example.synthetic\n\n'
+                f'class {name} : AppCompatActivity() {{\n'
+                '    override fun onCreate(savedInstanceState: Bundle?) {\n'
+                '        super.onCreate(savedInstanceState)\n'
+                + ''.join(listeners) +
+                '    }\n'
+                '}\n'
+            )
+        with open(os.path.join(layout_dir, f'activity_page{page_idx}.xml'), 'w', encoding='utf-8') as f:
+            f.write(
+                '<?xml version="1.0" encoding="utf-8"?>\n'
+                '<LinearLayout xmlns:android="http://schemas.android.com/apk/res/android"\n'
+                '    android:layout_width="match_parent"\n'
+                '    android:layout_height="match_parent"\n'
+                '    android:orientation="vertical">\n'
+                + ''.join(views) +
+                '</LinearLayout>\n'
+            )
+
+def stage_discovery(state):
+    state['kotlin_files'] = find_kotlin_files(state['src_dir'])
+    state['xml_files'] = find_xml_files(state['src_dir'])
+
+def stage_xml_parsing(state):
+    state['visible_texts'] = parse_all_xml_layouts(state['xml_files'])
+
+def stage_extraction(state):
+    pages = extract_pages(state['kotlin_files'])
+    pages = extract_components_to_pages(state['kotlin_files'], pages)
+    apply_visible_text(pages, state['visible_texts'])
+    state['pages'] = extract_effects_to_components(state['kotlin_files'], pages)
+
+def stage_validate(state):
+    _, state['validated_pages'], state['errors'] = validate_and_enhance_map(state['pages'])
+
+def stage_convert(state):
+    state['fsm'] = UIMapToFSM(state['ui_map_path']).convert()
+
+def stage_enhance(state):
+    enhance_fsm_transition(state['fsm_path'], state['ui_map_path'], output_path=state['enhanced_path'])
+
+STAGE_FUNCTIONS = {
+    'discovery': stage_discovery,
+    'xml_parsing': stage_xml_parsing,
+    'extraction': stage_extraction,
+    'validate': stage_validate,
+    'convert': stage_convert,
+    'enhance': stage_enhance,
+}
+
+def prepare_next_stage(stage, state):
+    """阶段之间不计入测量的准备工作：写出下一阶段读取的文件，释放不再需要的数据"""
+    if stage == 'validate':
+        generate_ui_map(state.pop('validated_pages'), state['ui_map_path'], compact=True)
+        state.pop('pages')
+    elif stage == 'convert':
+        write_json(state.pop('fsm'), state['fsm_path'], compact=True)
+
+def run_stages(state, top=5):
+    """
+    在tracemalloc下依次运行各阶段
+
+    Returns:
+        list: 每个阶段的结果字典（内存单位MB）
+    """
+    results = []
+    # 按源码行汇总只需要最内层的一帧
+    tracemalloc.start()
+    devnull = open(os.devnull, 'w')
+    try:
+        for stage in STAGES:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            baseline, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            # 各阶段自身的进度输出不混入报告
+            with contextlib.redirect_stdout(devnull):
+                STAGE_FUNCTIONS[stage](state)
+            elapsed = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+
+            snapshot_filter = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            diff = after.filter_traces(snapshot_filter).compare_to(before.filter_traces(snapshot_filter), 'lineno')
+            top_sites = [
+                {'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", 'kb': round(stat.size_diff / 1024, 1)}
+                for stat in sorted(diff, key=lambda stat: -stat.size_diff)[:top]
+                if stat.size_diff > 0
+            ]
+            results.append({
+                'stage': stage,
+                'peak_mb': round((peak - baseline) / (1 << 20), 2),
+                'retained_mb': round((current - baseline) / (1 << 20), 2),
+                'seconds': round(elapsed, 3),
+                'top_sites': top_sites,
+            })
+            del before, after, diff
+            prepare_next_stage(stage, state)
+    finally:
+        tracemalloc.stop()
+        devnull.close()
+    return results
+
+def load_budgets(budgets_path, overrides):
+    """默认预算 <- 预算文件 <- 命令行 stage=MB"""
+    budgets = dict(DEFAULT_BUDGETS_MB)
+    if budgets_path:
+        budgets.update(read_json(budgets_path))
+    for override in overrides:
+        stage, _, value = override.partition('=')
+        if stage not in STAGE_FUNCTIONS or not value:
+            raise ValueError(f"无效的预算: {override}（格式为 stage=MB，stage取值: {', '.join(STAGES)}）")
+        budgets[stage] = float(value)
+    return budgets
+
+def _relative_site(site):
+    return os.path.relpath(site, PROJECT_DIR) if site.startswith(PROJECT_DIR) else site
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='在tracemalloc下测量UI地图/FSM流水线各阶段的峰值内存并检查预算')
+    parser.add_argument('--src', default=os.path.join(PROJECT_DIR, "app", "src", "main"), help='源码目录（src/main）')
+    parser.add_argument('--synthetic', type=int, default=None, help='改用生成的合成工程，指定页面数量')
+    parser.add_argument('--components', type=int, default=8, help='合成工程中每个页面的按钮数量')
+    parser.add_argument('--budgets', default=None, help='预算文件（JSON，{stage: MB}）')
+    parser.add_argument('--budget', action='append', default=[], help='单个阶段的预算，格式 stage=MB，可重复')
+    parser.add_argument('--top', type=int, default=5, help='每个阶段列出的分配位置数量')
+    parser.add_argument('--output', '-o', default=None, help='将结果写入JSON文件，便于跟踪变化')
+    args = parser.parse_args()
+
+    try:
+        budgets = load_budgets(args.budgets, args.budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory(prefix='map_memory_') as work_dir:
+        src_dir = args.src
+        if args.synthetic:
+            src_dir = os.path.join(work_dir, 'src', 'main')
+            write_synthetic_project(src_dir, args.synthetic, args.components)
+            print(f"已生成合成工程：{args.synthetic} 个页面，每页 {args.components} 个按钮")
+        state = {
+            'src_dir': src_dir,
+            'ui_map_path': os.path.join(work_dir, 'ui_map.json'),
+            'fsm_path': os.path.join(work_dir, 'fsm_transition.json'),
+            'enhanced_path': os.path.join(work_dir, 'fsm_enhanced.json'),
+        }
+        results = run_stages(state, top=args.top)
+
+    over_budget = []
+    for result in results:
+        budget = budgets.get(result['stage'])
+        status = ''
+        if budget is not None:
+            status = f"预算 {budget:g} MB"
+            if result['peak_mb'] > budget:
+                status += " 超出!"
+                over_budget.append(result['stage'])
+        print(f"{result['stage']:<12} 峰值 {result['peak_mb']:8.2f} MB  存活 {result['retained_mb']:8.2f} MB  "
+              f"{result['seconds']:7.3f} s  {status}")
+        for site in result['top_sites']:
+            print(f"    {site['kb']:10.1f} KB  {_relative_site(site['site'])}")
+
+    if args.output:
+        write_json({'python': sys.version.split()[0], 'input': 'synthetic' if args.synthetic else args.src,
+                    'pages': args.synthetic, 'budgets': budgets, 'results': results}, args.output)
+        print(f"结果已保存到 {args.output}")
+    if over_budget:
+        print(f"超出内存预算的阶段: {', '.join(over_budget)}")
+        sys.exit(1)
@@ -1,22 +1,35 @@
 #!/usr/bin/env python3
 """
 UI Map Builder - 从Android Kotlin代码中静态生成UI地图JSON
+
+公开接口在首次访问时才导入对应模块（模块级__getattr__），
+只使用map.fsm或工具函数的脚本不会加载整个构建器。
 """
 
+import importlib
+
 __version__ = "1.0.0"
 
-from map.extractor.page_extractor import extract_pages
-from map.extractor.component_extractor import extract_components_to_pages
-from map.extractor.effect_extractor import extract_effects_to_components
-from map.extractor.map_validator import validate_and_enhance_map
-from map.generator.json_generator import generate_ui_map
-from map.utils.file_utils import find_kotlin_files
+# 公开名称 -> 所在模块
+_LAZY_EXPORTS = {
+    "extract_pages": "map.extractor.page_extractor",
+    "extract_components_to_pages": "map.extractor.component_extractor",
+    "extract_effects_to_components": "map.extractor.effect_extractor",
+    "validate_and_enhance_map": "map.extractor.map_validator",
+    "generate_ui_map": "map.generator.json_generator",
+    "find_kotlin_files": "map.utils.file_utils",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    # 缓存到模块字典，之后的访问不再经过__getattr__
+    globals()[name] = value
+    return value
 
-__all__ = [
-    "extract_pages",
-    "extract_components_to_pages",
-    "extract_effects_to_components",
-    "validate_and_enhance_map",
-    "generate_ui_map",
-    "find_kotlin_files",
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
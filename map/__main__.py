@@ -7,10 +7,11 @@ import argparse
 import os
 from map.utils.file_utils import find_kotlin_files, find_xml_files, parse_all_xml_layouts
 from map.extractor.page_extractor import extract_pages
-from map.extractor.component_extractor import extract_components_to_pages
+from map.extractor.component_extractor import extract_components_to_pages, apply_visible_text
 from map.extractor.effect_extractor import extract_effects_to_components
 from map.extractor.map_validator import validate_and_enhance_map
 from map.generator.json_generator import generate_ui_map
+from map.parser.naming_rules import configure_naming_rules
 
 def main():
     """
@@ -18,16 +19,57 @@ def main():
     """
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='UI Map Builder - 从Android Kotlin代码中静态生成UI地图JSON')
-    parser.add_argument('--dir', '-d', required=True, help='Kotlin代码目录路径')
+    parser.add_argument('--dir', '-d', default=None, help='Kotlin代码目录路径')
     parser.add_argument('--output', '-o', default='ui_map.json', help='输出JSON文件路径，默认ui_map.json')
+    parser.add_argument('--compact', action='store_true', help='输出压缩格式的JSON（无缩进和空白）')
+    parser.add_argument('--gzip', action='store_true', help='对输出的JSON进行gzip压缩')
+    parser.add_argument('--watch', action='store_true', help='监听源码变化，增量重建UI地图和FSM产物')
+    parser.add_argument('--fsm-output', default=None, help='监听模式下FSM输出路径，默认与UI地图同目录的fsm_transition.json')
+    parser.add_argument('--assets-dir', default=None, help='监听模式下同步FSM的assets目录，默认为源码目录下的assets（存在时）')
+    parser.add_argument('--debounce', type=float, default=None, help='合并连续保存的静默时间（秒），默认0.2')
+    parser.add_argument('--poll-interval', type=float, default=None, help='无inotify时的轮询间隔（秒），默认0.5')
+    parser.add_argument('--project', default=None, help='批量模式：Gradle工程根目录，处理settings.gradle(.kts)中的所有模块')
+    parser.add_argument('--per-module', action='store_true', help='批量模式下按模块分别输出，--output为输出目录')
+    parser.add_argument('--workers', type=int, default=None, help='批量模式下的解析进程数，默认CPU核数')
+    parser.add_argument('--cache-dir', default=None, help='批量模式下的解析缓存目录，默认<工程>/.map_cache')
+    parser.add_argument('--naming-rules', default=None, help='组件命名规则文件（JSON），与默认规则合并，用于确定viewType、semanticRole和intentTags')
     
     args = parser.parse_args()
     
+    if args.project:
+        if not os.path.isdir(args.project):
+            print(f"错误：目录 {args.project} 不存在")
+            return 1
+        from map.multi_module import build_project
+        success = build_project(args.project, args.output, per_module=args.per_module, cache_dir=args.cache_dir,
+                                workers=args.workers, compact=args.compact, use_gzip=args.gzip,
+                                naming_rules=args.naming_rules)
+        return 0 if success else 1
+    if not args.dir:
+        parser.error("需要指定--dir或--project")
+    
     # 验证目录是否存在
     if not os.path.exists(args.dir):
         print(f"错误：目录 {args.dir} 不存在")
         return 1
     
+    if args.naming_rules:
+        configure_naming_rules(args.naming_rules)
+    
+    if args.watch:
+        # 监听模式依赖FSM、生成器等完整工具链，只在--watch时导入
+        from map.watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, IncrementalBuilder, watch
+        fsm_output = args.fsm_output or os.path.join(os.path.dirname(os.path.abspath(args.output)), 'fsm_transition.json')
+        assets_dir = args.assets_dir
+        if assets_dir is None and os.path.isdir(os.path.join(args.dir, 'assets')):
+            assets_dir = os.path.join(args.dir, 'assets')
+        builder = IncrementalBuilder(args.dir, args.output, fsm_output, assets_dir=assets_dir,
+                                     compact=args.compact, use_gzip=args.gzip)
+        debounce = DEFAULT_DEBOUNCE if args.debounce is None else args.debounce
+        poll_interval = DEFAULT_POLL_INTERVAL if args.poll_interval is None else args.poll_interval
+        watch(builder, debounce=debounce, poll_interval=poll_interval)
+        return 0
+    
     # 1. 查找所有Kotlin文件
     print(f"正在查找 {args.dir} 目录下的Kotlin文件...")
     kotlin_files = find_kotlin_files(args.dir)
@@ -54,18 +96,7 @@ def main():
     
     # 6. 为组件添加visibleText字段
     print("正在为组件添加visibleText字段...")
-    total_components = 0
-    components_with_visible_text = 0
-    
-    for page in pages:
-        for component in page['components']:
-            total_components += 1
-            component_id = component['componentId']
-            # 检查组件是否有对应的visibleText
-            if component_id in component_visible_text_map:
-                component['visibleText'] = component_visible_text_map[component_id]
-                components_with_visible_text += 1
-    
+    total_components, components_with_visible_text = apply_visible_text(pages, component_visible_text_map)
     print(f"已为 {components_with_visible_text}/{total_components} 个组件添加visibleText字段")
     
     # 7. 提取效果信息并添加到组件中
@@ -91,7 +122,7 @@ def main():
     
     # 9. 生成UI地图JSON文件
     print(f"正在生成UI地图JSON文件 {args.output}...")
-    generate_ui_map(validated_pages, args.output)
+    generate_ui_map(validated_pages, args.output, compact=args.compact, use_gzip=args.gzip)
     
     print("UI地图生成完成！")
     print(f"输出文件：{args.output}")
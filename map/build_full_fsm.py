@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 """
 整合脚本，用于执行完整的FSM构建流程：
-1. 生成UI地图（ui_map.json）
-2. 生成FSM转换图（fsm_transition.json）
-3. 增强FSM转换图（添加action_metadata和visible_text_index）
+1. 生成UI地图（ui_map.json，批量处理settings.gradle.kts中的所有模块，存在naming_rules.json时使用其中的组件命名规则）
+2. 生成并增强FSM转换图（fsm_transition.json，在内存中转换后添加action_metadata和visible_text_index，只写一次）
+3. 生成页面指纹索引（app/src/main/assets/page_fingerprints.json），设备端通过少量findViewById探测识别当前页面
+4. 生成View定位表（app/src/main/assets/view_locators.json），执行器每一步直接按资源ID查找View
+5. 为高频目标预计算规划结果（app/src/main/assets/plan_cache.json，存在frequent_goals.txt时执行）
+6. 生成按页面分片的FSM资源（app/src/main/assets/fsm/），供设备端按需加载
 """
 
 import os
@@ -12,9 +15,14 @@ import subprocess
 
 # 定义硬编码参数
 PROJECT_DIR = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest"
-ANDROID_SRC_DIR = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/app/src/main"
 UI_MAP_OUTPUT = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/ui_map.json"
 FSM_TRANSITION_OUTPUT = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/fsm_transition.json"
+FREQUENT_GOALS = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/frequent_goals.txt"
+PLAN_CACHE_OUTPUT = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/app/src/main/assets/plan_cache.json"
+FSM_BUNDLE_OUTPUT = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/app/src/main/assets/fsm"
+PAGE_FINGERPRINTS_OUTPUT = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/app/src/main/assets/page_fingerprints.json"
+VIEW_LOCATORS_OUTPUT = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/app/src/main/assets/view_locators.json"
+NAMING_RULES = "c:/Users/13210/AndroidStudioProjects/GuideSystemTest/naming_rules.json"
 
 def run_command(command, cwd=None):
     """运行命令并返回结果"""
@@ -46,37 +54,91 @@ def main():
     map_command = [
         sys.executable,
         "-m", "map",
-        "--dir", ANDROID_SRC_DIR,
+        "--project", PROJECT_DIR,
         "--output", UI_MAP_OUTPUT
     ]
+    # 应用自定义的组件命名规则（存在naming_rules.json时）
+    if os.path.exists(NAMING_RULES):
+        map_command += ["--naming-rules", NAMING_RULES]
     if not run_command(map_command, cwd=PROJECT_DIR):
         print("步骤1执行失败，终止流程")
         return 1
     
-    # 步骤2: 生成FSM转换图（fsm_transition.json）
-    print("\n=== 步骤2: 生成FSM转换图 ===")
-    fsm_convert_command = [
+    # 步骤2: 生成并增强FSM转换图（在内存中转换，只写一次，内容未变化时fsm_transition.json保持不变）
+    print("\n=== 步骤2: 生成并增强FSM转换图 ===")
+    enhance_command = [
         sys.executable,
-        "-m", "map.fsm.ui_map_to_fsm"
+        "-m", "map.fsm.enhance_fsm_transition",
+        "--convert",
+        "--fsm", FSM_TRANSITION_OUTPUT,
+        "--ui-map", UI_MAP_OUTPUT
     ]
-    if not run_command(fsm_convert_command, cwd=PROJECT_DIR):
+    if not run_command(enhance_command, cwd=PROJECT_DIR):
         print("步骤2执行失败，终止流程")
         return 1
     
-    # 步骤3: 增强FSM转换图
-    print("\n=== 步骤3: 增强FSM转换图 ===")
-    enhance_command = [
+    # 步骤3: 生成页面指纹索引（以FSM内容哈希作为失效依据）
+    print("\n=== 步骤3: 生成页面指纹索引 ===")
+    fingerprint_command = [
         sys.executable,
-        "-m", "map.fsm.enhance_fsm_transition"
+        "-m", "map.fsm.page_fingerprint",
+        "--fsm", FSM_TRANSITION_OUTPUT,
+        "--ui-map", UI_MAP_OUTPUT,
+        "--output", PAGE_FINGERPRINTS_OUTPUT
     ]
-    if not run_command(enhance_command, cwd=PROJECT_DIR):
+    if not run_command(fingerprint_command, cwd=PROJECT_DIR):
         print("步骤3执行失败，终止流程")
         return 1
     
+    # 步骤4: 生成View定位表（所有模块的布局和页面代码）
+    print("\n=== 步骤4: 生成View定位表 ===")
+    locator_command = [
+        sys.executable,
+        "-m", "map.fsm.view_locator",
+        "--fsm", FSM_TRANSITION_OUTPUT,
+        "--ui-map", UI_MAP_OUTPUT,
+        "--project", PROJECT_DIR,
+        "--output", VIEW_LOCATORS_OUTPUT
+    ]
+    if not run_command(locator_command, cwd=PROJECT_DIR):
+        print("步骤4执行失败，终止流程")
+        return 1
+    
+    # 步骤5: 预计算高频目标的规划结果（以FSM内容哈希作为缓存失效依据）
+    if os.path.exists(FREQUENT_GOALS):
+        print("\n=== 步骤5: 预计算高频目标规划 ===")
+        plan_cache_command = [
+            sys.executable,
+            "-m", "map.fsm.plan_cache",
+            "--fsm", FSM_TRANSITION_OUTPUT,
+            "--goals", FREQUENT_GOALS,
+            "--output", PLAN_CACHE_OUTPUT
+        ]
+        if not run_command(plan_cache_command, cwd=PROJECT_DIR):
+            print("步骤5执行失败，终止流程")
+            return 1
+    
+    # 步骤6: 生成分片资源（全局索引 + 每个页面一个分片）
+    print("\n=== 步骤6: 生成FSM分片资源 ===")
+    bundle_command = [
+        sys.executable,
+        "-m", "map.generator.asset_bundler",
+        "--fsm", FSM_TRANSITION_OUTPUT,
+        "--output", FSM_BUNDLE_OUTPUT
+    ]
+    if not run_command(bundle_command, cwd=PROJECT_DIR):
+        print("步骤6执行失败，终止流程")
+        return 1
+    
     print("\n=== 完整的FSM构建流程执行完成 ===")
     print(f"生成的文件:")
     print(f"- UI地图: {UI_MAP_OUTPUT}")
     print(f"- FSM转换图: {FSM_TRANSITION_OUTPUT}")
+    print(f"- 页面指纹索引: {PAGE_FINGERPRINTS_OUTPUT}")
+    print(f"- View定位表: {VIEW_LOCATORS_OUTPUT}")
+    if os.path.exists(FREQUENT_GOALS):
+        print(f"- 高频目标规划缓存: {PLAN_CACHE_OUTPUT}")
+    print(f"- FSM分片资源: {FSM_BUNDLE_OUTPUT}")
     return 0
 
 if __name__ == "__main__":
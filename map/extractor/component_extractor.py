@@ -4,7 +4,7 @@
 """
 
 from map.utils.file_utils import read_file, get_file_name
-from map.parser.activity_parser import parse_activity_class
+from map.parser.activity_parser import parse_page_classes
 from map.parser.component_parser import parse_components
 
 def extract_components_to_pages(kotlin_files, pages):
@@ -25,14 +25,38 @@ def extract_components_to_pages(kotlin_files, pages):
         content = read_file(file_path)
         file_name = get_file_name(file_path)
         
-        # 解析Activity类信息
-        activity_info = parse_activity_class(content, file_name)
-        if activity_info:
+        # 解析文件中的页面类，每个页面只解析自己类体中的代码
+        for activity_info, source in parse_page_classes(content, file_name):
             page_id = activity_info['pageId']
             
             # 如果页面存在，提取组件并添加到页面中
             if page_id in page_map:
-                components = parse_components(content)
+                components = parse_components(source)
                 page_map[page_id]['components'] = components
     
     return pages
+
+def apply_visible_text(pages, component_visible_text_map):
+    """
+    为页面中的组件添加visibleText字段
+
+    Args:
+        pages (list): 页面列表
+        component_visible_text_map (dict): 组件ID到visibleText的映射
+
+    Returns:
+        tuple: (组件总数, 添加了visibleText的组件数)
+    """
+    total_components = 0
+    components_with_visible_text = 0
+
+    for page in pages:
+        for component in page['components']:
+            total_components += 1
+            component_id = component['componentId']
+            # 检查组件是否有对应的visibleText
+            if component_id in component_visible_text_map:
+                component['visibleText'] = component_visible_text_map[component_id]
+                components_with_visible_text += 1
+
+    return total_components, components_with_visible_text
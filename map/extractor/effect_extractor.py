@@ -4,7 +4,7 @@
 """
 
 from map.utils.file_utils import read_file, get_file_name
-from map.parser.activity_parser import parse_activity_class
+from map.parser.activity_parser import parse_page_classes
 from map.parser.effect_parser import parse_effects
 
 def extract_effects_to_components(kotlin_files, pages):
@@ -25,15 +25,14 @@ def extract_effects_to_components(kotlin_files, pages):
         content = read_file(file_path)
         file_name = get_file_name(file_path)
         
-        # 解析Activity类信息
-        activity_info = parse_activity_class(content, file_name)
-        if activity_info:
+        # 解析文件中的页面类，每个页面只解析自己类体中的代码
+        for activity_info, source in parse_page_classes(content, file_name):
             page_id = activity_info['pageId']
             
             # 如果页面存在，提取效果并添加到组件中
             if page_id in page_map:
                 page = page_map[page_id]
-                effects = parse_effects(content)
+                effects = parse_effects(source)
                 
                 # 为每个组件添加效果
                 for component in page['components']:
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+单文件提取器，用于解析单个Kotlin文件中的页面、组件和效果
+
+监听模式和多模块批量构建按文件缓存解析结果，两者共用这里的解析入口。
+"""
+
+from map.extractor.component_extractor import extract_components_to_pages
+from map.extractor.effect_extractor import extract_effects_to_components
+from map.extractor.page_extractor import extract_pages
+
+def parse_kotlin_file(file_path):
+    """
+    解析单个Kotlin文件，返回其中的页面（含组件和效果）
+
+    Args:
+        file_path (str): Kotlin文件路径
+
+    Returns:
+        list: 页面列表，不含页面类的文件返回空列表
+    """
+    pages = extract_pages([file_path])
+    if not pages:
+        return []
+    pages = extract_components_to_pages([file_path], pages)
+    return extract_effects_to_components([file_path], pages)
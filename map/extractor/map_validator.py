@@ -3,6 +3,46 @@
 地图验证器，用于验证和增强UI地图，确保符合静态图要求
 """
 
+from map.parser.naming_rules import get_naming_rules
+
+def build_page_graphs(pages):
+    """
+    根据NAVIGATION效果的targetPageId建立页面导航图
+    
+    Args:
+        pages (iterable): 页面列表或页面生成器（只遍历一次）
+        
+    Returns:
+        tuple: (page_in_degree, page_navigation_graph, page_back_graph)
+            page_in_degree: pageId → 入度
+            page_navigation_graph: pageId → 可跳转到的pageId列表（正向边）
+            page_back_graph: pageId → 可跳转到该页面的pageId列表（反向边）
+    """
+    # 单次遍历页面（pages可以是生成器），先收集边，最后再过滤不存在的目标页面
+    page_ids = []
+    edges = []
+    for page in pages:
+        page_id = page['pageId']
+        page_ids.append(page_id)
+        for component in page['components']:
+            for trigger in component['triggers']:
+                effect = trigger['effect']
+                if effect and effect['effectType'] == 'NAVIGATION':
+                    if 'targetPageId' in effect:
+                        edges.append((page_id, effect['targetPageId']))
+    
+    page_in_degree = {page_id: 0 for page_id in page_ids}
+    page_navigation_graph = {page_id: [] for page_id in page_ids}
+    page_back_graph = {page_id: [] for page_id in page_ids}
+    
+    for page_id, target_page_id in edges:
+        if target_page_id in page_in_degree:
+            page_in_degree[target_page_id] += 1
+            page_navigation_graph[page_id].append(target_page_id)
+            page_back_graph[target_page_id].append(page_id)
+    
+    return page_in_degree, page_navigation_graph, page_back_graph
+
 def validate_and_enhance_map(pages):
     """
     验证并增强UI地图，确保符合静态图要求
@@ -43,29 +83,8 @@ def validate_and_enhance_map(pages):
     # 获取合并后的页面列表
     merged_pages = list(page_map.values())
     
-    # 第二步：收集所有pageId，用于验证页面存在性
-    page_ids = [page['pageId'] for page in merged_pages]
-    
-    # 第三步：分析页面入度，确定entryPoint
-    page_in_degree = {page_id: 0 for page_id in page_ids}
-    
-    # 第四步：分析页面跳转关系，建立页面导航图
-    page_navigation_graph = {page_id: [] for page_id in page_ids}
-    page_back_graph = {page_id: [] for page_id in page_ids}
-    
-    # 计算页面入度和导航图
-    for page in merged_pages:
-        page_id = page['pageId']
-        for component in page['components']:
-            for trigger in component['triggers']:
-                effect = trigger['effect']
-                if effect and effect['effectType'] == 'NAVIGATION':
-                    if 'targetPageId' in effect:
-                        target_page_id = effect['targetPageId']
-                        if target_page_id in page_ids:
-                            page_in_degree[target_page_id] += 1
-                            page_navigation_graph[page_id].append(target_page_id)
-                            page_back_graph[target_page_id].append(page_id)
+    # 第二步至第四步：收集所有pageId，分析页面入度和跳转关系，建立页面导航图
+    page_in_degree, page_navigation_graph, page_back_graph = build_page_graphs(merged_pages)
     
     # 确定entryPoint：入度为0且是MainActivity或页面列表中的第一个页面
     entry_point = None
@@ -77,6 +96,7 @@ def validate_and_enhance_map(pages):
     
     # 第五步：为每个合并后的页面增强和修复
     validated_pages = []
+    naming_rules = get_naming_rules()
     for page in merged_pages:
         validated_page = page.copy()
         page_id = validated_page['pageId']
@@ -92,7 +112,9 @@ def validate_and_enhance_map(pages):
         validated_components = []
         for component in validated_page['components']:
             validated_component = component.copy()
-            is_back_component = 'back' in validated_component['componentId'].lower() or validated_component['semanticRole'] == 'NAVIGATE'
+            # componentId中的关键词组（与组件解析器共用命名规则表和缓存）
+            naming_groups = naming_rules.classify(validated_component['componentId']).groups
+            is_back_component = 'back' in naming_groups or validated_component['semanticRole'] == 'NAVIGATE'
             
             # 5.3.1 增强和修复每个trigger和effect
             for trigger in validated_component['triggers']:
@@ -211,7 +233,7 @@ def validate_and_enhance_map(pages):
                 elif effect['effectType'] == 'UI_INTERACTION':
                     if 'interactionRole' not in effect or effect['interactionRole'] == 'CONFIRM':
                         if validated_component['semanticRole'] == 'ACTION':
-                            if 'submit' in validated_component['componentId'].lower() or 'login' in validated_component['componentId'].lower() or 'register' in validated_component['componentId'].lower():
+                            if 'submit' in naming_groups or 'account' in naming_groups:
                                 effect['interactionRole'] = 'SUBMIT'
                             else:
                                 effect['interactionRole'] = 'ACTIVATE'
@@ -267,9 +289,8 @@ def validate_and_enhance_map(pages):
                         validated_component['semanticRole'] = 'ACTION'
             
             # 5.3.3 规范修正：Radio 组件 viewType 规范增强
-            component_id = validated_component['componentId'].lower()
-            if 'radio' in component_id:
-                if 'group' in component_id or validated_component['viewType'] == 'RADIO_BUTTON' and 'group' in component_id:
+            if 'radio' in naming_groups:
+                if 'group' in naming_groups:
                     validated_component['viewType'] = 'RADIO_GROUP'
                     if validated_component['semanticRole'] not in ['INPUT', 'SELECTION']:
                         validated_component['semanticRole'] = 'INPUT'
@@ -282,7 +303,7 @@ def validate_and_enhance_map(pages):
             canonical_intent = None
             
             # 直接基于组件属性生成canonicalIntent
-            if 'back' in validated_component['componentId'].lower() or validated_component['semanticRole'] == 'NAVIGATE':
+            if 'back' in naming_groups or validated_component['semanticRole'] == 'NAVIGATE':
                 canonical_intent = 'back'
             elif 'filter' in validated_component['semanticRole'].lower():
                 canonical_intent = 'filter'
@@ -327,7 +348,7 @@ def validate_and_enhance_map(pages):
                 # 自动修复
                 for trigger in validated_component['triggers']:
                     if validated_component['semanticRole'] == 'ACTION':
-                        interaction_role = 'SUBMIT' if 'submit' in validated_component['componentId'].lower() else 'ACTIVATE'
+                        interaction_role = 'SUBMIT' if 'submit' in naming_groups else 'ACTIVATE'
                     elif validated_component['semanticRole'] == 'FILTER':
                         interaction_role = 'SELECT'
                     elif validated_component['semanticRole'] == 'TOGGLE':
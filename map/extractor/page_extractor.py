@@ -4,7 +4,7 @@
 """
 
 from map.utils.file_utils import read_file, get_file_name
-from map.parser.activity_parser import parse_activity_class
+from map.parser.activity_parser import parse_page_classes
 
 def extract_pages(kotlin_files):
     """
@@ -22,8 +22,8 @@ def extract_pages(kotlin_files):
         content = read_file(file_path)
         file_name = get_file_name(file_path)
         
-        activity_info = parse_activity_class(content, file_name)
-        if activity_info:
+        # 一个文件中可以有多个页面类（如Activity和其中嵌套的Fragment）
+        for activity_info, _ in parse_page_classes(content, file_name):
             pages.append({
                 'pageId': activity_info['pageId'],
                 'pageRole': activity_info['pageRole'],
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Batch offline planner
+
+A Python port of the Kotlin Planner.plan (BFS strategy) over the
+fsm_transition.json structures produced by map.fsm, for replaying whole
+goal corpora against a map build.
+
+Planner.enhancedBfs expands (page, action) pairs in a fixed FIFO order that
+does not depend on the goal; the goal only decides where the search stops.
+So one full traversal per start page, recording the first time each page is
+dequeued, answers every goal from that start page: the plan is the path to
+the earliest-dequeued page that holds a target action. Cases are grouped by
+start page and the groups are spread across a process pool.
+
+With weighted=True (FSM carrying transition_weights, see map.fsm.latency)
+the planner instead runs Dijkstra from each start page and returns the plan
+with the lowest expected wall time; unweighted FSMs count every action as 1.
+
+Cases are JSON lines: {"startPage": ..., "targetVisibleText": ...}; any
+other fields (e.g. an "id") are copied to the result line unchanged.
+"""
+
+import heapq
+import json
+import os
+from collections import deque
+
+from map.fsm.state_space import bitmask_to_pages
+from map.fsm.text_index import calculate_similarity
+from map.utils.json_output import open_json_text, read_json
+
+REASON_NO_TARGET_ACTION = "NO_TARGET_ACTION"
+REASON_INVALID_START_PAGE = "INVALID_START_PAGE"
+REASON_NO_PATH_FOUND = "NO_PATH_FOUND"
+
+# Planner.findMostSimilarVisibleText threshold and Planner.tryReturnPath home page
+SIMILARITY_THRESHOLD = 0.7
+MAIN_PAGE_ID = "MainActivity"
+
+
+class PlannerModel:
+    """Integer-keyed view of an FSM artifact, in the iteration order Planner sees"""
+
+    def __init__(self, fsm):
+        bitmask = fsm.get('transition_encoding') == 'bitmask'
+        self.page_index = fsm['page_index']
+        self.visible_text_index = fsm.get('visible_text_index', {})
+        self.action_page = {}
+        for action_id, meta in fsm.get('action_metadata', {}).items():
+            page_idx = self.page_index.get(meta['page'])
+            if page_idx is not None:
+                self.action_page[int(action_id)] = page_idx
+        # page_idx -> [(action_id, [next page_idx, ...]), ...]
+        self.transition = {}
+        for page_idx, actions in fsm['transition'].items():
+            self.transition[int(page_idx)] = [
+                (int(action_id), bitmask_to_pages(next_pages) if bitmask else list(next_pages))
+                for action_id, next_pages in actions.items()
+            ]
+        # (page_idx, action_id) -> expected duration; empty for unweighted FSMs
+        self.weights = {
+            (int(page_idx), int(action_id)): weight
+            for page_idx, actions in fsm.get('transition_weights', {}).items()
+            for action_id, weight in actions.items()
+        }
+        self._similar_text_cache = {}
+        self._main_page_paths = None
+
+    def edge_weight(self, page_idx, action_id):
+        """Expected cost of executing action_id on page_idx (1 when the FSM is unweighted)"""
+        return self.weights.get((page_idx, action_id), 1)
+
+    def find_most_similar_text(self, text):
+        """Planner.findMostSimilarVisibleText: first key with the highest similarity above the threshold"""
+        if text not in self._similar_text_cache:
+            best_match = None
+            highest_similarity = SIMILARITY_THRESHOLD
+            for visible_text in self.visible_text_index:
+                similarity = calculate_similarity(text, visible_text)
+                if similarity > highest_similarity:
+                    highest_similarity = similarity
+                    best_match = visible_text
+            self._similar_text_cache[text] = best_match
+        return self._similar_text_cache[text]
+
+    def target_actions(self, text):
+        """Exact visible_text_index hit, else the fuzzy match; None when neither exists"""
+        target_actions = self.visible_text_index.get(text)
+        if target_actions is None:
+            similar_text = self.find_most_similar_text(text)
+            if similar_text is not None:
+                target_actions = self.visible_text_index[similar_text]
+        return target_actions
+
+    def resolve_goal(self, text):
+        """
+        Target actions and their pages, in Planner's order
+
+        Returns:
+            tuple: (target action list, target page list); the page list is empty
+            when Planner would answer NO_TARGET_ACTION
+        """
+        target_actions = self.target_actions(text) or []
+        target_pages = list(dict.fromkeys(
+            self.action_page[action_id] for action_id in target_actions if action_id in self.action_page
+        ))
+        return target_actions, target_pages
+
+    def back_action(self, page_idx):
+        """First action of the page with no known target (Planner.buildReturnPath)"""
+        return next((action_id for action_id, next_pages in self.transition.get(page_idx, ()) if not next_pages), None)
+
+    def main_page_paths(self):
+        """shortest_page_paths from MAIN_PAGE_ID, computed once; empty when there is no main page"""
+        if self._main_page_paths is None:
+            main_page_idx = self.page_index.get(MAIN_PAGE_ID)
+            self._main_page_paths = {} if main_page_idx is None else shortest_page_paths(self, main_page_idx)
+        return self._main_page_paths
+
+
+class Traversal:
+    """
+    Full Planner.enhancedBfs expansion from one page
+
+    first_node maps each reachable page to the node of its first dequeue;
+    rank is that dequeue's position, so "first target page the BFS pops"
+    becomes a min over ranks.
+    """
+
+    def __init__(self, model, start_page_idx):
+        self.model = model
+        self.start_page_idx = start_page_idx
+        self.node_page = [start_page_idx]
+        self.node_parent = [-1]
+        self.node_action = [-1]
+        self.first_node = {}
+        self.rank = {}
+
+        queue = deque([0])
+        visited = set()
+        while queue:
+            node = queue.popleft()
+            page_idx = self.node_page[node]
+            if page_idx not in self.first_node:
+                self.rank[page_idx] = len(self.first_node)
+                self.first_node[page_idx] = node
+            for action_id, next_pages in model.transition.get(page_idx, ()):
+                if (page_idx, action_id) in visited:
+                    continue
+                visited.add((page_idx, action_id))
+                # Empty targets (BACK) keep the search on the current page, as in Planner
+                for next_page_idx in next_pages or (page_idx,):
+                    self.node_page.append(next_page_idx)
+                    self.node_parent.append(node)
+                    self.node_action.append(action_id)
+                    queue.append(len(self.node_page) - 1)
+
+    def path_to(self, page_idx):
+        """Action path of the first dequeue of page_idx"""
+        path = []
+        node = self.first_node[page_idx]
+        while self.node_parent[node] != -1:
+            path.append(self.node_action[node])
+            node = self.node_parent[node]
+        path.reverse()
+        return path
+
+    def first_hit(self, candidate_pages, accept):
+        """
+        Earliest-dequeued candidate page and its first accepted action
+
+        Returns:
+            list: action path ending with the accepted action, or None
+        """
+        reachable = [page_idx for page_idx in candidate_pages if page_idx in self.rank]
+        for page_idx in sorted(reachable, key=self.rank.__getitem__):
+            for action_id, _ in self.model.transition.get(page_idx, ()):
+                if accept(action_id, page_idx):
+                    return self.path_to(page_idx) + [action_id]
+        return None
+
+
+def shortest_page_paths(model, start_page_idx):
+    """
+    Planner.findPathFromPage for every target at once
+
+    findPathFromPage returns on the first scanned action that lists the target,
+    which is exactly the edge that first discovers it in a page-visited BFS.
+
+    Returns:
+        dict: page_idx -> action path from start_page_idx
+    """
+    paths = {start_page_idx: []}
+    queue = deque([start_page_idx])
+    while queue:
+        page_idx = queue.popleft()
+        for action_id, next_pages in model.transition.get(page_idx, ()):
+            for next_page_idx in next_pages:
+                if next_page_idx not in paths:
+                    paths[next_page_idx] = paths[page_idx] + [action_id]
+                    queue.append(next_page_idx)
+    return paths
+
+
+def weighted_page_paths(model, start_page_idx):
+    """
+    Dijkstra over transition weights
+
+    Returns:
+        dict: page_idx -> (cost, action path from start_page_idx)
+    """
+    settled = {}
+    heap = [(0, 0, start_page_idx, -1, None)]
+    parents = {}
+    counter = 1
+    while heap:
+        cost, _, page_idx, parent, action_id = heapq.heappop(heap)
+        if page_idx in settled:
+            continue
+        settled[page_idx] = cost
+        parents[page_idx] = (parent, action_id)
+        for next_action_id, next_pages in model.transition.get(page_idx, ()):
+            next_cost = cost + model.edge_weight(page_idx, next_action_id)
+            for next_page_idx in next_pages:
+                if next_page_idx not in settled:
+                    heapq.heappush(heap, (next_cost, counter, next_page_idx, page_idx, next_action_id))
+                    counter += 1
+
+    paths = {}
+    for page_idx in settled:
+        path = []
+        node = page_idx
+        while parents[node][0] != -1:
+            node, action_id = parents[node]
+            path.append(action_id)
+        paths[page_idx] = (settled[page_idx], path[::-1])
+    return paths
+
+
+def plan_weighted(model, page_paths, target_visible_text):
+    """
+    Cheapest plan for one goal given the start page's weighted_page_paths
+
+    Returns:
+        dict: {'success', 'actionPath', 'reason'} as in PlanResult
+    """
+    target_actions, target_pages = model.resolve_goal(target_visible_text)
+    if not target_pages:
+        return _result(reason=REASON_NO_TARGET_ACTION)
+    target_set = set(target_actions)
+    best = None
+    for page_idx in target_pages:
+        if page_idx not in page_paths:
+            continue
+        cost, path = page_paths[page_idx]
+        for action_id, _ in model.transition.get(page_idx, ()):
+            if action_id in target_set and model.action_page.get(action_id) == page_idx:
+                total = cost + model.edge_weight(page_idx, action_id)
+                if best is None or total < best[0]:
+                    best = (total, path + [action_id])
+    return _result(None if best is None else best[1])
+
+
+def _result(action_path=None, reason=REASON_NO_PATH_FOUND):
+    if action_path is None:
+        return {'success': False, 'actionPath': [], 'reason': reason}
+    return {'success': True, 'actionPath': action_path, 'reason': None}
+
+
+def plan_with_traversal(model, traversal, target_visible_text):
+    """
+    Planner.plan (BFS) for one goal, reusing the start page's traversal
+
+    Args:
+        model (PlannerModel): planner model
+        traversal (Traversal): traversal of the goal's start page
+        target_visible_text (str): goal text
+
+    Returns:
+        dict: {'success', 'actionPath', 'reason'} as in PlanResult
+    """
+    target_actions, target_pages = model.resolve_goal(target_visible_text)
+    if not target_pages:
+        return _result(reason=REASON_NO_TARGET_ACTION)
+    target_set = set(target_actions)
+
+    def on_target_page(action_id, page_idx):
+        return action_id in target_set and model.action_page.get(action_id) == page_idx
+
+    # enhancedBfs
+    path = traversal.first_hit(target_pages, on_target_page)
+    if path is not None:
+        return _result(path)
+
+    # bfsToPage -> tryReturnPath: leave the start page with its first BACK action,
+    # then findPathFromPage from the main page
+    start_page_idx = traversal.start_page_idx
+    back_action = model.back_action(start_page_idx)
+    main_paths = model.main_page_paths()
+    if back_action is not None and start_page_idx != model.page_index.get(MAIN_PAGE_ID):
+        for target_page_idx in target_pages:
+            if target_page_idx in traversal.rank or target_page_idx not in main_paths:
+                continue
+            for action_id, _ in model.transition.get(target_page_idx, ()):
+                if on_target_page(action_id, target_page_idx):
+                    return _result([back_action] + main_paths[target_page_idx] + [action_id])
+
+    # Original bfs: any target action on any reachable page
+    candidate_pages = [
+        page_idx for page_idx, actions in model.transition.items()
+        if any(action_id in target_set for action_id, _ in actions)
+    ]
+    return _result(traversal.first_hit(candidate_pages, lambda action_id, _: action_id in target_set))
+
+
+def plan_group(model, start_page, target_texts, weighted=False):
+    """
+    Planner.plan (BFS) for every goal that shares a start page, with a single traversal
+
+    Args:
+        model (PlannerModel): planner model
+        start_page (str): shared start pageId
+        target_texts (list): goal texts
+        weighted (bool): minimize the summed edge weights (Dijkstra) instead
+
+    Returns:
+        list: results in the order of target_texts
+    """
+    start_page_idx = model.page_index.get(start_page)
+    if start_page_idx is None:
+        return [
+            _result(reason=REASON_INVALID_START_PAGE if model.resolve_goal(text)[1] else REASON_NO_TARGET_ACTION)
+            for text in target_texts
+        ]
+    if weighted:
+        page_paths = weighted_page_paths(model, start_page_idx)
+        return [plan_weighted(model, page_paths, text) for text in target_texts]
+    traversal = Traversal(model, start_page_idx)
+    return [plan_with_traversal(model, traversal, text) for text in target_texts]
+
+
+def plan(model, start_page, target_visible_text, weighted=False):
+    """Planner.plan (BFS) for a single goal"""
+    return plan_group(model, start_page, [target_visible_text], weighted)[0]
+
+
+_worker_model = None
+
+
+def _init_worker(fsm_path):
+    global _worker_model
+    _worker_model = PlannerModel(read_json(fsm_path))
+
+
+def _plan_group_in_worker(task):
+    return plan_group(_worker_model, *task)
+
+
+def read_cases(cases_path):
+    """Read goal cases from a JSON lines file, skipping blank lines"""
+    with open_json_text(cases_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def plan_batch(fsm_path, cases, workers=None, weighted=False):
+    """
+    Solve goal cases in batch
+
+    Args:
+        fsm_path (str): FSM transition JSON path
+        cases (list): dicts with 'startPage' and 'targetVisibleText'
+        workers (int): process count; 1 plans in this process, None uses os.cpu_count()
+        weighted (bool): plan by transition_weights instead of Planner's BFS
+
+    Returns:
+        list: one result dict per case, in case order
+    """
+    groups = {}
+    for case_idx, case in enumerate(cases):
+        groups.setdefault(case['startPage'], []).append(case_idx)
+    tasks = [
+        (start_page, [cases[case_idx]['targetVisibleText'] for case_idx in case_ids], weighted)
+        for start_page, case_ids in groups.items()
+    ]
+
+    if workers == 1 or len(tasks) <= 1:
+        model = PlannerModel(read_json(fsm_path))
+        group_results = [plan_group(model, *task) for task in tasks]
+    else:
+        # multiprocessing is slow to import; only the parallel path needs it
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fsm_path,)) as executor:
+            group_results = list(executor.map(_plan_group_in_worker, tasks))
+
+    results = [None] * len(cases)
+    for case_ids, group in zip(groups.values(), group_results):
+        for case_idx, result in zip(case_ids, group):
+            results[case_idx] = result
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Plan a JSON lines corpus of (startPage, targetVisibleText) goals')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--cases', required=True, help='Goal cases JSON lines path')
+    parser.add_argument('--output', '-o', default=None, help='Result JSON lines path, defaults to stdout')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--weighted', action='store_true', help='Minimize transition_weights (Dijkstra) instead of steps')
+    args = parser.parse_args()
+
+    cases = read_cases(args.cases)
+    results = plan_batch(args.fsm, cases, workers=args.workers, weighted=args.weighted)
+    lines = [json.dumps({**case, **result}, ensure_ascii=False) for case, result in zip(cases, results)]
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    else:
+        print('\n'.join(lines))
+
+    solved = sum(result['success'] for result in results)
+    summary = f"Planned {len(cases)} goals: {solved} solved, {len(cases) - solved} failed"
+    if args.output:
+        print(summary)
+        print(f"Results saved to {args.output}")
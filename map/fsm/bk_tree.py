@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+visibleText的BK树（度量树）
+
+以Levenshtein距离（与Planner.levenshteinDistance语义一致）为度量，在构建期把
+visible_text_index的key组织成BK树并序列化进FSM产物。查询时利用三角不等式剪枝，
+只访问一小部分节点即可得到带距离阈值的精确top-k结果。
+
+序列化格式（扁平数组，避免深层嵌套）：
+{
+    'texts': [节点文本, ...],          # 节点0为根
+    'children': [[[距离, 子节点序号], ...], ...]
+}
+"""
+
+import math
+
+from map.fsm.text_index import calculate_similarity, levenshtein_distance
+
+def build_bk_tree(texts):
+    """
+    构建BK树
+
+    Args:
+        texts (iterable): visibleText列表
+
+    Returns:
+        dict: 序列化后的BK树，texts为空时返回空树
+    """
+    node_texts = []
+    node_children = []
+    for text in sorted(set(texts)):
+        node_texts.append(text)
+        node_children.append({})
+        node = len(node_texts) - 1
+        if node == 0:
+            continue
+        current = 0
+        while True:
+            distance = levenshtein_distance(text, node_texts[current])
+            child = node_children[current].get(distance)
+            if child is None:
+                node_children[current][distance] = node
+                break
+            current = child
+    return {
+        'texts': node_texts,
+        'children': [sorted([distance, child] for distance, child in children.items()) for children in node_children],
+    }
+
+def search_bk_tree(tree, query, max_distance, k=None):
+    """
+    查询与query的编辑距离不超过max_distance的文本
+
+    Args:
+        tree (dict): build_bk_tree的结果
+        query (str): 查询文本
+        max_distance (int): 距离阈值
+        k (int): 只返回距离最小的k个结果；None表示返回全部
+
+    Returns:
+        tuple: ([(距离, 文本), ...]按距离、文本升序, 访问的节点数)
+    """
+    if not tree['texts']:
+        return [], 0
+    results = []
+    radius = max_distance
+    stack = [0]
+    visited = 0
+    while stack:
+        node = stack.pop()
+        visited += 1
+        text = tree['texts'][node]
+        distance = levenshtein_distance(query, text)
+        if distance <= radius:
+            results.append((distance, text))
+            if k is not None and len(results) >= k:
+                # 已有k个结果时，只需继续寻找更近的节点，收缩搜索半径
+                results.sort()
+                del results[k:]
+                radius = results[-1][0]
+        for child_distance, child in tree['children'][node]:
+            if distance - radius <= child_distance <= distance + radius:
+                stack.append(child)
+    results.sort()
+    if k is not None:
+        del results[k:]
+    return results, visited
+
+def find_most_similar_text(tree, query, threshold=0.7):
+    """
+    查找与query最相似的visibleText，语义对应Planner.findMostSimilarVisibleText
+
+    相似度 1 - d / max(|q|, |t|) > threshold 且 |t| <= |q| + d，
+    可推出 d < (1 - threshold) * |q| / threshold，以此作为BK树的搜索半径。
+
+    Args:
+        tree (dict): build_bk_tree的结果
+        query (str): 用户输入文本
+        threshold (float): 相似度阈值
+
+    Returns:
+        str: 最相似的visibleText，没有满足阈值的结果时返回None
+    """
+    if threshold <= 0:
+        max_distance = max([len(query)] + [len(text) for text in tree['texts']])
+    else:
+        max_distance = math.ceil((1 - threshold) * len(query) / threshold)
+    best_match = None
+    highest_similarity = threshold
+    for _, text in search_bk_tree(tree, query, max_distance)[0]:
+        similarity = calculate_similarity(query, text)
+        if similarity > highest_similarity:
+            highest_similarity = similarity
+            best_match = text
+    return best_match
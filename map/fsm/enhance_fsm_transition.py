@@ -3,24 +3,46 @@
 增强fsm_transition.json文件，添加action_metadata和visible_text_index映射
 """
 
-import json
 import os
 
-def enhance_fsm_transition(fsm_file_path, ui_map_file_path):
-    """增强fsm_transition.json文件，添加action_metadata和visible_text_index映射"""
-    # 1. 读取fsm_transition.json和ui_map.json文件
-    print("正在读取fsm_transition.json文件...")
-    with open(fsm_file_path, 'r', encoding='utf-8') as f:
-        fsm_data = json.load(f)
+from map.fsm.bk_tree import build_bk_tree
+from map.fsm.intent_index import build_intent_index
+from map.fsm.text_index import build_ngram_index, build_normalized_key_index
+from map.utils.json_output import read_json, write_json
+from map.utils.json_stream import load_pages
+
+def enhance_fsm_transition(fsm_file_path, ui_map_file_path, output_path=None, compact=False, use_gzip=False,
+                           ngram_index=False, bk_tree=False, intent_index=False, normalized_index=False,
+                           fsm_data=None, streaming=False):
+    """
+    增强fsm_transition.json文件，添加action_metadata和visible_text_index映射
     
-    print("正在读取ui_map.json文件...")
-    with open(ui_map_file_path, 'r', encoding='utf-8') as f:
-        ui_map_data = json.load(f)
+    Args:
+        fsm_file_path (str): fsm_transition.json文件路径
+        ui_map_file_path (str): ui_map.json文件路径
+        output_path (str): 输出路径，默认原地更新fsm_file_path（原子替换）
+        compact (bool): 是否输出压缩格式
+        use_gzip (bool): 是否进行gzip压缩
+        ngram_index (bool): 是否额外生成visible_text_ngram_index（n-gram倒排索引）
+        bk_tree (bool): 是否额外生成visible_text_bk_tree（编辑距离BK树）
+        intent_index (bool): 是否额外生成intent_tag_index（intentTags的TF-IDF倒排索引）
+        normalized_index (bool): 是否额外生成visible_text_normalized_index（折叠文本/拼音/首字母 → visibleText）
+        fsm_data (dict): 内存中的FSM（UIMapToFSM.convert()的结果），给出时不读取fsm_file_path，
+            增强后只写一次fsm_transition.json，内容未变化时文件保持不变
+        streaming (bool): 是否逐页流式读取ui_map.json（内存有界，但比整体读取慢得多）
+
+    Returns:
+        dict: 增强后的FSM
+    """
+    # 1. 读取fsm_transition.json（未给出内存中的FSM时）
+    if fsm_data is None:
+        print("正在读取fsm_transition.json文件...")
+        fsm_data = read_json(fsm_file_path)
     
-    # 2. 构建组件信息映射（componentId → viewType, visibleText, pageId）
-    print("正在构建组件信息映射...")
+    # 2. 读取ui_map.json（streaming时逐页读取），构建组件信息映射（componentId → viewType, visibleText, pageId）
+    print("正在读取ui_map.json文件并构建组件信息映射...")
     component_map = {}
-    for page in ui_map_data['pages']:
+    for page in load_pages(ui_map_file_path, streaming):
         page_id = page['pageId']
         for component in page['components']:
             component_id = component['componentId']
@@ -31,7 +53,8 @@ def enhance_fsm_transition(fsm_file_path, ui_map_file_path):
             component_map[component_id] = {
                 'viewType': view_type,
                 'visibleText': visible_text,
-                'pageId': page_id
+                'pageId': page_id,
+                'intentTags': component.get('intentTags', [])
             }
     
     # 3. 生成action_metadata映射
@@ -73,20 +96,60 @@ def enhance_fsm_transition(fsm_file_path, ui_map_file_path):
     fsm_data['action_metadata'] = action_metadata
     fsm_data['visible_text_index'] = visible_text_index
     
-    # 保存修改后的文件
-    with open(fsm_file_path, 'w', encoding='utf-8') as f:
-        json.dump(fsm_data, f, ensure_ascii=False, indent=2)
+    # 可选字段：Kotlin端UiMapModel严格反序列化，默认不输出额外字段
+    if ngram_index:
+        print("正在生成visible_text_ngram_index倒排索引...")
+        fsm_data['visible_text_ngram_index'] = build_ngram_index(visible_text_index.keys())
+    if bk_tree:
+        print("正在生成visible_text_bk_tree...")
+        fsm_data['visible_text_bk_tree'] = build_bk_tree(visible_text_index.keys())
+    if intent_index:
+        print("正在生成intent_tag_index倒排索引...")
+        action_tags = {
+            action_id: component_map.get(metadata['componentId'], {}).get('intentTags', [])
+            for action_id, metadata in action_metadata.items()
+        }
+        fsm_data['intent_tag_index'] = build_intent_index(action_tags)
+    if normalized_index:
+        print("正在生成visible_text_normalized_index...")
+        fsm_data['visible_text_normalized_index'] = build_normalized_key_index(visible_text_index.keys())
+    
+    # 保存修改后的文件：先写临时文件再原子重命名，内容未变化时跳过写入
+    if not write_json(fsm_data, output_path or fsm_file_path, compact=compact, use_gzip=use_gzip):
+        print("fsm_transition.json内容未变化，跳过写入")
     
     print("增强fsm_transition.json文件完成！")
     print(f"添加了 {len(action_metadata)} 个action_metadata条目")
     print(f"添加了 {len(visible_text_index)} 个visible_text_index条目")
+    return fsm_data
 
 if __name__ == "__main__":
+    import argparse
     # Example usage
     # 使用相对路径，确保在任何目录下运行都能找到正确的文件
     FSM_DIR = os.path.dirname(os.path.abspath(__file__))
     MAP_DIR = os.path.dirname(FSM_DIR)
     PROJECT_DIR = os.path.dirname(MAP_DIR)
-    fsm_file_path = os.path.join(PROJECT_DIR, "fsm_transition.json")
-    ui_map_file_path = os.path.join(PROJECT_DIR, "ui_map.json")
-    enhance_fsm_transition(fsm_file_path, ui_map_file_path)
+    parser = argparse.ArgumentParser(description='增强fsm_transition.json，添加action_metadata和visible_text_index映射')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='fsm_transition.json文件路径')
+    parser.add_argument('--ui-map', default=os.path.join(PROJECT_DIR, "ui_map.json"), help='ui_map.json文件路径')
+    parser.add_argument('--output', '-o', default=None, help='输出路径，默认原地更新--fsm文件')
+    parser.add_argument('--convert', action='store_true', help='先由--ui-map在内存中生成FSM再增强，只写一次--fsm文件（不读取已有的--fsm文件）')
+    parser.add_argument('--infer-back', action='store_true', help='--convert时由反向导航图补全BACK转换')
+    parser.add_argument('--streaming', action='store_true', help='逐页流式读取ui_map.json（内存有界，但更慢）')
+    parser.add_argument('--compact', action='store_true', help='输出压缩格式的JSON')
+    parser.add_argument('--gzip', action='store_true', help='对输出的JSON进行gzip压缩')
+    parser.add_argument('--ngram-index', action='store_true', help='生成visibleText的n-gram倒排索引')
+    parser.add_argument('--bk-tree', action='store_true', help='生成visibleText的BK树')
+    parser.add_argument('--intent-index', action='store_true', help='生成intentTags的TF-IDF倒排索引')
+    parser.add_argument('--normalized-index', action='store_true', help='生成visibleText的规范化key（繁简/全半角/拼音）哈希索引')
+    args = parser.parse_args()
+    fsm_data = None
+    if args.convert:
+        from map.fsm.ui_map_to_fsm import UIMapToFSM
+        print("正在由ui_map.json生成FSM...")
+        fsm_data = UIMapToFSM(args.ui_map, infer_back_targets=args.infer_back, streaming=args.streaming).convert()
+    enhance_fsm_transition(args.fsm, args.ui_map, output_path=args.output, compact=args.compact, use_gzip=args.gzip,
+                           ngram_index=args.ngram_index, bk_tree=args.bk_tree, intent_index=args.intent_index,
+                           normalized_index=args.normalized_index, fsm_data=fsm_data,
+                           streaming=args.streaming)
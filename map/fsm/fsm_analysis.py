@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+FSM analysis pass
+
+Works on the FSM structure produced by UIMapToFSM.convert() (or loaded from
+fsm_transition.json):
+- reachability from the entry page
+- strongly connected components (iterative Tarjan)
+- pruning of unreachable pages and of actions with empty transitions
+- an SCC-condensed DAG view with per-component reachability bitmasks, so
+  "is target reachable from here" is a single bit test
+"""
+
+import os
+from collections import deque
+
+from map.fsm.state_space import pages_to_bitmask, bitmask_to_pages
+from map.utils.json_output import read_json, write_json
+
+
+def _next_pages(fsm, next_pages):
+    """Decode a next-page entry honoring the artifact's transition encoding"""
+    if fsm.get('transition_encoding') == 'bitmask':
+        return bitmask_to_pages(next_pages)
+    return next_pages
+
+
+def build_page_graph(fsm):
+    """Build page adjacency: page_idx → set of next page_idx"""
+    graph = {int(p): set() for p in fsm['page_index'].values()}
+    for p, page_transitions in fsm['transition'].items():
+        for next_pages in page_transitions.values():
+            graph[int(p)].update(_next_pages(fsm, next_pages))
+    return graph
+
+
+def reachable_pages(graph, start_page_idx):
+    """Set of page indices reachable from start_page_idx (inclusive)"""
+    seen = {start_page_idx}
+    queue = deque([start_page_idx])
+    while queue:
+        page_idx = queue.popleft()
+        for next_page_idx in graph.get(page_idx, ()):
+            if next_page_idx not in seen:
+                seen.add(next_page_idx)
+                queue.append(next_page_idx)
+    return seen
+
+
+def strongly_connected_components(graph):
+    """Iterative Tarjan SCC
+
+    Returns:
+        list: components as sorted lists of page indices, in reverse topological
+            order (every edge between components points to an earlier one)
+    """
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in sorted(graph):
+        if root in index_of:
+            continue
+        work = [(root, iter(sorted(graph[root])))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(graph.get(child, ())))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+def condense(fsm):
+    """SCC-condensed DAG view of the FSM
+
+    Returns:
+        dict: {
+            'component_of': {page_idx: component_idx},
+            'components': [[page_idx, ...], ...],
+            'edges': {component_idx: [component_idx, ...]},
+            'reach': {component_idx: bitmask of reachable components (inclusive)}
+        }
+    """
+    graph = build_page_graph(fsm)
+    components = strongly_connected_components(graph)
+    component_of = {}
+    for c, members in enumerate(components):
+        for page_idx in members:
+            component_of[page_idx] = c
+
+    edges = {c: set() for c in range(len(components))}
+    for page_idx, next_pages in graph.items():
+        for next_page_idx in next_pages:
+            if component_of[page_idx] != component_of[next_page_idx]:
+                edges[component_of[page_idx]].add(component_of[next_page_idx])
+
+    # Tarjan emits components in reverse topological order, so successors are done first
+    reach = {}
+    for c in range(len(components)):
+        mask = 1 << c
+        for d in edges[c]:
+            mask |= reach[d]
+        reach[c] = mask
+
+    return {
+        'component_of': component_of,
+        'components': components,
+        'edges': {c: sorted(targets) for c, targets in edges.items()},
+        'reach': reach,
+    }
+
+
+def is_reachable(condensation, from_page_idx, to_page_idx):
+    """O(1) reachability check on a condensation built by condense()"""
+    component_of = condensation['component_of']
+    if from_page_idx not in component_of or to_page_idx not in component_of:
+        return False
+    return bool(condensation['reach'][component_of[from_page_idx]] >> component_of[to_page_idx] & 1)
+
+
+def prune_fsm(fsm, entry_page_id):
+    """Drop pages unreachable from entry_page_id and actions whose transitions are empty
+
+    Pages and actions are re-indexed compactly in their original order;
+    action_metadata and visible_text_index are remapped when present. Note that
+    BACK actions have empty transitions unless UIMapToFSM inferred them
+    (infer_back_targets=True), so they are dropped too in that case.
+
+    Returns:
+        dict: pruned FSM in the same layout as the input
+    """
+    graph = build_page_graph(fsm)
+    entry_idx = fsm['page_index'][entry_page_id]
+    reachable = reachable_pages(graph, entry_idx)
+
+    kept_pages = sorted(reachable)
+    page_remap = {old: new for new, old in enumerate(kept_pages)}
+
+    used_actions = set()
+    for p in kept_pages:
+        for a, next_pages in fsm['transition'].get(str(p), {}).items():
+            if _next_pages(fsm, next_pages):
+                used_actions.add(int(a))
+    kept_actions = sorted(used_actions)
+    action_remap = {old: new for new, old in enumerate(kept_actions)}
+
+    bitmask = fsm.get('transition_encoding') == 'bitmask'
+    transition = {}
+    for p in kept_pages:
+        page_transitions = {}
+        for a, next_pages in fsm['transition'].get(str(p), {}).items():
+            targets = [page_remap[q] for q in _next_pages(fsm, next_pages) if q in page_remap]
+            if targets:
+                page_transitions[str(action_remap[int(a)])] = pages_to_bitmask(targets) if bitmask else sorted(targets)
+        transition[str(page_remap[p])] = page_transitions
+
+    pruned = {
+        'page_index': {
+            page_id: page_remap[idx] for page_id, idx in fsm['page_index'].items() if idx in page_remap
+        },
+        'action_index': {
+            key: action_remap[idx] for key, idx in fsm['action_index'].items() if idx in action_remap
+        },
+        'transition': transition,
+    }
+    if bitmask:
+        pruned['transition_encoding'] = 'bitmask'
+    if 'action_metadata' in fsm:
+        pruned['action_metadata'] = {
+            str(action_remap[int(a)]): meta
+            for a, meta in fsm['action_metadata'].items()
+            if int(a) in action_remap
+        }
+    if 'visible_text_index' in fsm:
+        visible_text_index = {}
+        for text, action_ids in fsm['visible_text_index'].items():
+            remapped = [action_remap[a] for a in action_ids if a in action_remap]
+            if remapped:
+                visible_text_index[text] = remapped
+        pruned['visible_text_index'] = visible_text_index
+    return pruned
+
+
+def serialize_condensation(condensation):
+    """JSON-friendly form of a condensation (string keys)"""
+    return {
+        'component_of': {str(p): c for p, c in condensation['component_of'].items()},
+        'components': condensation['components'],
+        'edges': {str(c): targets for c, targets in condensation['edges'].items()},
+        'reach': {str(c): mask for c, mask in condensation['reach'].items()},
+    }
+
+
+def find_entry_page(ui_map):
+    """Return the pageId flagged entryPoint in a UI map, or None"""
+    for page in ui_map['pages']:
+        if page.get('entryPoint'):
+            return page['pageId']
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Prune fsm_transition.json and emit its SCC condensation')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--ui-map', default=os.path.join(PROJECT_DIR, "ui_map.json"), help='UI map JSON path (for the entry page)')
+    parser.add_argument('--entry', default=None, help='Entry pageId, overrides the UI map entryPoint')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "fsm_pruned.json"), help='Pruned FSM output path')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    args = parser.parse_args()
+
+    fsm = read_json(args.fsm)
+    entry_page_id = args.entry
+    if entry_page_id is None:
+        entry_page_id = find_entry_page(read_json(args.ui_map))
+    if entry_page_id is None:
+        raise SystemExit("No entry page found; pass --entry")
+
+    pruned = prune_fsm(fsm, entry_page_id)
+    pruned['scc_condensation'] = serialize_condensation(condense(pruned))
+    write_json(pruned, args.output, compact=args.compact)
+    print(f"Pages: {len(fsm['page_index'])} -> {len(pruned['page_index'])}, "
+          f"actions: {len(fsm['action_index'])} -> {len(pruned['action_index'])}, "
+          f"SCCs: {len(pruned['scc_condensation']['components'])}")
+    print(f"Pruned FSM saved to {args.output}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+intentTags加权倒排索引
+
+component_parser.extract_intent_tags为每个组件生成intentTags，这里在构建期把它们
+组织成 tag → actionId 的倒排索引，并预先计算IDF权重和每个action的向量范数。
+查询时按余弦相似度打分，耗时只与查询tag的倒排表长度成正比。
+
+序列化格式：
+{
+    'idf': {tag: idf},
+    'postings': {tag: [[actionId, weight], ...]},
+    'norms': {actionId: 向量范数}
+}
+"""
+
+import math
+import re
+
+def tokenize_intent_query(text):
+    """
+    将查询拆分为intent tag：按空白、下划线和驼峰拆分并转小写
+
+    Args:
+        text (str): 查询文本，例如 "expert clinic" 或 "expertClinic"
+
+    Returns:
+        list: tag列表（去重，保持顺序）
+    """
+    snake_case = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', text).lower()
+    tags = [tag for tag in re.split(r'[\s_\-]+', snake_case) if tag]
+    return list(dict.fromkeys(tags))
+
+def build_intent_index(action_tags):
+    """
+    构建TF-IDF加权的倒排索引
+
+    Args:
+        action_tags (dict): actionId → intentTags列表
+
+    Returns:
+        dict: 序列化后的索引
+    """
+    document_count = len(action_tags)
+    term_frequency = {}
+    document_frequency = {}
+    for action_id, tags in action_tags.items():
+        counts = {}
+        for tag in tags:
+            counts[tag] = counts.get(tag, 0) + 1
+        term_frequency[action_id] = counts
+        for tag in counts:
+            document_frequency[tag] = document_frequency.get(tag, 0) + 1
+
+    # 平滑IDF，保证出现在所有action中的tag权重仍为正
+    idf = {
+        tag: math.log((1 + document_count) / (1 + df)) + 1.0
+        for tag, df in sorted(document_frequency.items())
+    }
+
+    postings = {}
+    norms = {}
+    for action_id in sorted(term_frequency, key=int):
+        squared = 0.0
+        for tag, tf in term_frequency[action_id].items():
+            weight = tf * idf[tag]
+            postings.setdefault(tag, []).append([int(action_id), weight])
+            squared += weight * weight
+        if squared:
+            norms[str(action_id)] = math.sqrt(squared)
+
+    return {
+        'idf': idf,
+        'postings': dict(sorted(postings.items())),
+        'norms': norms,
+    }
+
+def score_intent_query(index, query, top_k=10):
+    """
+    按余弦相似度为查询打分
+
+    Args:
+        index (dict): build_intent_index的结果
+        query (str | list): 查询文本或tag列表
+        top_k (int): 返回的结果数
+
+    Returns:
+        list: [(actionId, score), ...]，按score降序
+    """
+    tags = tokenize_intent_query(query) if isinstance(query, str) else list(dict.fromkeys(query))
+    query_weights = {tag: index['idf'][tag] for tag in tags if tag in index['idf']}
+    if not query_weights:
+        return []
+    query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values()))
+
+    scores = {}
+    for tag, query_weight in query_weights.items():
+        for action_id, weight in index['postings'][tag]:
+            scores[action_id] = scores.get(action_id, 0.0) + query_weight * weight
+
+    norms = index['norms']
+    ranked = [
+        (action_id, dot / (query_norm * norms[str(action_id)]))
+        for action_id, dot in scores.items()
+    ]
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked[:top_k]
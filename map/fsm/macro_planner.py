@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Ordered / partially ordered multi-target solver
+
+A flow is a list of goal texts that must all be executed, e.g. clinic type ->
+department -> doctor -> time -> confirm. Instead of re-running a BFS per
+target, the solver runs a DP over (set of completed targets, current page):
+moving between targets costs the shortest page-to-page distance (steps, or
+expected duration with --weighted), looked up
+in a DistanceTable whose per-source BFS sub-paths are memoized and shared by
+every flow and start page.
+
+Precedence is a list of [before, after] target index pairs. Without it the
+flow is fully ordered; an empty list leaves the targets unordered.
+
+Solved flows are exported as macro-plans:
+{
+    'fsm_hash': sha256 of fsm_transition.json,
+    'macros': {name: {'targets': [...], 'plans': {startPage: {
+        'order': [target index, ...],
+        'actionPath': [actionId, ...],
+        'segments': [[actionId, ...], ...]   # one per target, in order
+    }}}}
+}
+"""
+
+import os
+
+from map.fsm.batch_planner import PlannerModel, shortest_page_paths, weighted_page_paths
+from map.utils.json_output import file_hash, read_json, write_json
+
+# Subset DP is exponential in the number of targets
+MAX_FLOW_TARGETS = 16
+
+
+class DistanceTable:
+    """
+    Memoized page-to-page shortest action paths
+
+    Unweighted tables count actions (Planner.findPathFromPage semantics);
+    weighted ones sum transition_weights (Dijkstra).
+    """
+
+    def __init__(self, model, weighted=False):
+        self.model = model
+        self.weighted = weighted
+        self._paths = {}
+
+    def paths_from(self, page_idx):
+        """page_idx -> (cost, action path) for every page reachable from page_idx"""
+        if page_idx not in self._paths:
+            if self.weighted:
+                self._paths[page_idx] = weighted_page_paths(self.model, page_idx)
+            else:
+                self._paths[page_idx] = {
+                    to_page_idx: (len(path), path)
+                    for to_page_idx, path in shortest_page_paths(self.model, page_idx).items()
+                }
+        return self._paths[page_idx]
+
+    def distance(self, from_page_idx, to_page_idx):
+        """Cost of the shortest path, or None when to_page_idx is unreachable"""
+        entry = self.paths_from(from_page_idx).get(to_page_idx)
+        return None if entry is None else entry[0]
+
+    def path(self, from_page_idx, to_page_idx):
+        return self.paths_from(from_page_idx)[to_page_idx][1]
+
+    def action_cost(self, page_idx, action_id):
+        return self.model.edge_weight(page_idx, action_id) if self.weighted else 1
+
+
+def target_candidates(model, text):
+    """
+    Executable (actionId, page_idx, resulting pages) triples for a goal text
+
+    An action with no known target keeps the search on its page, as in Planner.
+    """
+    target_actions, _ = model.resolve_goal(text)
+    candidates = []
+    for action_id in dict.fromkeys(target_actions):
+        page_idx = model.action_page.get(action_id)
+        next_pages = dict(model.transition.get(page_idx, ())).get(action_id)
+        if next_pages is not None:
+            candidates.append((action_id, page_idx, next_pages or [page_idx]))
+    return candidates
+
+
+def chain_precedence(target_count):
+    """Precedence pairs of a fully ordered flow"""
+    return [[i, i + 1] for i in range(target_count - 1)]
+
+
+def solve_flow(table, start_page_idx, candidates, precedence):
+    """
+    Cheapest way to execute every target once, honoring precedence
+
+    Args:
+        table (DistanceTable): shared distance table
+        start_page_idx (int): start page
+        candidates (list): target_candidates per target
+        precedence (list): [before, after] target index pairs
+
+    Returns:
+        dict: {'order', 'actionPath', 'segments'}, or None when the flow cannot be completed
+    """
+    target_count = len(candidates)
+    if target_count > MAX_FLOW_TARGETS:
+        raise ValueError(f"flow has {target_count} targets, at most {MAX_FLOW_TARGETS} are supported")
+    required = [0] * target_count
+    for before, after in precedence:
+        required[after] |= 1 << before
+    full_mask = (1 << target_count) - 1
+
+    # (mask, page) -> cost; back pointers rebuild the path
+    cost = {(0, start_page_idx): 0}
+    back = {}
+    layer = [(0, start_page_idx)]
+    for _ in range(target_count):
+        next_layer = {}
+        for state in layer:
+            mask, page_idx = state
+            for target in range(target_count):
+                if mask >> target & 1 or required[target] & ~mask:
+                    continue
+                next_mask = mask | 1 << target
+                for action_id, target_page_idx, next_pages in candidates[target]:
+                    distance = table.distance(page_idx, target_page_idx)
+                    if distance is None:
+                        continue
+                    new_cost = cost[state] + distance + table.action_cost(target_page_idx, action_id)
+                    for next_page_idx in next_pages:
+                        next_state = (next_mask, next_page_idx)
+                        if new_cost < cost.get(next_state, float('inf')):
+                            cost[next_state] = new_cost
+                            back[next_state] = (state, target, action_id, target_page_idx)
+                            next_layer[next_state] = None
+        layer = list(next_layer)
+
+    finals = [state for state in layer if state[0] == full_mask]
+    if not finals:
+        return None
+    state = min(finals, key=lambda final: (cost[final], final[1]))
+
+    order = []
+    segments = []
+    while state in back:
+        previous, target, action_id, target_page_idx = back[state]
+        order.append(target)
+        segments.append(table.path(previous[1], target_page_idx) + [action_id])
+        state = previous
+    order.reverse()
+    segments.reverse()
+    return {
+        'order': order,
+        'actionPath': [action_id for segment in segments for action_id in segment],
+        'segments': segments,
+    }
+
+
+def build_macro_plans(fsm_path, flows, start_pages=None, weighted=False):
+    """
+    Solve every flow from every start page
+
+    Args:
+        fsm_path (str): FSM transition JSON path
+        flows (list): [{'name', 'targets', 'precedence' (optional)}, ...]
+        start_pages (list): start pageIds, default every page of the FSM
+        weighted (bool): minimize transition_weights instead of steps
+
+    Returns:
+        dict: the macro-plan table
+    """
+    model = PlannerModel(read_json(fsm_path))
+    table = DistanceTable(model, weighted)
+    if start_pages is None:
+        start_pages = list(model.page_index)
+
+    macros = {}
+    for flow in flows:
+        targets = flow['targets']
+        precedence = flow.get('precedence', chain_precedence(len(targets)))
+        candidates = [target_candidates(model, text) for text in targets]
+        plans = {}
+        if all(candidates):
+            for start_page in start_pages:
+                solved = solve_flow(table, model.page_index[start_page], candidates, precedence)
+                if solved is not None:
+                    plans[start_page] = solved
+        macros[flow['name']] = {'targets': targets, 'plans': plans}
+    return {
+        'fsm_hash': file_hash(fsm_path),
+        'macros': macros,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Solve ordered multi-target flows into macro-plans')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--flows', default=os.path.join(PROJECT_DIR, "macro_flows.json"), help='Flow definitions JSON path')
+    parser.add_argument('--start', action='append', default=None, help='Start pageId (repeatable), default every page')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "macro_plans.json"), help='Macro-plan output path')
+    parser.add_argument('--weighted', action='store_true', help='Minimize transition_weights (Dijkstra) instead of steps')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    args = parser.parse_args()
+
+    flows = read_json(args.flows)
+    macro_plans = build_macro_plans(args.fsm, flows, start_pages=args.start, weighted=args.weighted)
+    if not write_json(macro_plans, args.output, compact=args.compact):
+        print("Macro-plans unchanged, skipped writing")
+    for name, macro in macro_plans['macros'].items():
+        print(f"{name}: solved from {len(macro['plans'])} start pages")
+    print(f"Macro-plans saved to {args.output}")
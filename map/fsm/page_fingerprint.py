@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Page fingerprint index for identifying the current page from a few view probes
+
+Each page is fingerprinted by the set of componentIds the UI map lists for it
+(ids are views the device can look up with findViewById). Pages with identical
+id sets cannot be told apart by probing and are reported as ambiguous.
+
+- probe_ids: a small global probe list chosen greedily (partition refinement)
+  so that as many pairs of pages as possible differ on at least one probe.
+  Probing all of them and packing the results into a bitmask gives a key into
+  signatures, i.e. the candidate pages in one dict lookup. The list is capped
+  (default 63 probes, so the bitmask fits a signed 64-bit Long); when ids are
+  mostly page-specific a signature can still map to several pages, which the
+  per-page probes below then tell apart.
+- pages[pageIdx].probes: a greedy minimal set of (componentId, expected
+  presence) that separates this page from every other page, for confirming
+  an expected page (e.g. the FSM's predicted next page) without a full probe.
+  Present ids are preferred; absent ids are only used for pages whose id set
+  is a superset of this page's.
+- id_set_hashes: for callers that can enumerate every id on screen.
+
+Output format:
+{
+    'fsm_hash': sha256 of fsm_transition.json,
+    'probe_ids': [componentId, ...],
+    'signatures': {bitmask: [pageIdx, ...]},   # bit i set ⇔ probe_ids[i] found
+    'id_set_hashes': {id_set_hash: [pageIdx, ...]},
+    'pages': {pageIdx: {'pageId': ..., 'probes': [[componentId, present], ...],
+                        'ambiguous_with': [pageIdx, ...]}}
+}
+"""
+
+import hashlib
+import os
+
+from map.fsm.state_space import pages_to_bitmask
+from map.utils.json_output import file_hash, load_fsm_keyed_artifact, read_json, write_json
+from map.utils.json_stream import load_pages
+
+# signature bitmasks stay within a signed 64-bit Long on the device
+DEFAULT_MAX_PROBES = 63
+
+
+def id_set_hash(component_ids):
+    """Hash of a componentId set: first 16 hex digits of SHA-256 over the sorted ids joined by newlines"""
+    return hashlib.sha256('\n'.join(sorted(component_ids)).encode('utf-8')).hexdigest()[:16]
+
+
+def page_component_sets(fsm, ui_map_path, streaming=False):
+    """
+    componentId set of every FSM page, in page_index order
+
+    Args:
+        fsm (dict): FSM transition data
+        ui_map_path (str): UI map JSON path
+        streaming (bool): read the UI map page by page (bounded memory, much slower)
+
+    Returns:
+        list: frozenset of componentIds per pageIdx (empty for pages missing from the UI map)
+    """
+    id_sets = [frozenset()] * len(fsm['page_index'])
+    for page in load_pages(ui_map_path, streaming):
+        page_idx = fsm['page_index'].get(page['pageId'])
+        if page_idx is not None:
+            id_sets[page_idx] = frozenset(component['componentId'] for component in page['components'])
+    return id_sets
+
+
+def select_probe_ids(classes, max_probes=None):
+    """
+    Greedily pick probe ids until every class is separated from every other (or max_probes is reached)
+
+    The current partition of classes starts as one block; each round picks the
+    id that splits the most still-unseparated class pairs (sum over blocks of
+    |with id| * |without id|), ties broken by id.
+
+    Args:
+        classes (list): distinct componentId sets
+        max_probes (int): upper bound on the number of probes, None for no bound
+
+    Returns:
+        list: probe componentIds in selection order
+    """
+    pages_by_id = {}
+    for class_idx, component_ids in enumerate(classes):
+        for component_id in component_ids:
+            pages_by_id.setdefault(component_id, []).append(class_idx)
+
+    block_of = [0] * len(classes)
+    block_sizes = {0: len(classes)}
+    next_block = 1
+    probe_ids = []
+    while any(size > 1 for size in block_sizes.values()) and (max_probes is None or len(probe_ids) < max_probes):
+        best_id, best_split = None, 0
+        for component_id in sorted(pages_by_id):
+            with_id = {}
+            for class_idx in pages_by_id[component_id]:
+                block = block_of[class_idx]
+                with_id[block] = with_id.get(block, 0) + 1
+            split = sum(count * (block_sizes[block] - count) for block, count in with_id.items())
+            if split > best_split:
+                best_id, best_split = component_id, split
+        if best_id is None:
+            break  # only reachable with duplicate classes
+        probe_ids.append(best_id)
+
+        # refine: classes containing best_id move to a new block next to their old one
+        moved = {}
+        for class_idx in pages_by_id.pop(best_id):
+            block = block_of[class_idx]
+            if block not in moved:
+                moved[block] = next_block
+                block_sizes[next_block] = 0
+                next_block += 1
+            block_of[class_idx] = moved[block]
+            block_sizes[block] -= 1
+            block_sizes[moved[block]] += 1
+        block_sizes = {block: size for block, size in block_sizes.items() if size}
+    return probe_ids
+
+
+def select_page_probes(class_idx, classes, pages_by_id):
+    """
+    Greedy minimal set of (componentId, present) separating one class from all others
+
+    Args:
+        class_idx (int): class to fingerprint
+        classes (list): distinct componentId sets
+        pages_by_id (dict): componentId -> set of class indices containing it
+
+    Returns:
+        list: [[componentId, present], ...]
+    """
+    own_ids = classes[class_idx]
+    uncovered = set(range(len(classes)))
+    uncovered.discard(class_idx)
+    probes = []
+
+    # present probes: own id d separates every class lacking d
+    candidates = set(own_ids)
+    while uncovered and candidates:
+        best_id, best_cover = None, 0
+        for component_id in sorted(candidates):
+            cover = len(uncovered) - len(uncovered & pages_by_id[component_id])
+            if cover > best_cover:
+                best_id, best_cover = component_id, cover
+        if best_id is None:
+            break
+        probes.append([best_id, True])
+        uncovered &= pages_by_id[best_id]
+        candidates.discard(best_id)
+
+    # absent probes: the rest are supersets of this class, separated by an id they have and it lacks
+    while uncovered:
+        counts = {}
+        for other_idx in uncovered:
+            for component_id in classes[other_idx] - own_ids:
+                counts[component_id] = counts.get(component_id, 0) + 1
+        best_id = min(counts, key=lambda component_id: (-counts[component_id], component_id))
+        probes.append([best_id, False])
+        uncovered -= pages_by_id[best_id]
+    return probes
+
+
+def build_page_fingerprints(fsm_path, ui_map_path, max_probes=DEFAULT_MAX_PROBES, streaming=False):
+    """
+    Build the page fingerprint index
+
+    Args:
+        fsm_path (str): FSM transition JSON path
+        ui_map_path (str): UI map JSON path
+        max_probes (int): size cap of the global probe list
+        streaming (bool): read the UI map page by page (bounded memory, much slower)
+
+    Returns:
+        dict: the fingerprint index
+    """
+    fsm = read_json(fsm_path)
+    page_ids = sorted(fsm['page_index'], key=fsm['page_index'].get)
+    id_sets = page_component_sets(fsm, ui_map_path, streaming)
+
+    # pages with identical id sets share one class
+    class_of_set = {}
+    class_pages = []
+    for page_idx, component_ids in enumerate(id_sets):
+        if component_ids not in class_of_set:
+            class_of_set[component_ids] = len(class_pages)
+            class_pages.append([])
+        class_pages[class_of_set[component_ids]].append(page_idx)
+    classes = list(class_of_set)
+
+    probe_ids = select_probe_ids(classes, max_probes)
+    signatures = {}
+    id_set_hashes = {}
+    for class_idx, component_ids in enumerate(classes):
+        mask = pages_to_bitmask(bit for bit, component_id in enumerate(probe_ids) if component_id in component_ids)
+        signatures.setdefault(str(mask), []).extend(class_pages[class_idx])
+        id_set_hashes[id_set_hash(component_ids)] = class_pages[class_idx]
+
+    pages_by_id = {}
+    for class_idx, component_ids in enumerate(classes):
+        for component_id in component_ids:
+            pages_by_id.setdefault(component_id, set()).add(class_idx)
+    pages = {}
+    for class_idx, members in enumerate(class_pages):
+        probes = select_page_probes(class_idx, classes, pages_by_id)
+        for page_idx in members:
+            pages[str(page_idx)] = {
+                'pageId': page_ids[page_idx],
+                'probes': probes,
+                'ambiguous_with': [other for other in members if other != page_idx],
+            }
+
+    return {
+        'fsm_hash': file_hash(fsm_path),
+        'probe_ids': probe_ids,
+        'signatures': signatures,
+        'id_set_hashes': id_set_hashes,
+        'pages': pages,
+    }
+
+
+def load_page_fingerprints(index_path, fsm_path):
+    """
+    Load a fingerprint index, or None when it is missing or was built from another FSM
+
+    Args:
+        index_path (str): fingerprint index path
+        fsm_path (str): FSM transition JSON the index must match
+    """
+    return load_fsm_keyed_artifact(index_path, fsm_path)
+
+
+def identify_page(index, probe):
+    """
+    Candidate pages for the current screen from the global probes
+
+    When the signature is shared by several pages, each candidate's own probes
+    are checked as well.
+
+    Args:
+        index (dict): fingerprint index
+        probe (callable): componentId -> bool, whether the view is on screen
+
+    Returns:
+        list: candidate pageIds (empty when the screen matches no known page)
+    """
+    mask = pages_to_bitmask(bit for bit, component_id in enumerate(index['probe_ids']) if probe(component_id))
+    candidates = index['signatures'].get(str(mask), [])
+    if len(candidates) > 1:
+        candidates = [page_idx for page_idx in candidates if verify_page(index, page_idx, probe)]
+    return [index['pages'][str(page_idx)]['pageId'] for page_idx in candidates]
+
+
+def identify_page_by_ids(index, component_ids):
+    """Candidate pageIds for a screen whose full componentId set is known"""
+    page_idxs = index['id_set_hashes'].get(id_set_hash(component_ids), [])
+    return [index['pages'][str(page_idx)]['pageId'] for page_idx in page_idxs]
+
+
+def verify_page(index, page_idx, probe):
+    """Whether the screen matches the expected page's own probes"""
+    return all(probe(component_id) == present for component_id, present in index['pages'][str(page_idx)]['probes'])
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Build the page fingerprint index (discriminating componentIds per page)')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--ui-map', default=os.path.join(PROJECT_DIR, "ui_map.json"), help='UI map JSON path')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "page_fingerprints.json"), help='Fingerprint index output path')
+    parser.add_argument('--max-probes', type=int, default=DEFAULT_MAX_PROBES, help='Size cap of the global probe list')
+    parser.add_argument('--streaming', action='store_true', help='Read the UI map page by page instead of loading it whole')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output JSON')
+    args = parser.parse_args()
+
+    index = build_page_fingerprints(args.fsm, args.ui_map, max_probes=args.max_probes, streaming=args.streaming)
+    if not write_json(index, args.output, compact=args.compact, use_gzip=args.gzip):
+        print("Page fingerprint index unchanged, skipped writing")
+    ambiguous = sum(1 for page in index['pages'].values() if page['ambiguous_with'])
+    page_probes = max((len(page['probes']) for page in index['pages'].values()), default=0)
+    largest_signature = max((len(pages) for pages in index['signatures'].values()), default=0)
+    print(f"Fingerprinted {len(index['pages'])} pages with {len(index['probe_ids'])} global probes "
+          f"(at most {largest_signature} pages per signature, {page_probes} per-page probes, {ambiguous} ambiguous pages)")
+    print(f"Page fingerprint index saved to {args.output}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Precomputed plan cache for frequent goals
+
+Runs after enhance_fsm_transition. Every frequent goal is planned from every
+page with the batch planner (Planner.plan BFS semantics), and the successful
+plans are written as a compact (start page, goal) -> action list table. The
+table ships with the app, so it is written to app/src/main/assets by default.
+
+The table records the SHA-256 of the FSM file it was built from; a reader
+that sees a different hash must ignore the cache and fall back to planning.
+
+Output format:
+{
+    'fsm_hash': sha256 of fsm_transition.json,
+    'goals': [goal text, ...],
+    'plans': {startPage: {goal text: [actionId, ...]}}
+}
+"""
+
+import os
+
+from map.fsm.batch_planner import plan_batch
+from map.utils.json_output import file_hash, load_fsm_keyed_artifact, open_json_text, read_json, write_json
+
+
+def read_goals(goals_path):
+    """Read goal texts, one per line; blank lines and '#' comments are skipped"""
+    with open_json_text(goals_path) as f:
+        lines = (line.strip() for line in f)
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+
+def build_plan_cache(fsm_path, goals, workers=None, weighted=False):
+    """
+    Plan every goal from every page of the FSM
+
+    Args:
+        fsm_path (str): FSM transition JSON path
+        goals (list): goal texts
+        workers (int): planner worker processes, see plan_batch
+        weighted (bool): minimize transition_weights instead of steps
+
+    Returns:
+        dict: the plan cache
+    """
+    page_ids = list(read_json(fsm_path)['page_index'])
+    cases = [
+        {'startPage': page_id, 'targetVisibleText': goal}
+        for page_id in page_ids
+        for goal in goals
+    ]
+    results = plan_batch(fsm_path, cases, workers=workers, weighted=weighted)
+
+    plans = {}
+    for case, result in zip(cases, results):
+        if result['success']:
+            plans.setdefault(case['startPage'], {})[case['targetVisibleText']] = result['actionPath']
+    return {
+        'fsm_hash': file_hash(fsm_path),
+        'goals': list(goals),
+        'plans': plans,
+    }
+
+
+def load_plan_cache(cache_path, fsm_path):
+    """
+    Load a plan cache, or None when it is missing or was built from another FSM
+
+    Args:
+        cache_path (str): plan cache path
+        fsm_path (str): FSM transition JSON the cache must match
+    """
+    return load_fsm_keyed_artifact(cache_path, fsm_path)
+
+
+def lookup_plan(cache, start_page, goal):
+    """Cached action path for (start_page, goal), or None when it has to be planned"""
+    return cache['plans'].get(start_page, {}).get(goal)
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Precompute plans for frequent goals from every page')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--goals', default=os.path.join(PROJECT_DIR, "frequent_goals.txt"), help='Frequent goals, one per line')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "app", "src", "main", "assets", "plan_cache.json"),
+                        help='Plan cache output path')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--weighted', action='store_true', help='Minimize transition_weights (Dijkstra) instead of steps')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output JSON')
+    args = parser.parse_args()
+
+    goals = read_goals(args.goals)
+    cache = build_plan_cache(args.fsm, goals, workers=args.workers, weighted=args.weighted)
+    if not write_json(cache, args.output, compact=args.compact, use_gzip=args.gzip):
+        print("Plan cache unchanged, skipped writing")
+    plan_count = sum(len(page_plans) for page_plans in cache['plans'].values())
+    print(f"Cached {plan_count} plans for {len(goals)} goals across {len(cache['plans'])} start pages")
+    print(f"Plan cache saved to {args.output}")
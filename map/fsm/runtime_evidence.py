@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Runtime transition evidence
+
+The static extractor misses transitions hidden in helpers, fragments and
+dialogs. Executor logs record what actually happened, one observation per
+JSON line:
+    {"page": "MainActivity", "actionId": 34, "resultPage": "SecondActivity1"}
+The action may also be given as "componentId" (+ optional "triggerType"),
+as in map.fsm.latency.
+
+Observations are counted per (page, action, resulting page) edge in one
+streaming pass. Memory is bounded: when the counter exceeds max_edges, the
+least frequent half of the edges is dropped (their counts are reported as
+dropped), so rare noise cannot grow the table without limit. The counter
+can be saved and reloaded, so logs are folded in incrementally.
+
+The evidence is written into the FSM as a separate layer using the FSM's
+own page_index / action_index:
+    'observed_transition': {page_idx: {action_id: {next_page_idx: count}}}
+With merge enabled, edges seen at least min_count times are also added to
+'transition', so both planners use them without a rebuild from source.
+"""
+
+import os
+
+from map.fsm.latency import resolve_edge
+from map.utils.json_output import read_json, write_json
+from map.utils.json_stream import iter_json_lines
+
+DEFAULT_MAX_EDGES = 100000
+
+
+class TransitionCounter:
+    """Bounded (page_idx, action_id, next_page_idx) -> count table"""
+
+    def __init__(self, max_edges=DEFAULT_MAX_EDGES):
+        self.max_edges = max_edges
+        self.counts = {}
+        self.dropped = 0
+
+    def add(self, edge, count=1):
+        self.counts[edge] = self.counts.get(edge, 0) + count
+        if len(self.counts) > self.max_edges:
+            self._prune()
+
+    def _prune(self):
+        """Keep the most frequent half of the edges"""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        keep = self.max_edges // 2
+        self.dropped += sum(count for _, count in ranked[keep:])
+        self.counts = dict(ranked[:keep])
+
+    def merge(self, other):
+        self.dropped += other.dropped
+        for edge, count in other.counts.items():
+            self.add(edge, count)
+
+    def to_dict(self):
+        return {
+            'dropped': self.dropped,
+            'edges': [[*edge, count] for edge, count in sorted(self.counts.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data, max_edges=DEFAULT_MAX_EDGES):
+        counter = cls(max_edges)
+        counter.dropped = data.get('dropped', 0)
+        for page_idx, action_id, next_page_idx, count in data.get('edges', []):
+            counter.add((page_idx, action_id, next_page_idx), count)
+        return counter
+
+
+def ingest_observations(fsm, records, counter):
+    """
+    Count observations into counter
+
+    Returns:
+        int: number of records whose page, action or resulting page is not in the FSM
+    """
+    unresolved = 0
+    for record in records:
+        edge = resolve_edge(fsm, record)
+        next_page_idx = fsm['page_index'].get(record.get('resultPage'))
+        if edge is None or next_page_idx is None:
+            unresolved += 1
+            continue
+        counter.add((*edge, next_page_idx))
+    return unresolved
+
+
+def evidence_layer(counter):
+    """observed_transition in the FSM's string-keyed layout"""
+    layer = {}
+    for (page_idx, action_id, next_page_idx), count in sorted(counter.counts.items()):
+        layer.setdefault(str(page_idx), {}).setdefault(str(action_id), {})[str(next_page_idx)] = count
+    return layer
+
+
+def merge_observed_transitions(fsm, min_count=1):
+    """
+    Add observed edges seen at least min_count times to fsm['transition'] in place
+
+    Returns:
+        int: number of edges that were not in the static transition
+    """
+    if fsm.get('transition_encoding') == 'bitmask':
+        raise ValueError("observed edges can only be merged into list-encoded transitions")
+    added = 0
+    transition = fsm['transition']
+    for page_idx, actions in fsm.get('observed_transition', {}).items():
+        for action_id, next_pages in actions.items():
+            observed = [int(next_page_idx) for next_page_idx, count in next_pages.items() if count >= min_count]
+            if not observed:
+                continue
+            page_actions = transition.setdefault(page_idx, {})
+            static = page_actions.get(action_id, [])
+            new_pages = [next_page_idx for next_page_idx in observed if next_page_idx not in static]
+            if new_pages or action_id not in page_actions:
+                page_actions[action_id] = sorted(set(static) | set(new_pages))
+                added += len(new_pages)
+    return added
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Merge runtime (page, action, resulting page) observations into the FSM')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--logs', nargs='*', default=[], help='Observation logs (JSON lines, optionally gzipped)')
+    parser.add_argument('--state', default=None, help='Aggregate state file, extended in place across runs')
+    parser.add_argument('--max-edges', type=int, default=DEFAULT_MAX_EDGES, help='Maximum edges kept in memory')
+    parser.add_argument('--merge', action='store_true', help='Also add observed edges to transition')
+    parser.add_argument('--min-count', type=int, default=1, help='Observations required before an edge is merged')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "fsm_observed.json"), help='FSM output path')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    args = parser.parse_args()
+
+    fsm = read_json(args.fsm)
+    counter = TransitionCounter(args.max_edges)
+    if args.state and os.path.exists(args.state):
+        counter = TransitionCounter.from_dict(read_json(args.state), args.max_edges)
+    unresolved = ingest_observations(fsm, iter_json_lines(args.logs), counter)
+    if args.state:
+        write_json(counter.to_dict(), args.state, compact=True)
+
+    fsm['observed_transition'] = evidence_layer(counter)
+    message = (f"Observed {sum(counter.counts.values())} transitions over {len(counter.counts)} edges "
+               f"({unresolved} unresolved records, {counter.dropped} dropped observations)")
+    if args.merge:
+        message += f", {merge_observed_transitions(fsm, args.min_count)} new edges merged into transition"
+    write_json(fsm, args.output, compact=args.compact)
+    print(message)
+    print(f"FSM with runtime evidence saved to {args.output}")
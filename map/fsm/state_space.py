@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compact FSM encodings
+
+- Next-page sets as integer bitmasks: bit i set ⇔ page_index i is a possible next page
+- PageStateSpace: factored state space (page_idx, state_bits), where state_bits is a
+  bit vector over the tracked STATE_CHANGE stateKeys. Successors are expanded lazily,
+  so the full page × state product graph is never materialized.
+"""
+
+from collections import deque
+
+
+def pages_to_bitmask(pages):
+    """Encode an iterable of page indices as an integer bitmask"""
+    mask = 0
+    for page_idx in pages:
+        mask |= 1 << page_idx
+    return mask
+
+
+def bitmask_to_pages(mask):
+    """Decode an integer bitmask into a sorted list of page indices"""
+    pages = []
+    page_idx = 0
+    while mask:
+        if mask & 1:
+            pages.append(page_idx)
+        mask >>= 1
+        page_idx += 1
+    return pages
+
+
+class PageStateSpace:
+    """Page × stateKey product space over a converted UIMapToFSM.
+
+    A state is a tuple (page_idx, state_bits). Firing an action whose effect is a
+    STATE_CHANGE sets the bit of its stateKey; bits are never cleared, i.e. a bit
+    records "this state has been changed at least once along the path".
+    """
+
+    def __init__(self, converter, tracked_state_keys=None):
+        """
+        Args:
+            converter (UIMapToFSM): converter on which convert() has already run
+            tracked_state_keys (iterable): stateKeys to track; defaults to every
+                stateKey found in the UI map
+        """
+        self.transition = converter.transition
+        self.page_index = converter.page_index
+        self.action_index = converter.action_index
+
+        # (page_idx, action_idx) → stateKey of the STATE_CHANGE effect
+        self.action_state_key = {}
+        all_state_keys = set()
+        for page in converter.iter_pages():
+            p = self.page_index[page['pageId']]
+            for component in page['components']:
+                for trigger in component['triggers']:
+                    effect = trigger['effect']
+                    if effect and effect['effectType'] == 'STATE_CHANGE' and effect.get('stateKey'):
+                        a = self.action_index[(component['componentId'], trigger['triggerType'])]
+                        self.action_state_key[(p, a)] = effect['stateKey']
+                        all_state_keys.add(effect['stateKey'])
+
+        if tracked_state_keys is None:
+            tracked_state_keys = all_state_keys
+        self.state_key_index = {key: idx for idx, key in enumerate(sorted(tracked_state_keys))}
+
+        # (page_idx, action_idx) → bit to set, only for tracked keys
+        self.action_state_bit = {
+            pa: 1 << self.state_key_index[key]
+            for pa, key in self.action_state_key.items()
+            if key in self.state_key_index
+        }
+
+    def initial_state(self, page_id):
+        """Initial state for a pageId with no state changed yet"""
+        return (self.page_index[page_id], 0)
+
+    def state_bits(self, state_keys):
+        """Encode an iterable of stateKeys as a bit vector"""
+        bits = 0
+        for key in state_keys:
+            bits |= 1 << self.state_key_index[key]
+        return bits
+
+    def state_keys(self, bits):
+        """Decode a bit vector into the list of stateKeys it contains"""
+        return [key for key, idx in self.state_key_index.items() if bits & (1 << idx)]
+
+    def successors(self, state):
+        """Lazily yield (action_idx, next_state) for every transition out of state"""
+        page_idx, bits = state
+        for action_idx, next_pages in self.transition.get(page_idx, {}).items():
+            next_bits = bits | self.action_state_bit.get((page_idx, action_idx), 0)
+            for next_page_idx in next_pages:
+                yield action_idx, (next_page_idx, next_bits)
+
+    def search(self, start_state, is_goal, max_states=None):
+        """Breadth-first search over the product space, expanding states on demand
+
+        Args:
+            start_state (tuple): (page_idx, state_bits)
+            is_goal (callable): predicate on a state
+            max_states (int): optional cap on the number of visited states
+
+        Returns:
+            list: action index sequence reaching a goal state, or None if none was found
+        """
+        if is_goal(start_state):
+            return []
+        parents = {start_state: None}
+        queue = deque([start_state])
+        while queue:
+            state = queue.popleft()
+            for action_idx, next_state in self.successors(state):
+                if next_state in parents:
+                    continue
+                parents[next_state] = (state, action_idx)
+                if is_goal(next_state):
+                    path = []
+                    while parents[next_state] is not None:
+                        next_state, action_idx = parents[next_state]
+                        path.append(action_idx)
+                    path.reverse()
+                    return path
+                if max_states is not None and len(parents) >= max_states:
+                    return None
+                queue.append(next_state)
+        return None
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+visibleText模糊匹配索引
+
+Planner.findMostSimilarVisibleText对visible_text_index的每个key都计算一次
+Levenshtein距离。这里在构建期预先生成字符n-gram倒排索引（中文标签使用bigram即可），
+查询时先用倒排表把候选缩小到少数几个，再对候选做精确的相似度打分。
+
+另外提供规范化key的哈希索引：全半角折叠、繁简转换、全拼和拼音首字母
+都映射到原始visibleText，规范化后完全相同的输入可以O(1)命中。
+"""
+
+from map.utils.text_normalize import fold_text, normalized_keys
+
+DEFAULT_NGRAM_SIZE = 2
+
+def normalize_text(text):
+    """
+    规范化文本：NFKC（全角转半角）、去声调、转小写、去除空白、繁体转简体
+
+    Args:
+        text (str): 原始文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    return fold_text(text)
+
+def char_ngrams(text, n=DEFAULT_NGRAM_SIZE):
+    """
+    提取文本的字符n-gram集合；文本短于n时返回整个文本
+
+    Args:
+        text (str): 规范化后的文本
+        n (int): n-gram长度
+
+    Returns:
+        set: n-gram集合
+    """
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def levenshtein_distance(s1, s2):
+    """计算Levenshtein距离，与Planner.levenshteinDistance语义一致"""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            cost = 0 if c1 == c2 else 1
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost))
+        previous = current
+    return previous[-1]
+
+def calculate_similarity(s1, s2):
+    """计算相似度，与Planner.calculateSimilarity语义一致：1 - 距离 / 最大长度"""
+    max_length = max(len(s1), len(s2))
+    if max_length == 0:
+        return 1.0
+    return 1.0 - levenshtein_distance(s1, s2) / max_length
+
+def build_ngram_index(texts, n=DEFAULT_NGRAM_SIZE):
+    """
+    构建n-gram倒排索引
+
+    Args:
+        texts (iterable): visibleText列表（通常为visible_text_index的key）
+        n (int): n-gram长度
+
+    Returns:
+        dict: {
+            'n': n,
+            'texts': [原始文本],
+            'normalized': [规范化文本],
+            'gram_counts': [每个文本的n-gram数量],
+            'postings': {n-gram: [文本序号, ...]}
+        }
+    """
+    texts = sorted(set(texts))
+    normalized = [normalize_text(text) for text in texts]
+    postings = {}
+    gram_counts = []
+    for text_id, norm in enumerate(normalized):
+        grams = char_ngrams(norm, n)
+        gram_counts.append(len(grams))
+        for gram in grams:
+            postings.setdefault(gram, []).append(text_id)
+    return {
+        'n': n,
+        'texts': texts,
+        'normalized': normalized,
+        'gram_counts': gram_counts,
+        'postings': dict(sorted(postings.items())),
+    }
+
+def query_candidates(index, query, limit=8):
+    """
+    通过倒排表查找候选文本，按Dice系数（共享n-gram比例）排序
+
+    Args:
+        index (dict): build_ngram_index的结果
+        query (str): 用户输入文本
+        limit (int): 最多返回的候选数
+
+    Returns:
+        list: [(text_id, dice), ...]，按dice降序
+    """
+    query_grams = char_ngrams(normalize_text(query), index['n'])
+    if not query_grams:
+        return []
+    shared = {}
+    for gram in query_grams:
+        for text_id in index['postings'].get(gram, ()):
+            shared[text_id] = shared.get(text_id, 0) + 1
+    gram_counts = index['gram_counts']
+    scored = [
+        (text_id, 2.0 * count / (len(query_grams) + gram_counts[text_id]))
+        for text_id, count in shared.items()
+    ]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+def find_most_similar_text(index, query, threshold=0.7, limit=8):
+    """
+    查找与query最相似的visibleText，语义对应Planner.findMostSimilarVisibleText，
+    但只对倒排表筛选出的候选做精确打分
+
+    Args:
+        index (dict): build_ngram_index的结果
+        query (str): 用户输入文本
+        threshold (float): 相似度阈值，只返回高于该值的结果
+        limit (int): 精确打分的候选数
+
+    Returns:
+        str: 最相似的visibleText，没有满足阈值的结果时返回None
+    """
+    best_match = None
+    highest_similarity = threshold
+    for text_id, _ in query_candidates(index, query, limit):
+        similarity = calculate_similarity(query, index['texts'][text_id])
+        if similarity > highest_similarity:
+            highest_similarity = similarity
+            best_match = index['texts'][text_id]
+    return best_match
+
+def build_normalized_key_index(texts):
+    """
+    构建规范化key的哈希索引
+
+    Args:
+        texts (iterable): visibleText列表（通常为visible_text_index的key）
+
+    Returns:
+        dict: {规范化key: [visibleText, ...]}，key包括折叠文本、全拼和拼音首字母
+    """
+    index = {}
+    for text in sorted(set(texts)):
+        for key in dict.fromkeys(normalized_keys(text).values()):
+            if key:
+                index.setdefault(key, []).append(text)
+    return dict(sorted(index.items()))
+
+def lookup_normalized(index, query):
+    """
+    在规范化key索引中查找query；依次尝试折叠文本、全拼、拼音首字母
+
+    Args:
+        index (dict): build_normalized_key_index的结果
+        query (str): 用户输入文本（可为繁体、全角、拼音或拼音首字母）
+
+    Returns:
+        list: 命中的visibleText列表，未命中时返回空列表
+    """
+    for key in normalized_keys(query).values():
+        if key in index:
+            return index[key]
+    return []
@@ -6,27 +6,65 @@ Converts the UI map JSON into a state transition tensor structure:
 - page_index: maps pageId to integer index
 - action_index: maps (componentId, triggerType) to integer index
 - transition: transition[page_idx][action_idx] → Set<page_index>
+
+BACK effects carry no target in the UI map (map_validator strips
+possibleTargetPageIds). With infer_back_targets=True the converter fills
+them from the reverse navigation graph instead of emitting empty lists.
+
+With encoding='bitmask' next-page sets are serialized as integer bitmasks
+(see map.fsm.state_space) instead of lists.
+
+With streaming=True the UI map is never loaded as a whole: pages are read
+one at a time (map.utils.json_stream) in two passes, one for the indexes
+and navigation graph and one for the transitions.
 """
 
 import json
 import os
+from collections import deque
+
+from map.extractor.map_validator import build_page_graphs
+from map.fsm.state_space import pages_to_bitmask
+from map.utils.json_output import open_json_text, write_json
+from map.utils.json_stream import iter_pages
 
 class UIMapToFSM:
-    def __init__(self, ui_map_json_path):
+    def __init__(self, ui_map_json_path, infer_back_targets=False, back_stack_depth=None, streaming=False):
         self.ui_map_path = ui_map_json_path
+        self.infer_back_targets = infer_back_targets
+        self.back_stack_depth = back_stack_depth
+        self.streaming = streaming
+        self.ui_map = None
         self.page_index = {}
         self.action_index = {}
         self.transition = {}
-        self._load_ui_map()
+        self.back_targets = {}
+        self.entry_page_ids = []
+        self.navigation_graph = None
+        self.back_graph = None
+        if not streaming:
+            self._load_ui_map()
     
     def _load_ui_map(self):
         """Load the UI map from JSON file"""
-        with open(self.ui_map_path, 'r', encoding='utf-8') as f:
+        with open_json_text(self.ui_map_path) as f:
             self.ui_map = json.load(f)
     
+    def iter_pages(self):
+        """Iterate the UI map pages, streaming them from disk in streaming mode"""
+        if self.streaming:
+            return iter_pages(self.ui_map_path)
+        return iter(self.ui_map['pages'])
+    
+    def _index_pages(self, page_ids, actions):
+        """Build page_index and action_index from collected ids"""
+        # Sort pageIds and actions alphabetically for consistency
+        self.page_index = {page_id: idx for idx, page_id in enumerate(sorted(page_ids))}
+        self.action_index = {action: idx for idx, action in enumerate(sorted(actions))}
+    
     def build_page_index(self):
         """Build page index mapping: pageId → integer index"""
-        page_ids = [page['pageId'] for page in self.ui_map['pages']]
+        page_ids = [page['pageId'] for page in self.iter_pages()]
         # Sort pageIds alphabetically for consistency
         page_ids.sort()
         self.page_index = {page_id: idx for idx, page_id in enumerate(page_ids)}
@@ -35,7 +73,7 @@ class UIMapToFSM:
         """Build action index mapping: (componentId, triggerType) → integer index"""
         actions = set()
         
-        for page in self.ui_map['pages']:
+        for page in self.iter_pages():
             for component in page['components']:
                 component_id = component['componentId']
                 for trigger in component['triggers']:
@@ -46,12 +84,71 @@ class UIMapToFSM:
         actions = sorted(actions)
         self.action_index = {action: idx for idx, action in enumerate(actions)}
     
+    def scan_pages(self):
+        """First pass: page index, action index, entry pages and navigation graph in one pass over the pages"""
+        page_ids = []
+        actions = set()
+        self.entry_page_ids = []
+        
+        def visit():
+            for page in self.iter_pages():
+                page_ids.append(page['pageId'])
+                if page.get('entryPoint'):
+                    self.entry_page_ids.append(page['pageId'])
+                for component in page['components']:
+                    for trigger in component['triggers']:
+                        actions.add((component['componentId'], trigger['triggerType']))
+                yield page
+        
+        _, self.navigation_graph, self.back_graph = build_page_graphs(visit())
+        self._index_pages(page_ids, actions)
+    
+    def build_back_targets(self):
+        """Build BACK targets: page_idx → Set<page_index> of pages that may lie below it on the back stack.
+
+        A BACK from page P returns to one of the pages that navigate to P
+        (page_back_graph[P]). When back_stack_depth is set, a predecessor Q is
+        kept only if Q can sit at stack depth < back_stack_depth, where the
+        depth of a page is its BFS distance from the entry page (entry = 1).
+        Everything is computed in a single pass over the graphs.
+        """
+        if self.navigation_graph is None:
+            self.scan_pages()
+        navigation_graph, back_graph = self.navigation_graph, self.back_graph
+
+        stack_depth = None
+        if self.back_stack_depth is not None:
+            # 从入口页面出发做一次BFS，得到每个页面的最小返回栈深度
+            stack_depth = {}
+            queue = deque()
+            for page_id in self.entry_page_ids:
+                stack_depth[page_id] = 1
+                queue.append(page_id)
+            while queue:
+                page_id = queue.popleft()
+                for target_page_id in navigation_graph[page_id]:
+                    if target_page_id not in stack_depth:
+                        stack_depth[target_page_id] = stack_depth[page_id] + 1
+                        queue.append(target_page_id)
+
+        self.back_targets = {}
+        for page_id, sources in back_graph.items():
+            targets = set()
+            for source_page_id in sources:
+                if stack_depth is not None:
+                    depth = stack_depth.get(source_page_id)
+                    if depth is None or depth >= self.back_stack_depth:
+                        continue
+                if source_page_id in self.page_index:
+                    targets.add(self.page_index[source_page_id])
+            self.back_targets[self.page_index[page_id]] = targets
+
     def build_transition(self):
         """Build the state transition dictionary"""
         # Initialize transition dictionary
         self.transition = {page_idx: {} for page_idx in self.page_index.values()}
         
-        for page in self.ui_map['pages']:
+        for page in self.iter_pages():
             page_id = page['pageId']
             p = self.page_index[page_id]
             
@@ -70,11 +167,13 @@ class UIMapToFSM:
                         navigation_role = effect.get('navigationRole', '')
                         
                         if navigation_role == 'BACK':
-                            # BACK navigation - use possibleTargetPageIds
+                            # BACK navigation - use possibleTargetPageIds, or the inferred back stack
                             possible_targets = effect.get('possibleTargetPageIds', [])
                             for target in possible_targets:
                                 if target in self.page_index:
                                     next_pages.add(self.page_index[target])
+                            if not possible_targets and self.infer_back_targets:
+                                next_pages.update(self.back_targets.get(p, set()))
                         else:
                             # Forward navigation - use targetPageId
                             target_page_id = effect.get('targetPageId')
@@ -92,12 +191,21 @@ class UIMapToFSM:
                         self.transition[p][a] = set()
                     self.transition[p][a].update(next_pages)
     
-    def convert(self):
-        """Run the full conversion process"""
-        self.build_page_index()
-        self.build_action_index()
+    def convert(self, encoding='list'):
+        """Run the full conversion process
+
+        Args:
+            encoding: 'list' serializes next-page sets as sorted lists,
+                'bitmask' as integer bitmasks over page indices
+        """
+        if encoding not in ('list', 'bitmask'):
+            raise ValueError(f"Unknown transition encoding: {encoding}")
+        encode = pages_to_bitmask if encoding == 'bitmask' else sorted
+        self.scan_pages()
+        if self.infer_back_targets:
+            self.build_back_targets()
         self.build_transition()
-        return {
+        result = {
             'page_index': self.page_index,
             'action_index': {
                 f"({component_id}, {trigger_type})": idx 
@@ -105,27 +213,41 @@ class UIMapToFSM:
             },
             'transition': {
                 str(p): {
-                    str(a): list(next_pages)
+                    str(a): encode(next_pages)
                     for a, next_pages in page_transitions.items()
                 }
                 for p, page_transitions in self.transition.items()
             }
         }
+        if encoding == 'bitmask':
+            result['transition_encoding'] = 'bitmask'
+        return result
     
-    def save(self, output_path='fsm_transition.json'):
-        """Save the conversion result to a JSON file"""
-        result = self.convert()
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        print(f"FSM transition saved to {output_path}")
+    def save(self, output_path='fsm_transition.json', encoding='list', compact=False, use_gzip=False):
+        """Save the conversion result to a JSON file (atomically, skipped when unchanged)"""
+        result = self.convert(encoding=encoding)
+        if write_json(result, output_path, compact=compact, use_gzip=use_gzip):
+            print(f"FSM transition saved to {output_path}")
+        else:
+            print(f"FSM transition unchanged: {output_path}")
 
 if __name__ == "__main__":
+    import argparse
     # Example usage
     # 使用相对路径，确保在任何目录下运行都能找到正确的文件
     FSM_DIR = os.path.dirname(os.path.abspath(__file__))
     MAP_DIR = os.path.dirname(FSM_DIR)
     PROJECT_DIR = os.path.dirname(MAP_DIR)
-    ui_map_path = os.path.join(PROJECT_DIR, "ui_map.json")
-    fsm_transition_output = os.path.join(PROJECT_DIR, "fsm_transition.json")
-    converter = UIMapToFSM(ui_map_path)
-    converter.save(fsm_transition_output)
+    parser = argparse.ArgumentParser(description='Convert ui_map.json into fsm_transition.json')
+    parser.add_argument('--input', '-i', default=os.path.join(PROJECT_DIR, "ui_map.json"), help='UI map JSON path')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--infer-back', action='store_true', help='Fill BACK transitions from the reverse navigation graph')
+    parser.add_argument('--back-stack-depth', type=int, default=None, help='Maximum back stack depth considered when inferring BACK targets')
+    parser.add_argument('--encoding', choices=['list', 'bitmask'], default='list', help='Serialization of next-page sets')
+    parser.add_argument('--streaming', action='store_true', help='Read the UI map page by page instead of loading it whole')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+    args = parser.parse_args()
+    converter = UIMapToFSM(args.input, infer_back_targets=args.infer_back, back_stack_depth=args.back_stack_depth,
+                           streaming=args.streaming)
+    converter.save(args.output, encoding=args.encoding, compact=args.compact, use_gzip=args.gzip)
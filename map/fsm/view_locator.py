@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+View locator table for executor lookups
+
+For every action and every page the action occurs on, records where the
+component's view lives: the exact resource id name from the layout XML
+(componentIds are ViewBinding field names, so button_navigate_back becomes
+buttonNavigateBack), the layout it was declared in, the view class and its
+depth in the page's layout tree. The executor can then resolve a step with a
+single getIdentifier/findViewById instead of trying id spellings and walking
+the view tree.
+
+A page's layouts are the ViewBinding classes and R.layout references in its
+own class body (see activity_parser.page_source), expanded through <include>.
+Components of pages without a detectable layout are located only when exactly
+one layout in the sources declares a matching id; anything else is listed
+under unresolved and left to the executor's fallback search.
+
+Output format:
+{
+    'fsm_hash': sha256 of fsm_transition.json,
+    'locators': {actionId: {pageId: {'resourceId': ..., 'layout': ...,
+                                     'viewClass': ..., 'depth': ...}}},
+    'unresolved': [[pageId, componentId], ...]
+}
+"""
+
+import os
+
+from map.parser.activity_parser import parse_layout_references, parse_page_classes
+from map.utils.file_utils import (find_kotlin_files, find_xml_files, get_file_name, is_layout_file,
+                                  parse_layout_views, read_file)
+from map.utils.json_output import file_hash, load_fsm_keyed_artifact, read_json, write_json
+from map.utils.json_stream import load_pages
+
+
+def binding_field_name(resource_id):
+    """ViewBinding field name of a resource id: button_navigate_back -> buttonNavigateBack"""
+    first, *rest = resource_id.split('_')
+    return first + ''.join(part[:1].upper() + part[1:] for part in rest)
+
+
+def collect_layouts(src_dirs):
+    """
+    Parse every layout XML under the source roots
+
+    Returns:
+        dict: layout name -> parse_layout_views result (the unqualified layout/ directory wins)
+    """
+    layouts = {}
+    for src_dir in src_dirs:
+        layout_files = [path for path in find_xml_files(src_dir) if is_layout_file(path)]
+        # layout/ before layout-land/ etc.
+        for path in sorted(layout_files, key=lambda path: (os.path.basename(os.path.dirname(path)) != 'layout', path)):
+            layouts.setdefault(get_file_name(path), parse_layout_views(path))
+    return layouts
+
+
+def collect_page_layouts(src_dirs):
+    """
+    Layouts referenced by each page class
+
+    Returns:
+        dict: pageId -> [layout name, ...]
+    """
+    page_layouts = {}
+    for src_dir in src_dirs:
+        for file_path in find_kotlin_files(src_dir):
+            for activity_info, source in parse_page_classes(read_file(file_path), get_file_name(file_path)):
+                page_layouts.setdefault(activity_info['pageId'], parse_layout_references(source))
+    return page_layouts
+
+
+def layout_views(layouts, layout_name, depth_offset=0, seen=None):
+    """
+    Views of a layout with <include>d layouts expanded
+
+    Returns:
+        list: (view dict, layout name, depth in the including tree)
+    """
+    seen = set() if seen is None else seen
+    if layout_name not in layouts or layout_name in seen:
+        return []
+    seen = seen | {layout_name}
+    layout = layouts[layout_name]
+    views = [(view, layout_name, view['depth'] + depth_offset) for view in layout['views']]
+    for included, depth in layout['includes']:
+        views.extend(layout_views(layouts, included, depth_offset + depth, seen))
+    return views
+
+
+def _locator(view, layout_name, depth):
+    return {'resourceId': view['resourceId'], 'layout': layout_name, 'viewClass': view['viewClass'], 'depth': depth}
+
+
+def build_view_locators(fsm_path, ui_map_path, src_dirs, streaming=False):
+    """
+    Build the view locator table
+
+    Args:
+        fsm_path (str): FSM transition JSON path
+        ui_map_path (str): UI map JSON path
+        src_dirs (list): source roots (src/main) holding the Kotlin code and res/layout
+        streaming (bool): read the UI map page by page (bounded memory, much slower)
+
+    Returns:
+        dict: the locator table
+    """
+    fsm = read_json(fsm_path)
+    layouts = collect_layouts(src_dirs)
+    page_layouts = collect_page_layouts(src_dirs)
+
+    # ids declared in exactly one layout, for pages whose layout is unknown
+    declared = {}
+    for layout_name in layouts:
+        for view, _, depth in layout_views(layouts, layout_name):
+            declared.setdefault(binding_field_name(view['resourceId']), []).append(_locator(view, layout_name, depth))
+
+    locators = {}
+    unresolved = []
+    for page in load_pages(ui_map_path, streaming):
+        page_id = page['pageId']
+        page_views = {}
+        for layout_name in page_layouts.get(page_id, []):
+            for view, declaring_layout, depth in layout_views(layouts, layout_name):
+                page_views.setdefault(binding_field_name(view['resourceId']), _locator(view, declaring_layout, depth))
+
+        for component in page['components']:
+            component_id = component['componentId']
+            locator = page_views.get(component_id)
+            if locator is None and not page_layouts.get(page_id) and len(declared.get(component_id, [])) == 1:
+                locator = declared[component_id][0]
+            if locator is None:
+                unresolved.append([page_id, component_id])
+                continue
+            for trigger in component['triggers']:
+                action_id = fsm['action_index'].get(f"({component_id}, {trigger['triggerType']})")
+                if action_id is not None:
+                    locators.setdefault(str(action_id), {})[page_id] = locator
+
+    return {
+        'fsm_hash': file_hash(fsm_path),
+        'locators': locators,
+        'unresolved': unresolved,
+    }
+
+
+def load_view_locators(table_path, fsm_path):
+    """
+    Load a locator table, or None when it is missing or was built from another FSM
+
+    Args:
+        table_path (str): locator table path
+        fsm_path (str): FSM transition JSON the table must match
+    """
+    return load_fsm_keyed_artifact(table_path, fsm_path)
+
+
+def lookup_locator(table, action_id, page_id):
+    """Locator of an action's view on a page, or None when the executor has to search"""
+    return table['locators'].get(str(action_id), {}).get(page_id)
+
+
+if __name__ == "__main__":
+    import argparse
+    FSM_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(FSM_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='Build the view locator table (exact resource id, layout, view class, depth per action)')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='FSM transition JSON path')
+    parser.add_argument('--ui-map', default=os.path.join(PROJECT_DIR, "ui_map.json"), help='UI map JSON path')
+    parser.add_argument('--src', action='append', default=None, help='Source root (src/main), repeatable (default: app/src/main)')
+    parser.add_argument('--project', default=None, help='Gradle project root; use the src/main of every module in settings.gradle(.kts)')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "view_locators.json"), help='Locator table output path')
+    parser.add_argument('--streaming', action='store_true', help='Read the UI map page by page instead of loading it whole')
+    parser.add_argument('--compact', action='store_true', help='Write minified JSON')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output JSON')
+    args = parser.parse_args()
+
+    src_dirs = args.src or [os.path.join(PROJECT_DIR, "app", "src", "main")]
+    if args.project:
+        from map.multi_module import discover_modules
+        src_dirs = [src_dir for _, src_dir in discover_modules(args.project)]
+    table = build_view_locators(args.fsm, args.ui_map, src_dirs, streaming=args.streaming)
+    if not write_json(table, args.output, compact=args.compact, use_gzip=args.gzip):
+        print("View locator table unchanged, skipped writing")
+    entries = sum(len(pages) for pages in table['locators'].values())
+    print(f"Located {entries} (action, page) views for {len(table['locators'])} actions, "
+          f"{len(table['unresolved'])} components unresolved")
+    print(f"View locator table saved to {args.output}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+FSM资源分片打包器
+
+把增强后的fsm_transition.json拆成一个小的全局索引和按页面划分的分片，写入app的assets目录，
+设备端启动时只需解析索引，页面分片在规划经过该页面时再按需加载。
+
+目录结构（默认 app/src/main/assets/fsm/）：
+    index.json:
+    {
+        'fsm_hash': 源fsm_transition.json的SHA-256,
+        'page_index': {pageId: pageIdx},
+        'action_index': {"(componentId, triggerType)": actionId},
+        'action_page': {actionId: pageIdx},          # 目标action所在分片
+        'visible_text_index': {visibleText: [actionId, ...]},
+        'distance': [[页面间最少步数, 不可达为-1], ...],  # distance[from][to]
+        'shards': {pageIdx: 分片相对路径}
+    }
+    pages/<pageId>.json:
+    {
+        'pageId': ..., 'pageIdx': ...,
+        'transition': {actionId: [nextPageIdx, ...]},
+        'action_metadata': {actionId: {...}}
+    }
+"""
+
+import os
+from collections import deque
+
+from map.utils.json_output import file_hash, read_json, write_json
+
+INDEX_FILE = 'index.json'
+SHARD_DIR = 'pages'
+
+def build_distance_table(fsm):
+    """
+    计算所有页面对之间的最少步数（BFS）
+
+    Args:
+        fsm (dict): FSM数据（list编码）
+
+    Returns:
+        list: distance[from][to]，不可达为-1
+    """
+    page_count = len(fsm['page_index'])
+    graph = [set() for _ in range(page_count)]
+    for page_idx, actions in fsm['transition'].items():
+        for next_pages in actions.values():
+            graph[int(page_idx)].update(next_pages)
+
+    distance = []
+    for start in range(page_count):
+        row = [-1] * page_count
+        row[start] = 0
+        queue = deque([start])
+        while queue:
+            page_idx = queue.popleft()
+            for next_page_idx in graph[page_idx]:
+                if row[next_page_idx] < 0:
+                    row[next_page_idx] = row[page_idx] + 1
+                    queue.append(next_page_idx)
+        distance.append(row)
+    return distance
+
+def build_bundle(fsm, fsm_hash=None):
+    """
+    将FSM拆分为全局索引和页面分片
+
+    Args:
+        fsm (dict): 增强后的FSM数据
+        fsm_hash (str): 源文件的内容哈希
+
+    Returns:
+        tuple: (索引, {分片相对路径: 分片内容})
+    """
+    if fsm.get('transition_encoding') == 'bitmask':
+        raise ValueError("资源分片只支持list编码的transition")
+    action_metadata = fsm.get('action_metadata', {})
+    page_index = fsm['page_index']
+
+    shards = {}
+    shard_paths = {}
+    for page_id, page_idx in sorted(page_index.items(), key=lambda item: item[1]):
+        transition = fsm['transition'].get(str(page_idx), {})
+        shard_path = f"{SHARD_DIR}/{page_id}.json"
+        shard_paths[str(page_idx)] = shard_path
+        shards[shard_path] = {
+            'pageId': page_id,
+            'pageIdx': page_idx,
+            'transition': transition,
+            'action_metadata': {
+                action_id: action_metadata[action_id]
+                for action_id in transition
+                if action_id in action_metadata
+            },
+        }
+
+    action_page = {
+        action_id: page_index[metadata['page']]
+        for action_id, metadata in action_metadata.items()
+        if metadata.get('page') in page_index
+    }
+    index = {
+        'fsm_hash': fsm_hash,
+        'page_index': page_index,
+        'action_index': fsm.get('action_index', {}),
+        'action_page': action_page,
+        'visible_text_index': fsm.get('visible_text_index', {}),
+        'distance': build_distance_table(fsm),
+        'shards': shard_paths,
+    }
+    return index, shards
+
+def write_bundle(fsm_file_path, output_dir, compact=True):
+    """
+    生成分片资源并写入output_dir；已不存在的页面对应的旧分片会被删除
+
+    Args:
+        fsm_file_path (str): 增强后的fsm_transition.json路径
+        output_dir (str): 输出目录，例如 app/src/main/assets/fsm
+        compact (bool): 是否输出压缩格式（默认压缩，减小APK体积）
+
+    Returns:
+        tuple: (分片数量, 实际写入的文件数量)
+    """
+    index, shards = build_bundle(read_json(fsm_file_path), file_hash(fsm_file_path))
+
+    written = 0
+    for shard_path, shard in shards.items():
+        if write_json(shard, os.path.join(output_dir, shard_path), compact=compact):
+            written += 1
+    # 分片全部就绪后再写索引
+    if write_json(index, os.path.join(output_dir, INDEX_FILE), compact=compact):
+        written += 1
+
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    expected = {os.path.basename(shard_path) for shard_path in shards}
+    if os.path.isdir(shard_dir):
+        for file_name in os.listdir(shard_dir):
+            if file_name.endswith('.json') and file_name not in expected:
+                os.remove(os.path.join(shard_dir, file_name))
+    return len(shards), written
+
+def load_bundle_index(bundle_dir):
+    """读取分片资源的全局索引"""
+    return read_json(os.path.join(bundle_dir, INDEX_FILE))
+
+def load_page_shard(bundle_dir, index, page_idx):
+    """按需读取某个页面的分片"""
+    return read_json(os.path.join(bundle_dir, index['shards'][str(page_idx)]))
+
+def assemble_fsm(bundle_dir):
+    """
+    由索引和全部分片还原FSM（用于校验分片结果）
+
+    Args:
+        bundle_dir (str): 分片资源目录
+
+    Returns:
+        dict: 与增强后的fsm_transition.json等价的数据
+    """
+    index = load_bundle_index(bundle_dir)
+    transition = {}
+    action_metadata = {}
+    for page_idx in index['shards']:
+        shard = load_page_shard(bundle_dir, index, page_idx)
+        transition[page_idx] = shard['transition']
+        action_metadata.update(shard['action_metadata'])
+    return {
+        'page_index': index['page_index'],
+        'action_index': index['action_index'],
+        'transition': transition,
+        'action_metadata': action_metadata,
+        'visible_text_index': index['visible_text_index'],
+    }
+
+if __name__ == "__main__":
+    import argparse
+    GENERATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(GENERATOR_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='将fsm_transition.json拆分为全局索引和页面分片，写入app的assets目录')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='增强后的fsm_transition.json路径')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "app", "src", "main", "assets", "fsm"), help='分片资源输出目录')
+    parser.add_argument('--pretty', action='store_true', help='输出带缩进的JSON（默认压缩）')
+    args = parser.parse_args()
+
+    shard_count, written = write_bundle(args.fsm, args.output, compact=not args.pretty)
+    print(f"已生成 {shard_count} 个页面分片和全局索引（写入 {written} 个文件）")
+    print(f"输出目录：{args.output}")
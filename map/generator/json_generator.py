@@ -3,15 +3,17 @@
 JSON生成器，用于生成UI地图JSON文件
 """
 
-import json
+from map.utils.json_output import dump_json_bytes, write_json
 
-def generate_ui_map(pages, output_file='ui_map.json'):
+def generate_ui_map(pages, output_file='ui_map.json', compact=False, use_gzip=False):
     """
-    生成UI地图JSON文件
+    生成UI地图JSON文件（原子写入，内容未变化时不重写）
     
     Args:
         pages (list): 页面列表
         output_file (str): 输出文件路径
+        compact (bool): 是否输出压缩格式
+        use_gzip (bool): 是否进行gzip压缩
         
     Returns:
         dict: 生成的UI地图数据
@@ -22,8 +24,7 @@ def generate_ui_map(pages, output_file='ui_map.json'):
     }
     
     # 写入JSON文件
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(ui_map, f, indent=2, ensure_ascii=False)
+    write_json(ui_map, output_file, compact=compact, use_gzip=use_gzip)
     
     return ui_map
 
@@ -42,4 +43,4 @@ def generate_ui_map_string(pages):
         "pages": pages
     }
     
-    return json.dumps(ui_map, indent=2, ensure_ascii=False)
+    return dump_json_bytes(ui_map).decode('utf-8')
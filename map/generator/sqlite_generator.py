@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+SQLite导出器，将ui_map.json和fsm_transition.json写入规范化的SQLite数据库
+
+分析脚本和CI检查可以直接用SQL查询，无需把整个JSON产物加载到内存。
+所有数据在一个事务中批量插入，插入完成后再建索引；数据库先写入临时文件，再原子替换目标文件。
+
+表结构：
+    pages(page_idx, page_id, entry_point)
+    components(component_row, page_idx, component_id, view_type, semantic_role, canonical_intent, visible_text)
+    component_intent_tags(component_row, tag)
+    triggers(trigger_row, component_row, trigger_type, action_id)
+    effects(trigger_row, effect_type, target_page_id, navigation_role, interaction_role,
+            state_scope, state_key, state_delta, state_type, state_impact, is_reversible)
+    side_effects(trigger_row, type, description)
+    actions(action_id, page_idx, component_id, trigger_type, visible_text, view_type)
+    transitions(page_idx, action_id, next_page_idx)   -- next_page_idx为NULL表示动作没有确定的目标页面
+    text_entries(text, folded_text, action_id)
+    page_distance(from_page_idx, to_page_idx, depth)  -- 页面间最少步数（仅可达的页面对）
+视图：
+    reachable_pages(from_page_idx, to_page_idx)       -- 递归CTE计算的可达关系（含自身）
+    page_edges(page_idx, next_page_idx)               -- 去重后的页面转换边
+
+查询示例：
+    -- 哪些页面包含STORAGE副作用
+    SELECT DISTINCT p.page_id FROM side_effects s
+    JOIN triggers t USING (trigger_row) JOIN components c USING (component_row) JOIN pages p USING (page_idx)
+    WHERE s.type = 'STORAGE';
+
+    -- 从DoctorActivity出发3步以内可以执行的动作
+    SELECT DISTINCT a.* FROM page_distance d JOIN pages p ON p.page_idx = d.from_page_idx
+    JOIN transitions t ON t.page_idx = d.to_page_idx JOIN actions a ON a.action_id = t.action_id
+    WHERE p.page_id = 'DoctorActivity' AND d.depth < 3;
+"""
+
+import json
+import os
+import sqlite3
+
+from map.fsm.state_space import bitmask_to_pages
+from map.generator.asset_bundler import build_distance_table
+from map.utils.json_output import read_json
+from map.utils.text_normalize import fold_text
+
+SCHEMA = """
+CREATE TABLE pages (
+    page_idx INTEGER PRIMARY KEY,
+    page_id TEXT NOT NULL UNIQUE,
+    entry_point INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE components (
+    component_row INTEGER PRIMARY KEY,
+    page_idx INTEGER NOT NULL REFERENCES pages(page_idx),
+    component_id TEXT NOT NULL,
+    view_type TEXT,
+    semantic_role TEXT,
+    canonical_intent TEXT,
+    visible_text TEXT
+);
+CREATE TABLE component_intent_tags (
+    component_row INTEGER NOT NULL REFERENCES components(component_row),
+    tag TEXT NOT NULL
+);
+CREATE TABLE triggers (
+    trigger_row INTEGER PRIMARY KEY,
+    component_row INTEGER NOT NULL REFERENCES components(component_row),
+    trigger_type TEXT NOT NULL,
+    action_id INTEGER REFERENCES actions(action_id)
+);
+CREATE TABLE effects (
+    trigger_row INTEGER PRIMARY KEY REFERENCES triggers(trigger_row),
+    effect_type TEXT NOT NULL,
+    target_page_id TEXT,
+    navigation_role TEXT,
+    interaction_role TEXT,
+    state_scope TEXT,
+    state_key TEXT,
+    state_delta TEXT,
+    state_type TEXT,
+    state_impact TEXT,
+    is_reversible INTEGER
+);
+CREATE TABLE side_effects (
+    trigger_row INTEGER NOT NULL REFERENCES triggers(trigger_row),
+    type TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE actions (
+    action_id INTEGER PRIMARY KEY,
+    page_idx INTEGER REFERENCES pages(page_idx),
+    component_id TEXT NOT NULL,
+    trigger_type TEXT NOT NULL,
+    visible_text TEXT,
+    view_type TEXT
+);
+CREATE TABLE transitions (
+    page_idx INTEGER NOT NULL REFERENCES pages(page_idx),
+    action_id INTEGER NOT NULL REFERENCES actions(action_id),
+    next_page_idx INTEGER REFERENCES pages(page_idx)
+);
+CREATE TABLE text_entries (
+    text TEXT NOT NULL,
+    folded_text TEXT NOT NULL,
+    action_id INTEGER NOT NULL REFERENCES actions(action_id)
+);
+CREATE TABLE page_distance (
+    from_page_idx INTEGER NOT NULL REFERENCES pages(page_idx),
+    to_page_idx INTEGER NOT NULL REFERENCES pages(page_idx),
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (from_page_idx, to_page_idx)
+) WITHOUT ROWID;
+"""
+
+# 批量插入完成后再创建，避免插入过程中维护索引
+INDEXES = """
+CREATE INDEX idx_components_page ON components(page_idx);
+CREATE INDEX idx_components_component_id ON components(component_id);
+CREATE INDEX idx_intent_tags_tag ON component_intent_tags(tag);
+CREATE INDEX idx_intent_tags_component ON component_intent_tags(component_row);
+CREATE INDEX idx_triggers_component ON triggers(component_row);
+CREATE INDEX idx_triggers_action ON triggers(action_id);
+CREATE INDEX idx_effects_type ON effects(effect_type);
+CREATE INDEX idx_effects_target ON effects(target_page_id);
+CREATE INDEX idx_side_effects_trigger ON side_effects(trigger_row);
+CREATE INDEX idx_side_effects_type ON side_effects(type);
+CREATE INDEX idx_actions_page ON actions(page_idx);
+CREATE INDEX idx_actions_component ON actions(component_id, trigger_type);
+CREATE INDEX idx_transitions_page ON transitions(page_idx, action_id);
+CREATE INDEX idx_transitions_next ON transitions(next_page_idx);
+CREATE INDEX idx_text_entries_text ON text_entries(text);
+CREATE INDEX idx_text_entries_folded ON text_entries(folded_text);
+CREATE INDEX idx_page_distance_to ON page_distance(to_page_idx, depth);
+"""
+
+VIEWS = """
+CREATE VIEW page_edges AS
+    SELECT DISTINCT page_idx, next_page_idx FROM transitions WHERE next_page_idx IS NOT NULL;
+CREATE VIEW reachable_pages AS
+    WITH RECURSIVE reach(from_page_idx, to_page_idx) AS (
+        SELECT page_idx, page_idx FROM pages
+        UNION
+        SELECT reach.from_page_idx, page_edges.next_page_idx
+        FROM reach JOIN page_edges ON page_edges.page_idx = reach.to_page_idx
+    )
+    SELECT from_page_idx, to_page_idx FROM reach;
+"""
+
+# effect字段 -> effects表列
+EFFECT_COLUMNS = {
+    'effectType': 'effect_type',
+    'targetPageId': 'target_page_id',
+    'navigationRole': 'navigation_role',
+    'interactionRole': 'interaction_role',
+    'stateScope': 'state_scope',
+    'stateKey': 'state_key',
+    'stateDelta': 'state_delta',
+    'stateType': 'state_type',
+    'stateImpact': 'state_impact',
+    'isReversible': 'is_reversible',
+}
+
+def _page_rows(ui_map_pages, page_index):
+    """
+    合并ui_map中的页面和FSM的page_index，FSM中没有的页面顺延编号
+
+    Returns:
+        tuple: (页面行列表, {pageId: pageIdx})
+    """
+    page_index = dict(page_index)
+    entry_points = {}
+    for page in ui_map_pages:
+        entry_points[page['pageId']] = page.get('entryPoint', False)
+        if page['pageId'] not in page_index:
+            page_index[page['pageId']] = max(page_index.values(), default=-1) + 1
+    rows = [
+        (page_idx, page_id, int(bool(entry_points.get(page_id, False))))
+        for page_id, page_idx in sorted(page_index.items(), key=lambda item: item[1])
+    ]
+    return rows, page_index
+
+def _decoded_transition(fsm):
+    """transition统一为 {page_idx: {action_id: [next_page_idx, ...]}}"""
+    bitmask = fsm.get('transition_encoding') == 'bitmask'
+    return {
+        int(page_idx): {
+            int(action_id): bitmask_to_pages(next_pages) if bitmask else list(next_pages)
+            for action_id, next_pages in actions.items()
+        }
+        for page_idx, actions in fsm.get('transition', {}).items()
+    }
+
+def _insert_ui_map(conn, pages, page_index, action_index):
+    """插入组件、触发器、效果及副作用"""
+    component_row = 0
+    trigger_row = 0
+    components, tags, triggers, effects, side_effects = [], [], [], [], []
+    for page in pages:
+        for component in page.get('components', []):
+            component_row += 1
+            components.append((
+                component_row, page_index[page['pageId']], component['componentId'],
+                component.get('viewType'), component.get('semanticRole'),
+                component.get('canonicalIntent'), component.get('visibleText'),
+            ))
+            tags.extend((component_row, tag) for tag in component.get('intentTags', []))
+            for trigger in component.get('triggers', []):
+                trigger_row += 1
+                trigger_type = trigger.get('triggerType')
+                action_id = action_index.get(f"({component['componentId']}, {trigger_type})")
+                triggers.append((trigger_row, component_row, trigger_type, action_id))
+                effect = trigger.get('effect')
+                if not effect:
+                    continue
+                values = [effect.get(key) for key in EFFECT_COLUMNS]
+                effects.append((trigger_row, *values))
+                side_effects.extend(
+                    (trigger_row, side_effect.get('type'), side_effect.get('description'))
+                    for side_effect in effect.get('sideEffects', [])
+                )
+
+    conn.executemany("INSERT INTO components VALUES (?, ?, ?, ?, ?, ?, ?)", components)
+    conn.executemany("INSERT INTO component_intent_tags VALUES (?, ?)", tags)
+    conn.executemany("INSERT INTO triggers VALUES (?, ?, ?, ?)", triggers)
+    placeholders = ', '.join('?' * (len(EFFECT_COLUMNS) + 1))
+    conn.executemany(f"INSERT INTO effects VALUES ({placeholders})", effects)
+    conn.executemany("INSERT INTO side_effects VALUES (?, ?, ?)", side_effects)
+    return len(components), len(triggers)
+
+def _insert_fsm(conn, fsm, page_index):
+    """插入动作、转换、文本条目和页面距离"""
+    action_metadata = fsm.get('action_metadata', {})
+    actions = []
+    for key, action_id in fsm.get('action_index', {}).items():
+        metadata = action_metadata.get(str(action_id), {})
+        component_id, _, trigger_type = key.strip('()').partition(', ')
+        actions.append((
+            action_id, page_index.get(metadata.get('page')),
+            metadata.get('componentId', component_id), metadata.get('triggerType', trigger_type),
+            metadata.get('visibleText'), metadata.get('viewType'),
+        ))
+    conn.executemany("INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?)", actions)
+
+    transition = _decoded_transition(fsm)
+    conn.executemany("INSERT INTO transitions VALUES (?, ?, ?)", (
+        (page_idx, action_id, next_page_idx)
+        for page_idx, page_actions in transition.items()
+        for action_id, next_pages in page_actions.items()
+        for next_page_idx in (next_pages or [None])
+    ))
+
+    conn.executemany("INSERT INTO text_entries VALUES (?, ?, ?)", (
+        (text, fold_text(text), action_id)
+        for text, action_ids in fsm.get('visible_text_index', {}).items()
+        for action_id in action_ids
+    ))
+
+    distance = build_distance_table({
+        'page_index': page_index,
+        'transition': {str(page_idx): {str(a): p for a, p in page_actions.items()}
+                       for page_idx, page_actions in transition.items()},
+    })
+    conn.executemany("INSERT INTO page_distance VALUES (?, ?, ?)", (
+        (from_page_idx, to_page_idx, depth)
+        for from_page_idx, row in enumerate(distance)
+        for to_page_idx, depth in enumerate(row)
+        if depth >= 0
+    ))
+    return len(actions)
+
+def export_sqlite(ui_map_path, fsm_path, output_path):
+    """
+    将UI地图和FSM导出为SQLite数据库（原子替换output_path）
+
+    Args:
+        ui_map_path (str): ui_map.json路径
+        fsm_path (str): （增强后的）fsm_transition.json路径
+        output_path (str): 数据库输出路径
+
+    Returns:
+        dict: 各表的行数
+    """
+    fsm = read_json(fsm_path)
+    pages = read_json(ui_map_path)['pages']
+    page_rows, page_index = _page_rows(pages, fsm.get('page_index', {}))
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    temp_path = os.path.join(output_dir, '.' + os.path.basename(output_path) + '.tmp')
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    # 手动管理事务：executescript会先提交当前事务，建表在事务开始前执行，
+    # 所有插入在同一个事务中完成，提交后再建索引和视图
+    conn = sqlite3.connect(temp_path, isolation_level=None)
+    try:
+        # 临时文件写完后才替换目标文件，不需要回滚日志
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN")
+        conn.executemany("INSERT INTO pages VALUES (?, ?, ?)", page_rows)
+        _insert_fsm(conn, fsm, page_index)
+        _insert_ui_map(conn, pages, page_index, fsm.get('action_index', {}))
+        conn.execute("COMMIT")
+        conn.executescript("BEGIN;" + INDEXES + VIEWS + "ANALYZE;\nCOMMIT;")
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+        }
+    except BaseException:
+        conn.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    conn.close()
+    os.replace(temp_path, output_path)
+    return counts
+
+if __name__ == "__main__":
+    import argparse
+    GENERATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+    MAP_DIR = os.path.dirname(GENERATOR_DIR)
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='将ui_map.json和fsm_transition.json导出为规范化的SQLite数据库')
+    parser.add_argument('--ui-map', default=os.path.join(PROJECT_DIR, "ui_map.json"), help='ui_map.json路径')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='增强后的fsm_transition.json路径')
+    parser.add_argument('--output', '-o', default=os.path.join(PROJECT_DIR, "ui_map.db"), help='SQLite数据库输出路径')
+    args = parser.parse_args()
+
+    counts = export_sqlite(args.ui_map, args.fsm, args.output)
+    print("已导出: " + json.dumps(counts, ensure_ascii=False))
+    print(f"数据库已保存到 {args.output}")
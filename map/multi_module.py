@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+多模块批量构建：一次处理settings.gradle.kts中的所有Gradle模块（python -m map --project）
+
+- 从settings.gradle(.kts)的include(...)中发现模块，每个存在src/main的模块作为一个源码根目录
+- 所有模块中需要重新解析的文件提交到同一个进程池
+- 每个模块维护自己的解析缓存（.map_cache/<模块>.json），文件的(mtime, size)未变化时直接复用；
+  解析器源码变化后缓存整体失效
+- 每个模块的XML可见文本只作用于本模块的页面，避免不同模块中同名的组件ID互相覆盖
+- 指定命名规则文件时，各解析进程使用同一份规则，规则文件变化同样使缓存失效
+- 合并模式：所有模块的页面一起验证，跨模块的页面跳转在同一张地图中解析；
+  分模块模式：每个模块单独生成 <输出目录>/<模块>/ui_map.json
+"""
+
+import copy
+import glob
+import hashlib
+import os
+import re
+
+from map.extractor.component_extractor import apply_visible_text
+from map.extractor.file_extractor import parse_kotlin_file
+from map.extractor.map_validator import validate_and_enhance_map
+from map.generator.json_generator import generate_ui_map
+from map.parser.naming_rules import configure_naming_rules
+from map.utils.file_utils import find_kotlin_files, find_xml_files, parse_xml_layout
+from map.utils.json_output import file_hash, read_json, write_json
+
+MAP_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_FILES = ['settings.gradle.kts', 'settings.gradle']
+DEFAULT_CACHE_DIR = '.map_cache'
+
+def discover_modules(project_dir):
+    """
+    从settings.gradle(.kts)中发现Gradle模块
+
+    Args:
+        project_dir (str): Gradle工程根目录
+
+    Returns:
+        list: [(模块名, 源码根目录)]，只包含存在src/main目录的模块
+    """
+    for settings_name in SETTINGS_FILES:
+        settings_path = os.path.join(project_dir, settings_name)
+        if os.path.exists(settings_path):
+            break
+    else:
+        raise FileNotFoundError(f"{project_dir} 下没有settings.gradle(.kts)")
+
+    with open(settings_path, 'r', encoding='utf-8') as f:
+        # 去掉行注释，避免注释掉的include被当作模块
+        content = re.sub(r'//[^\n]*', '', f.read())
+
+    modules = []
+    for include_args in re.findall(r'\binclude\s*\(?([^)\n]*)', content):
+        for module_path in re.findall(r'["\']:?([\w\-.:]+)["\']', include_args):
+            name = module_path.replace(':', '-')
+            src_dir = os.path.join(project_dir, *module_path.split(':'), 'src', 'main')
+            if os.path.isdir(src_dir) and name not in dict(modules):
+                modules.append((name, src_dir))
+    return modules
+
+def parser_signature(naming_rules=None):
+    """解析相关源码（及命名规则文件）的哈希，解析逻辑变化时缓存随之失效"""
+    digest = hashlib.sha256()
+    source_files = sorted(
+        glob.glob(os.path.join(MAP_DIR, 'parser', '*.py'))
+        + glob.glob(os.path.join(MAP_DIR, 'extractor', '*.py'))
+        + [os.path.join(MAP_DIR, 'utils', 'file_utils.py')]
+    )
+    if naming_rules:
+        source_files.append(naming_rules)
+    for file_path in source_files:
+        digest.update(file_hash(file_path).encode('ascii'))
+    return digest.hexdigest()
+
+def parse_source_file(file_path):
+    """解析单个源文件（进程池任务）：Kotlin文件返回页面列表，XML文件返回可见文本映射"""
+    if file_path.endswith('.kt'):
+        return parse_kotlin_file(file_path)
+    return parse_xml_layout(file_path)
+
+class ModuleCache:
+    """单个模块的解析缓存：{相对路径: {'stat': [mtime_ns, size], 'result': 解析结果}}"""
+
+    def __init__(self, name, src_dir, cache_path, signature):
+        self.name = name
+        self.src_dir = src_dir
+        self.cache_path = cache_path
+        self.signature = signature
+        self.entries = {}
+        self.kotlin_files = []
+        self.xml_files = []
+        self.file_stats = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                cache = read_json(cache_path)
+            except ValueError:
+                cache = {}
+            if cache.get('signature') == signature:
+                self.entries = cache.get('files', {})
+
+    def scan(self):
+        """
+        遍历模块源码
+
+        Returns:
+            list: 需要重新解析的文件路径
+        """
+        self.kotlin_files = find_kotlin_files(self.src_dir)
+        self.xml_files = find_xml_files(self.src_dir)
+        stale = []
+        for file_path in self.kotlin_files + self.xml_files:
+            stat = os.stat(file_path)
+            self.file_stats[file_path] = [stat.st_mtime_ns, stat.st_size]
+            entry = self.entries.get(self._key(file_path))
+            if entry is None or entry['stat'] != self.file_stats[file_path]:
+                stale.append(file_path)
+        return stale
+
+    def _key(self, file_path):
+        return os.path.relpath(file_path, self.src_dir).replace(os.sep, '/')
+
+    def update(self, file_path, result):
+        self.entries[self._key(file_path)] = {'stat': self.file_stats[file_path], 'result': result}
+
+    def save(self):
+        """只保留仍然存在的文件并写出缓存"""
+        live = {self._key(file_path) for file_path in self.file_stats}
+        self.entries = {key: entry for key, entry in self.entries.items() if key in live}
+        if self.cache_path:
+            write_json({'signature': self.signature, 'files': self.entries}, self.cache_path, compact=True)
+
+    def pages(self):
+        """
+        本模块的页面（已添加本模块XML中的可见文本）
+
+        Returns:
+            list: 页面列表（缓存数据的副本）
+        """
+        pages = []
+        for file_path in self.kotlin_files:
+            pages.extend(copy.deepcopy(self.entries[self._key(file_path)]['result']))
+        component_visible_text_map = {}
+        for file_path in self.xml_files:
+            component_visible_text_map.update(self.entries[self._key(file_path)]['result'])
+        apply_visible_text(pages, component_visible_text_map)
+        return pages
+
+def parse_modules(modules, cache_dir=None, workers=None, naming_rules=None):
+    """
+    解析所有模块，缓存未命中的文件共用一个进程池
+
+    Args:
+        modules (list): [(模块名, 源码根目录)]
+        cache_dir (str): 缓存目录，None表示不使用磁盘缓存
+        workers (int): 进程数，None为CPU核数，1表示在当前进程中解析
+        naming_rules (str): 命名规则文件，None表示默认规则
+
+    Returns:
+        tuple: ([ModuleCache], 重新解析的文件数)
+    """
+    signature = parser_signature(naming_rules)
+    caches = [
+        ModuleCache(name, src_dir, os.path.join(cache_dir, f"{name}.json") if cache_dir else None, signature)
+        for name, src_dir in modules
+    ]
+    tasks = [(cache, file_path) for cache in caches for file_path in cache.scan()]
+
+    file_paths = [file_path for _, file_path in tasks]
+    if workers == 1 or len(tasks) <= 1:
+        results = [parse_source_file(file_path) for file_path in file_paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=configure_naming_rules, initargs=(naming_rules,)) as executor:
+            results = list(executor.map(parse_source_file, file_paths, chunksize=8))
+
+    for (cache, file_path), result in zip(tasks, results):
+        cache.update(file_path, result)
+    for cache in caches:
+        cache.save()
+    return caches, len(tasks)
+
+def navigation_links(module_pages):
+    """
+    统计跨模块跳转和无法解析的跳转目标
+
+    Args:
+        module_pages (dict): {模块名: 页面列表}
+
+    Returns:
+        tuple: ([(源模块, 源页面, 目标模块, 目标页面)], [(源模块, 源页面, 目标页面)])
+    """
+    page_modules = {}
+    for module_name, pages in module_pages.items():
+        for page in pages:
+            page_modules.setdefault(page['pageId'], module_name)
+
+    cross_module = []
+    unresolved = []
+    for module_name, pages in module_pages.items():
+        for page in pages:
+            for component in page['components']:
+                for trigger in component.get('triggers', []):
+                    target_page_id = (trigger.get('effect') or {}).get('targetPageId')
+                    if not target_page_id:
+                        continue
+                    target_module = page_modules.get(target_page_id)
+                    if target_module is None:
+                        unresolved.append((module_name, page['pageId'], target_page_id))
+                    elif target_module != module_name:
+                        cross_module.append((module_name, page['pageId'], target_module, target_page_id))
+    return sorted(set(cross_module)), sorted(set(unresolved))
+
+def _validate(pages, label):
+    """验证页面；存在致命错误时返回None"""
+    _, validated_pages, errors = validate_and_enhance_map(pages)
+    fatal_errors = [error for error in errors if "PAGE_TRANSITION targetPageId is empty" in error]
+    if errors:
+        print(f"\n警告：{label} 发现 {len(errors)} 个问题")
+        for error in errors:
+            print(f"- {error}")
+    if fatal_errors:
+        print(f"错误：{label} 存在致命问题，无法生成有效地图")
+        return None
+    return validated_pages
+
+def build_merged_map(module_pages, output_file, compact=False, use_gzip=False):
+    """
+    合并所有模块的页面生成一张UI地图
+
+    Returns:
+        bool: 是否生成成功
+    """
+    pages = [page for module in module_pages.values() for page in module]
+    validated_pages = _validate(pages, "合并地图")
+    if validated_pages is None:
+        return False
+    generate_ui_map(validated_pages, output_file, compact=compact, use_gzip=use_gzip)
+    print(f"合并地图：{len(validated_pages)} 个页面 -> {output_file}")
+    return True
+
+def build_module_maps(module_pages, output_dir, compact=False, use_gzip=False):
+    """
+    每个模块单独生成 <output_dir>/<模块>/ui_map.json（没有页面的模块跳过）
+
+    Returns:
+        bool: 是否全部生成成功
+    """
+    success = True
+    for module_name, pages in module_pages.items():
+        if not pages:
+            continue
+        validated_pages = _validate(pages, f"模块 {module_name}")
+        if validated_pages is None:
+            success = False
+            continue
+        output_file = os.path.join(output_dir, module_name, 'ui_map.json')
+        generate_ui_map(validated_pages, output_file, compact=compact, use_gzip=use_gzip)
+        print(f"模块 {module_name}：{len(validated_pages)} 个页面 -> {output_file}")
+    return success
+
+def build_project(project_dir, output, per_module=False, cache_dir=None, workers=None, compact=False, use_gzip=False,
+                  naming_rules=None):
+    """
+    批量构建工程中所有模块的UI地图
+
+    Args:
+        project_dir (str): Gradle工程根目录
+        output (str): 合并模式下为ui_map.json路径，分模块模式下为输出目录
+        per_module (bool): 是否按模块分别输出
+        cache_dir (str): 解析缓存目录，默认 <工程>/.map_cache
+        workers (int): 解析进程数
+        compact (bool): 是否输出压缩格式
+        use_gzip (bool): 是否进行gzip压缩
+        naming_rules (str): 命名规则文件，None表示默认规则
+
+    Returns:
+        bool: 是否生成成功
+    """
+    modules = discover_modules(project_dir)
+    print(f"发现 {len(modules)} 个模块: {', '.join(name for name, _ in modules)}")
+    if cache_dir is None:
+        cache_dir = os.path.join(project_dir, DEFAULT_CACHE_DIR)
+
+    # 当前进程中的解析和验证也使用同一份规则
+    configure_naming_rules(naming_rules)
+    caches, parsed = parse_modules(modules, cache_dir, workers, naming_rules)
+    total = sum(len(cache.file_stats) for cache in caches)
+    print(f"解析 {parsed}/{total} 个文件（其余命中缓存）")
+    module_pages = {cache.name: cache.pages() for cache in caches}
+    for cache in caches:
+        print(f"- {cache.name}: {len(cache.kotlin_files)} 个Kotlin文件, {len(cache.xml_files)} 个XML文件, {len(module_pages[cache.name])} 个页面")
+
+    cross_module, unresolved = navigation_links(module_pages)
+    for source_module, source_page, target_module, target_page in cross_module:
+        print(f"跨模块跳转: {source_module}/{source_page} -> {target_module}/{target_page}")
+    for source_module, source_page, target_page in unresolved:
+        print(f"警告：{source_module}/{source_page} 的跳转目标 {target_page} 不属于任何模块")
+
+    if per_module:
+        return build_module_maps(module_pages, output, compact=compact, use_gzip=use_gzip)
+    return build_merged_map(module_pages, output, compact=compact, use_gzip=use_gzip)
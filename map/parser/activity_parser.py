@@ -1,49 +1,328 @@
 #!/usr/bin/env python3
 """
 Activity解析器，用于从Kotlin文件中提取Activity类信息
+
+build_class_index在一次扫描中跳过字符串（含字符串模板）、注释和字符字面量，
+同时记录文件中每个class/object/interface声明的类体范围（class span），
+页面类（继承AppCompatActivity或Fragment）的组件和效果只在自己的类体内解析：
+嵌套的页面类（如Activity中的Fragment）各自成为页面，其他嵌套类（适配器、对话框等）归属外层页面，
+页面类之外的顶层代码不参与解析。
 """
 
 import re
 
-def parse_activity_class(file_content, file_name):
+PAGE_BASE_CLASSES = ('AppCompatActivity', 'Fragment')
+CLASS_KEYWORDS = ('class', 'object', 'interface')
+
+def _skip_line_comment(content, i):
+    end = content.find('\n', i)
+    return len(content) if end < 0 else end
+
+def _skip_block_comment(content, i):
+    """i指向'/*'，返回注释结束后的位置（Kotlin块注释可以嵌套）"""
+    depth = 0
+    length = len(content)
+    while i < length:
+        if content.startswith('/*', i):
+            depth += 1
+            i += 2
+        elif content.startswith('*/', i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return length
+
+def _skip_char(content, i):
+    """i指向字符字面量的起始'，返回结束后的位置"""
+    j = i + 1
+    if j < len(content) and content[j] == '\\':
+        j += 2
+    else:
+        j += 1
+    end = content.find("'", j)
+    return len(content) if end < 0 else end + 1
+
+def _skip_string(content, i):
+    """i指向字符串的起始引号（"或\"\"\"），返回字符串结束后的位置；${...}模板中的代码按代码跳过"""
+    raw = content.startswith('"""', i)
+    i += 3 if raw else 1
+    length = len(content)
+    while i < length:
+        char = content[i]
+        if raw and content.startswith('"""', i):
+            # 原始字符串可以以多个引号结尾
+            i += 3
+            while i < length and content[i] == '"':
+                i += 1
+            return i
+        if not raw and char == '"':
+            return i + 1
+        if not raw and char == '\\':
+            i += 2
+        elif content.startswith('${', i):
+            i = _skip_template(content, i + 2)
+        elif not raw and char == '\n':
+            # 未闭合的普通字符串，到行尾为止
+            return i
+        else:
+            i += 1
+    return length
+
+def _skip_template(content, i):
+    """i指向${之后的代码，返回匹配的}之后的位置"""
+    depth = 1
+    length = len(content)
+    while i < length:
+        char = content[i]
+        if content.startswith('//', i):
+            i = _skip_line_comment(content, i)
+        elif content.startswith('/*', i):
+            i = _skip_block_comment(content, i)
+        elif char == '"':
+            i = _skip_string(content, i)
+        elif char == "'":
+            i = _skip_char(content, i)
+        elif char == '{':
+            depth += 1
+            i += 1
+        elif char == '}':
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return length
+
+def _is_member_reference(content, i):
+    """关键字前面是'.'或'::'（如X::class.java），不是声明"""
+    k = i - 1
+    while k >= 0 and content[k].isspace():
+        k -= 1
+    return k >= 0 and content[k] in '.:'
+
+def _read_identifier(content, i):
+    """跳过空白后读取标识符，返回(标识符, 结束位置)，没有标识符时返回(None, i)"""
+    length = len(content)
+    while i < length and content[i].isspace():
+        i += 1
+    j = i
+    while j < length and (content[j].isalnum() or content[j] == '_'):
+        j += 1
+    return (content[i:j], j) if j > i else (None, i)
+
+def _parse_supertypes(header):
+    """从类头（类名之后、类体之前的文本）中提取父类型的简单名称"""
+    # 去掉构造函数参数、泛型参数和where约束
+    previous = None
+    while previous != header:
+        previous = header
+        header = re.sub(r'\([^()]*\)|<[^<>]*>', '', header)
+    header = re.split(r'\bwhere\b', header)[0]
+    if ':' not in header:
+        return []
+    supertypes = []
+    for supertype in header.split(':', 1)[1].split(','):
+        match = re.search(r'([\w.]+)', supertype)
+        if match:
+            supertypes.append(match.group(1).rsplit('.', 1)[-1])
+    return supertypes
+
+def build_class_index(file_content):
     """
-    从文件内容中解析Activity类信息
-    
+    一次扫描文件内容，建立类体范围索引
+
     Args:
         file_content (str): 文件内容
-        file_name (str): 文件名
-        
+
     Returns:
-        dict: Activity类信息，包含pageId、pageName、is_activity等字段；如果不是Activity类，返回None
-    """
-    # 匹配继承自AppCompatActivity或Fragment的类
-    class_pattern = re.compile(r'class\s+(\w+)\s*:\s*(AppCompatActivity|Fragment)')
-    match = class_pattern.search(file_content)
-    
-    if match:
-        class_name = match.group(1)
-        base_class = match.group(2)
-        
-        # 确定页面角色
-        if 'Main' in class_name:
-            page_role = 'ENTRY'
-        elif 'List' in class_name:
-            page_role = 'LIST'
-        elif 'Detail' in class_name:
-            page_role = 'DETAIL'
-        elif 'Edit' in class_name or 'Form' in class_name:
-            page_role = 'FORM'
-        elif 'Dialog' in class_name:
-            page_role = 'DIALOG'
+        list: 按声明顺序排列的类信息，每项包含
+            name: 类名
+            supertypes: 父类型简单名称列表
+            start, end: 类体（花括号内）的起止位置，file_content[start:end]为类体
+            parent: 外层类在列表中的下标，顶层类为None
+    """
+    spans = []
+    brace_stack = []  # 每个未闭合的'{'对应的类下标（不是类体时为None）
+    pending = None  # 已读到声明、尚未遇到类体的类
+    paren_depth = 0
+    i = 0
+    length = len(file_content)
+    while i < length:
+        char = file_content[i]
+        if file_content.startswith('//', i):
+            i = _skip_line_comment(file_content, i)
+        elif file_content.startswith('/*', i):
+            i = _skip_block_comment(file_content, i)
+        elif char == '"':
+            i = _skip_string(file_content, i)
+        elif char == "'":
+            i = _skip_char(file_content, i)
+        elif char == '`':
+            end = file_content.find('`', i + 1)
+            i = length if end < 0 else end + 1
+        elif char == '(':
+            paren_depth += 1
+            i += 1
+        elif char == ')':
+            paren_depth -= 1
+            i += 1
+        elif char == '{':
+            span_idx = None
+            if pending is not None and paren_depth == pending['paren_depth']:
+                span_idx = len(spans)
+                parent = next((idx for idx in reversed(brace_stack) if idx is not None), None)
+                spans.append({
+                    'name': pending['name'],
+                    'supertypes': _parse_supertypes(file_content[pending['header_start']:i]),
+                    'start': i + 1,
+                    'end': length,
+                    'parent': parent,
+                })
+                pending = None
+            brace_stack.append(span_idx)
+            i += 1
+        elif char == '}':
+            if brace_stack:
+                span_idx = brace_stack.pop()
+                if span_idx is not None:
+                    spans[span_idx]['end'] = i
+            # 类头括号内的'}'（如构造参数默认值中的lambda）不结束类头
+            if pending is not None and paren_depth <= pending['paren_depth']:
+                pending = None
+            i += 1
+        elif char == ';':
+            if pending is not None and paren_depth <= pending['paren_depth']:
+                pending = None
+            i += 1
+        elif char.isalpha() or char == '_':
+            j = i + 1
+            while j < length and (file_content[j].isalnum() or file_content[j] == '_'):
+                j += 1
+            word = file_content[i:j]
+            if pending is not None and paren_depth > pending['paren_depth']:
+                # 类头括号内的代码（如默认值中的object表达式）不影响类头
+                pass
+            elif word in CLASS_KEYWORDS and not _is_member_reference(file_content, i):
+                name, name_end = _read_identifier(file_content, j)
+                if name is not None and name not in CLASS_KEYWORDS:
+                    pending = {'name': name, 'header_start': name_end, 'paren_depth': paren_depth}
+                    j = name_end
+                else:
+                    # 匿名object或companion object没有类名，不作为类
+                    pending = None
+            elif pending is not None and paren_depth == pending['paren_depth'] and word in ('fun', 'val', 'var', 'init'):
+                # 没有类体的声明（如data class A(val x: Int)）到此结束
+                pending = None
+            i = j
         else:
-            # 默认角色
-            page_role = 'DETAIL'
-        
-        return {
-            'pageId': class_name,
-            'pageRole': page_role,
+            i += 1
+    return spans
+
+def _page_role(class_name):
+    """根据类名确定页面角色"""
+    if 'Main' in class_name:
+        return 'ENTRY'
+    elif 'List' in class_name:
+        return 'LIST'
+    elif 'Detail' in class_name:
+        return 'DETAIL'
+    elif 'Edit' in class_name or 'Form' in class_name:
+        return 'FORM'
+    elif 'Dialog' in class_name:
+        return 'DIALOG'
+    # 默认角色
+    return 'DETAIL'
+
+def page_source(file_content, class_index, span_idx):
+    """
+    页面类自己的代码：类体中去掉嵌套页面类的类体
+
+    Args:
+        file_content (str): 文件内容
+        class_index (list): build_class_index的结果
+        span_idx (int): 页面类在class_index中的下标
+
+    Returns:
+        str: 用于解析组件和效果的代码
+    """
+    span = class_index[span_idx]
+    segments = []
+    position = span['start']
+    for idx, nested in enumerate(class_index):
+        if idx == span_idx or not (span['start'] <= nested['start'] and nested['end'] <= span['end']):
+            continue
+        if _base_class(nested) is None or nested['start'] < position:
+            continue
+        segments.append(file_content[position:nested['start']])
+        position = nested['end']
+    segments.append(file_content[position:span['end']])
+    return ''.join(segments)
+
+def _base_class(span):
+    """页面类返回直接父类（AppCompatActivity或Fragment），否则返回None"""
+    if span['supertypes'] and span['supertypes'][0] in PAGE_BASE_CLASSES:
+        return span['supertypes'][0]
+    return None
+
+def parse_page_classes(file_content, file_name):
+    """
+    解析文件中的所有页面类
+
+    Args:
+        file_content (str): 文件内容
+        file_name (str): 文件名
+
+    Returns:
+        list: [(页面信息, 页面代码)]，页面信息同parse_activity_class，按声明顺序排列
+    """
+    class_index = build_class_index(file_content)
+    pages = []
+    for span_idx, span in enumerate(class_index):
+        base_class = _base_class(span)
+        if base_class is None:
+            continue
+        activity_info = {
+            'pageId': span['name'],
+            'pageRole': _page_role(span['name']),
             'is_activity': base_class == 'AppCompatActivity',
             'is_fragment': base_class == 'Fragment'
         }
-    
-    return None
+        pages.append((activity_info, page_source(file_content, class_index, span_idx)))
+    return pages
+
+def parse_layout_references(source):
+    """
+    页面代码中引用的布局（ViewBinding类或R.layout），按出现顺序去重
+
+    Args:
+        source (str): 页面代码（page_source的结果）
+
+    Returns:
+        list: 布局名列表，例如 ActivityThird2Binding -> activity_third2
+    """
+    # ActivityMainBinding.inflate(...) / R.layout.activity_main
+    layout_pattern = re.compile(r'\b(\w+)Binding\.(?:inflate|bind)\b|\bR\.layout\.(\w+)')
+    layouts = []
+    for binding_class, layout in layout_pattern.findall(source):
+        if not layout:
+            layout = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', binding_class).lower()
+        layouts.append(layout)
+    return list(dict.fromkeys(layouts))
+
+def parse_activity_class(file_content, file_name):
+    """
+    从文件内容中解析Activity类信息
+
+    Args:
+        file_content (str): 文件内容
+        file_name (str): 文件名
+
+    Returns:
+        dict: 文件中第一个页面类的信息，包含pageId、pageName、is_activity等字段；如果不是Activity类，返回None
+    """
+    pages = parse_page_classes(file_content, file_name)
+    return pages[0][0] if pages else None
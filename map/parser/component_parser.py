@@ -5,6 +5,8 @@
 
 import re
 
+from map.parser.naming_rules import get_naming_rules
+
 def parse_components(file_content):
     """
     从文件内容中解析所有组件信息
@@ -45,15 +47,10 @@ def parse_components(file_content):
             if trigger_type not in component_triggers[component_id]:
                 component_triggers[component_id].append(trigger_type)
     
-    # 为每个组件确定viewType和semanticRole
+    # 为每个组件确定viewType、semanticRole和intentTags（命名规则表，每个componentId只分类一次）
+    naming_rules = get_naming_rules()
     for component_id, trigger_types in component_triggers.items():
-        view_type = determine_view_type(component_id)
-        
-        # 确定semanticRole
-        semantic_role = determine_semantic_role(component_id, view_type)
-        
-        # 提取intentTags
-        intent_tags = extract_intent_tags(component_id)
+        naming = naming_rules.classify(component_id)
         
         # 构建triggers数组
         triggers = []
@@ -65,9 +62,9 @@ def parse_components(file_content):
         
         components.append({
             'componentId': component_id,
-            'viewType': view_type,
-            'semanticRole': semantic_role,
-            'intentTags': intent_tags,
+            'viewType': naming.view_type,
+            'semanticRole': naming.semantic_role,
+            'intentTags': list(naming.intent_tags),
             'triggers': triggers
         })
     
@@ -83,26 +80,7 @@ def determine_view_type(component_id):
     Returns:
         str: 组件类型
     """
-    if component_id.startswith('btn'):
-        if 'icon' in component_id.lower():
-            return 'ICON_BUTTON'
-        return 'BUTTON'
-    elif component_id.startswith('switch'):
-        return 'SWITCH'
-    elif component_id.startswith('checkbox'):
-        return 'CHECKBOX'
-    elif component_id.startswith('radio'):
-        return 'RADIO_BUTTON'
-    elif component_id.startswith('seekBar') or component_id.startswith('slider'):
-        return 'SEEKBAR'
-    elif component_id.startswith('txt'):
-        return 'TEXT_VIEW'
-    elif component_id.startswith('img'):
-        return 'IMAGE_VIEW'
-    elif component_id.endswith('Group'):
-        return 'VIEW_GROUP'
-    else:
-        return 'VIEW'
+    return get_naming_rules().classify(component_id).view_type
 
 def determine_semantic_role(component_id, view_type):
     """
@@ -115,31 +93,7 @@ def determine_semantic_role(component_id, view_type):
     Returns:
         str: 组件的semanticRole
     """
-    # INPUT 仅用于：EditText/TextField, Slider/SeekBar, Switch/Checkbox
-    input_view_types = ['SWITCH', 'CHECKBOX', 'RADIO_BUTTON', 'SEEKBAR']
-    if 'edit' in component_id.lower() or 'input' in component_id.lower():
-        return 'INPUT'
-    elif view_type in input_view_types:
-        return 'INPUT'
-    
-    # 根据组件ID关键词确定semanticRole
-    if 'btn' in component_id:
-        if 'filter' in component_id.lower():
-            return 'FILTER'
-        elif 'nav' in component_id.lower() or 'back' in component_id.lower():
-            return 'NAVIGATE'
-        else:
-            return 'ACTION'
-    elif 'filter' in component_id.lower():
-        return 'FILTER'
-    elif 'switch' in component_id.lower() or 'toggle' in component_id.lower():
-        return 'TOGGLE'
-    elif view_type in ['BUTTON', 'ICON_BUTTON']:
-        return 'ACTION'
-    elif view_type in ['TEXT_VIEW'] and 'filter' in component_id.lower():
-        return 'FILTER'
-    else:
-        return 'ACTION'
+    return get_naming_rules().semantic_role(component_id, view_type)
 
 def extract_intent_tags(component_id):
     """
@@ -151,19 +105,5 @@ def extract_intent_tags(component_id):
     Returns:
         list: intentTags列表
     """
-    tags = []
-    
-    # 拆分组件ID，提取关键词
     # 例如：taskFilterWork -> ['task', 'filter', 'work']
-    import re
-    # 使用正则表达式将驼峰命名转换为下划线命名，然后拆分
-    snake_case = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', component_id).lower()
-    parts = snake_case.split('_')
-    
-    # 添加常见的关键词
-    for part in parts:
-        if part and part not in ['btn', 'txt', 'img', 'view', 'layout', 'container', 'll', 'rl', 'fl']:
-            tags.append(part)
-    
-    # 去重
-    return list(set(tags))
+    return list(get_naming_rules().classify(component_id).intent_tags)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+组件命名规则表：根据componentId确定viewType、semanticRole和intentTags
+
+规则表是普通的字典，可以通过JSON文件按应用配置（python -m map --naming-rules rules.json），
+新的命名约定只需修改规则文件：
+- viewTypePrefixes / viewTypeSuffixes: componentId前缀/后缀 → viewType（区分大小写，前缀取最长匹配）
+- viewTypeRefinements: [{viewType, groups, to}]，命中关键词组时细化viewType（如带icon的按钮）
+- keywordGroups: {组名: [关键词]}，关键词在小写的componentId中做子串匹配
+- semanticRoles: 按顺序匹配的规则 [{groups?, contains?, viewTypes?, role}]，
+  groups/viewTypes为"任一命中"，contains为区分大小写的子串，一条规则的各条件需同时满足
+- defaultViewType / defaultSemanticRole: 都不命中时的取值
+- intentStopWords: 不作为intentTags的片段
+
+规则表编译为按长度分桶的前缀/后缀表（每种长度一次字典查找）和去重后的关键词表，
+小写只做一次；结果按componentId做有界的LRU缓存，组件解析器和地图验证器共用同一份编译结果。
+"""
+
+import functools
+import re
+from collections import namedtuple
+
+DEFAULT_NAMING_RULES = {
+    'viewTypePrefixes': {
+        'btn': 'BUTTON',
+        'switch': 'SWITCH',
+        'checkbox': 'CHECKBOX',
+        'radio': 'RADIO_BUTTON',
+        'seekBar': 'SEEKBAR',
+        'slider': 'SEEKBAR',
+        'txt': 'TEXT_VIEW',
+        'img': 'IMAGE_VIEW',
+    },
+    'viewTypeSuffixes': {
+        'Group': 'VIEW_GROUP',
+    },
+    'viewTypeRefinements': [
+        {'viewType': 'BUTTON', 'groups': ['icon'], 'to': 'ICON_BUTTON'},
+    ],
+    'defaultViewType': 'VIEW',
+    'keywordGroups': {
+        'icon': ['icon'],
+        'input': ['edit', 'input'],
+        'filter': ['filter'],
+        'navigate': ['nav', 'back'],
+        'toggle': ['switch', 'toggle'],
+        # 以下关键词组供地图验证器使用（VALIDATOR_KEYWORD_GROUPS），规则文件可以修改关键词但不能删除
+        'back': ['back'],
+        'submit': ['submit'],
+        'account': ['login', 'register'],
+        'radio': ['radio'],
+        'group': ['group'],
+    },
+    # INPUT 仅用于：EditText/TextField, Slider/SeekBar, Switch/Checkbox
+    'semanticRoles': [
+        {'groups': ['input'], 'role': 'INPUT'},
+        {'viewTypes': ['SWITCH', 'CHECKBOX', 'RADIO_BUTTON', 'SEEKBAR'], 'role': 'INPUT'},
+        {'contains': ['btn'], 'groups': ['filter'], 'role': 'FILTER'},
+        {'contains': ['btn'], 'groups': ['navigate'], 'role': 'NAVIGATE'},
+        {'contains': ['btn'], 'role': 'ACTION'},
+        {'groups': ['filter'], 'role': 'FILTER'},
+        {'groups': ['toggle'], 'role': 'TOGGLE'},
+    ],
+    'defaultSemanticRole': 'ACTION',
+    'intentStopWords': ['btn', 'txt', 'img', 'view', 'layout', 'container', 'll', 'rl', 'fl'],
+}
+
+# classify缓存的componentId数量上限（组件解析器和地图验证器先后查询同一批ID，不需要缓存全部ID）
+CLASSIFY_CACHE_SIZE = 4096
+
+# 按键合并的规则项，其余规则项整体替换
+MERGED_RULE_KEYS = ('viewTypePrefixes', 'viewTypeSuffixes', 'keywordGroups')
+
+# 地图验证器按组名判断返回/提交/单选等组件，这些关键词组必须存在且非空
+VALIDATOR_KEYWORD_GROUPS = ('back', 'submit', 'account', 'radio', 'group')
+
+# componentId的分类结果：intent_tags为元组，groups为命中的关键词组
+ComponentNaming = namedtuple('ComponentNaming', ['view_type', 'semantic_role', 'intent_tags', 'groups'])
+
+def _compile_affixes(affixes):
+    """{前缀或后缀: viewType} → [(长度, {前缀或后缀: viewType})]，按长度降序，先命中的是最长的"""
+    by_length = {}
+    for affix, view_type in affixes.items():
+        by_length.setdefault(len(affix), {})[affix] = view_type
+    return sorted(by_length.items(), reverse=True)
+
+def _match_affix(table, text, suffix=False):
+    """按长度查表匹配前缀（或后缀），每种长度一次字典查找"""
+    for length, affixes in table:
+        if length <= len(text):
+            view_type = affixes.get(text[len(text) - length:] if suffix else text[:length])
+            if view_type is not None:
+                return view_type
+    return None
+
+def _compile_keywords(entries):
+    """(关键词, 组) → ((关键词, 组集合), ...)，同一关键词只检查一次"""
+    keywords = {}
+    for keyword, group in entries:
+        keywords.setdefault(keyword, set()).add(group)
+    return tuple((keyword, frozenset(groups)) for keyword, groups in keywords.items())
+
+def merge_naming_rules(overrides):
+    """
+    将规则覆盖项合并到默认规则表
+
+    viewTypePrefixes、viewTypeSuffixes、keywordGroups按键合并（值为null时删除该键），其余规则项整体替换；
+    删除或清空地图验证器使用的关键词组（VALIDATOR_KEYWORD_GROUPS）会报错
+
+    Args:
+        overrides (dict): 规则文件内容
+
+    Returns:
+        dict: 合并后的规则表
+    """
+    unknown = set(overrides) - set(DEFAULT_NAMING_RULES)
+    if unknown:
+        raise ValueError(f"未知的命名规则项: {', '.join(sorted(unknown))}")
+    rules = {key: (dict(value) if isinstance(value, dict) else value) for key, value in DEFAULT_NAMING_RULES.items()}
+    for key, value in overrides.items():
+        if key in MERGED_RULE_KEYS:
+            for name, entry in value.items():
+                if entry is None:
+                    rules[key].pop(name, None)
+                else:
+                    rules[key][name] = entry
+        else:
+            rules[key] = value
+    missing = [group for group in VALIDATOR_KEYWORD_GROUPS if not rules['keywordGroups'].get(group)]
+    if missing:
+        raise ValueError(f"地图验证器依赖的关键词组不能删除或为空: {', '.join(missing)}")
+    return rules
+
+class NamingRules:
+    """编译后的命名规则表，classify的结果按componentId缓存（LRU，最多CLASSIFY_CACHE_SIZE个）"""
+
+    def __init__(self, rules=None):
+        rules = DEFAULT_NAMING_RULES if rules is None else rules
+        self.rules = rules
+        self._prefixes = _compile_affixes(rules['viewTypePrefixes'])
+        self._suffixes = _compile_affixes(rules['viewTypeSuffixes'])
+        self._keywords = _compile_keywords(
+            (keyword.lower(), group)
+            for group, keywords in rules['keywordGroups'].items()
+            for keyword in keywords
+        )
+        self._refinements = [
+            (refinement['viewType'], frozenset(refinement['groups']), refinement['to'])
+            for refinement in rules['viewTypeRefinements']
+        ]
+        self._role_rules = []
+        markers = set()
+        for rule in rules['semanticRoles']:
+            contains = tuple(rule.get('contains', ()))
+            markers.update(contains)
+            self._role_rules.append((
+                frozenset(rule.get('groups', ())),
+                contains,
+                frozenset(rule.get('viewTypes', ())),
+                rule['role'],
+            ))
+        # 区分大小写的子串（如btn）
+        self._markers = frozenset(markers)
+        referenced = set().union(*(groups for groups, _, _, _ in self._role_rules), *(groups for _, groups, _ in self._refinements))
+        missing = referenced - set(rules['keywordGroups'])
+        if missing:
+            raise ValueError(f"命名规则引用了未定义的关键词组: {', '.join(sorted(missing))}")
+        self._stop_words = frozenset(rules['intentStopWords'])
+        self._cached_classify = functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify)
+
+    def classify(self, component_id):
+        """
+        对componentId分类
+
+        Args:
+            component_id (str): 组件ID
+
+        Returns:
+            ComponentNaming: viewType、semanticRole、intentTags和命中的关键词组
+        """
+        return self._cached_classify(component_id)
+
+    def _classify(self, component_id):
+        lower_id = component_id.lower()
+        groups = frozenset().union(*(groups for keyword, groups in self._keywords if keyword in lower_id))
+        markers = {marker for marker in self._markers if marker in component_id}
+        view_type = self._view_type(component_id, groups)
+        semantic_role = self._semantic_role(view_type, groups, markers)
+        # 驼峰拆分，例如：taskFilterWork -> task_Filter_Work
+        parts = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', component_id).lower().split('_')
+        # 去重（保持首次出现的顺序，保证多次构建的输出一致）
+        intent_tags = tuple(part for part in dict.fromkeys(parts) if part and part not in self._stop_words)
+        return ComponentNaming(view_type, semantic_role, intent_tags, groups)
+
+    def _view_type(self, component_id, groups):
+        view_type = _match_affix(self._prefixes, component_id)
+        if view_type is None:
+            view_type = _match_affix(self._suffixes, component_id, suffix=True)
+        if view_type is None:
+            return self.rules['defaultViewType']
+        for base_view_type, refinement_groups, refined in self._refinements:
+            if view_type == base_view_type and groups & refinement_groups:
+                return refined
+        return view_type
+
+    def _semantic_role(self, view_type, groups, markers):
+        for rule_groups, contains, view_types, role in self._role_rules:
+            if rule_groups and not groups & rule_groups:
+                continue
+            if contains and not markers.intersection(contains):
+                continue
+            if view_types and view_type not in view_types:
+                continue
+            return role
+        return self.rules['defaultSemanticRole']
+
+    def semantic_role(self, component_id, view_type):
+        """按给定的viewType确定semanticRole（viewType不是由componentId推断时使用）"""
+        naming = self.classify(component_id)
+        if view_type == naming.view_type:
+            return naming.semantic_role
+        markers = {marker for marker in self._markers if marker in component_id}
+        return self._semantic_role(view_type, naming.groups, markers)
+
+_active_rules = None
+
+def load_naming_rules(path):
+    """
+    从JSON文件加载命名规则（与默认规则合并）并编译
+
+    Args:
+        path (str): 规则文件路径
+
+    Returns:
+        NamingRules: 编译后的规则表
+    """
+    from map.utils.json_output import read_json
+    return NamingRules(merge_naming_rules(read_json(path)))
+
+def configure_naming_rules(path=None):
+    """设置当前使用的命名规则；path为None时恢复默认规则"""
+    global _active_rules
+    _active_rules = load_naming_rules(path) if path else NamingRules()
+    return _active_rules
+
+def get_naming_rules():
+    """当前使用的命名规则（首次调用时编译默认规则）"""
+    global _active_rules
+    if _active_rules is None:
+        _active_rules = NamingRules()
+    return _active_rules
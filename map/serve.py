@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+FSM查询服务 - python -m map.serve
+
+常驻内存保存FSM、文本索引、页面距离表和可达性（SCC压缩后的位掩码），
+通过本地TCP端口或Unix socket以JSON lines协议应答查询，每行一个请求、一行一个响应：
+
+    {"id": 1, "op": "lookup", "text": "预约挂号"}
+    {"id": 2, "op": "next_hop", "from": "MainActivity", "to": "DoctorActivity"}
+    {"id": 3, "op": "path", "from": "MainActivity", "to": "DoctorActivity"}
+    {"id": 4, "op": "reachable", "from": "MainActivity", "to": "DoctorActivity"}
+    {"id": 5, "op": "plan", "startPage": "MainActivity", "targetVisibleText": "确认预约", "weighted": false}
+    {"id": 6, "op": "version"}
+
+响应为 {"id": ..., "result": ...} 或 {"id": ..., "error": "..."}。
+
+服务定期检查FSM文件，内容哈希变化时在后台线程构建新的快照并整体替换引用，
+正在处理的查询始终使用同一个快照，不会看到半更新的状态。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+from map.fsm.batch_planner import PlannerModel, Traversal, plan_with_traversal, plan_weighted, weighted_page_paths
+from map.fsm.fsm_analysis import condense, is_reachable
+from map.fsm.macro_planner import DistanceTable
+from map.fsm.text_index import build_ngram_index, build_normalized_key_index, find_most_similar_text, lookup_normalized
+from map.utils.json_output import file_hash, read_json
+
+DEFAULT_PORT = 8765
+DEFAULT_POLL_INTERVAL = 1.0
+# 首次查询某个起点时需要BFS/Dijkstra遍历，在线程池中执行，不阻塞其他连接
+BLOCKING_OPS = frozenset({'plan', 'path', 'next_hop'})
+# 单个请求行的长度上限（StreamReader的limit），超出时回复错误并断开连接
+MAX_LINE_BYTES = 1 << 20
+
+
+class FsmSnapshot:
+    """某一版本FSM的只读查询结构；遍历结果和距离表按需计算并缓存"""
+
+    def __init__(self, fsm, version):
+        self.version = version
+        self.model = PlannerModel(fsm)
+        self.page_ids = {page_idx: page_id for page_id, page_idx in self.model.page_index.items()}
+        self.distances = DistanceTable(self.model)
+        self.condensation = condense(fsm)
+        visible_texts = list(self.model.visible_text_index)
+        self.ngram_index = build_ngram_index(visible_texts)
+        self.normalized_index = build_normalized_key_index(visible_texts)
+        self._traversals = {}
+        self._weighted_paths = {}
+
+    def page_idx(self, page_id):
+        page_idx = self.model.page_index.get(page_id)
+        if page_idx is None:
+            raise KeyError(f"未知页面: {page_id}")
+        return page_idx
+
+    def lookup(self, text):
+        """精确匹配 → 规范化key匹配 → n-gram模糊匹配"""
+        if text in self.model.visible_text_index:
+            return {'match': 'exact', 'texts': [text], 'actions': self.model.visible_text_index[text]}
+        texts = lookup_normalized(self.normalized_index, text)
+        if texts:
+            actions = [action_id for matched in texts for action_id in self.model.visible_text_index[matched]]
+            return {'match': 'normalized', 'texts': texts, 'actions': actions}
+        similar_text = find_most_similar_text(self.ngram_index, text)
+        if similar_text is not None:
+            return {'match': 'fuzzy', 'texts': [similar_text], 'actions': self.model.visible_text_index[similar_text]}
+        return {'match': None, 'texts': [], 'actions': []}
+
+    def path(self, from_page_id, to_page_id):
+        """最短动作路径，不可达时返回None"""
+        paths = self.distances.paths_from(self.page_idx(from_page_id))
+        entry = paths.get(self.page_idx(to_page_id))
+        return None if entry is None else entry[1]
+
+    def next_hop(self, from_page_id, to_page_id):
+        """最短路径上的第一个动作及其可能到达的页面"""
+        path = self.path(from_page_id, to_page_id)
+        if not path:
+            return None
+        next_pages = dict(self.model.transition[self.page_idx(from_page_id)])[path[0]]
+        return {'actionId': path[0], 'pages': [self.page_ids[page_idx] for page_idx in next_pages]}
+
+    def reachable(self, from_page_id, to_page_id):
+        return is_reachable(self.condensation, self.page_idx(from_page_id), self.page_idx(to_page_id))
+
+    def plan(self, start_page_id, text, weighted=False):
+        """与Planner.plan（BFS）语义一致的规划；weighted时按transition_weights求最短耗时"""
+        start_page_idx = self.page_idx(start_page_id)
+        if weighted:
+            if start_page_idx not in self._weighted_paths:
+                self._weighted_paths[start_page_idx] = weighted_page_paths(self.model, start_page_idx)
+            return plan_weighted(self.model, self._weighted_paths[start_page_idx], text)
+        if start_page_idx not in self._traversals:
+            self._traversals[start_page_idx] = Traversal(self.model, start_page_idx)
+        return plan_with_traversal(self.model, self._traversals[start_page_idx], text)
+
+
+def load_snapshot(fsm_path):
+    """读取FSM文件并构建快照"""
+    version = file_hash(fsm_path)
+    return FsmSnapshot(read_json(fsm_path), version)
+
+
+def handle_query(snapshot, query):
+    """
+    执行单个查询
+
+    Args:
+        snapshot (FsmSnapshot): 当前快照
+        query: 解析后的请求，应为JSON对象
+
+    Returns:
+        dict: 响应
+    """
+    if not isinstance(query, dict):
+        return {'id': None, 'error': "请求必须是JSON对象"}
+    response = {'id': query.get('id')}
+    op = query.get('op')
+    try:
+        if op == 'lookup':
+            result = snapshot.lookup(query['text'])
+        elif op == 'next_hop':
+            result = snapshot.next_hop(query['from'], query['to'])
+        elif op == 'path':
+            result = snapshot.path(query['from'], query['to'])
+        elif op == 'reachable':
+            result = snapshot.reachable(query['from'], query['to'])
+        elif op == 'plan':
+            result = snapshot.plan(query['startPage'], query['targetVisibleText'], query.get('weighted', False))
+        elif op == 'version':
+            result = snapshot.version
+        else:
+            raise ValueError(f"未知操作: {op}")
+    except (KeyError, TypeError, ValueError) as e:
+        response['error'] = str(e.args[0]) if e.args else repr(e)
+        return response
+    response['result'] = result
+    return response
+
+
+async def send_response(writer, response):
+    """写出一行JSON响应"""
+    writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+    await writer.drain()
+
+
+class FsmServer:
+    """JSON lines查询服务，FSM文件内容变化时热加载"""
+
+    def __init__(self, fsm_path, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.fsm_path = fsm_path
+        self.poll_interval = poll_interval
+        self.snapshot = load_snapshot(fsm_path)
+        self._stat = self._file_stat()
+
+    def _file_stat(self):
+        stat = os.stat(self.fsm_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    async def watch(self):
+        """轮询FSM文件：先比较mtime和大小，变化时再比较内容哈希"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                stat = self._file_stat()
+                if stat == self._stat:
+                    continue
+                version = await loop.run_in_executor(None, file_hash, self.fsm_path)
+                if version == self.snapshot.version:
+                    self._stat = stat
+                    continue
+                snapshot = await loop.run_in_executor(None, load_snapshot, self.fsm_path)
+            except (OSError, ValueError) as e:
+                # 文件正在被替换或内容不完整，保留旧快照，下次轮询再试
+                print(f"重新加载FSM失败: {e}")
+                continue
+            # 单次引用赋值，查询要么看到旧快照要么看到新快照
+            self._stat = stat
+            self.snapshot = snapshot
+            print(f"已重新加载FSM，版本 {snapshot.version[:12]}")
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 请求行超过MAX_LINE_BYTES，无法再按行对齐后续请求
+                    await send_response(writer, {'id': None, 'error': f"请求行超过 {MAX_LINE_BYTES} 字节"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    query = json.loads(line)
+                except ValueError as e:
+                    # JSONDecodeError或非UTF-8的请求行（UnicodeDecodeError）
+                    response = {'id': None, 'error': f"无效的JSON: {e}"}
+                else:
+                    if isinstance(query, dict) and query.get('op') in BLOCKING_OPS:
+                        response = await loop.run_in_executor(None, handle_query, self.snapshot, query)
+                    else:
+                        response = handle_query(self.snapshot, query)
+                await send_response(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path, limit=MAX_LINE_BYTES)
+            address = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+            address = f"{host}:{port}"
+        print(f"FSM查询服务已启动: {address}，版本 {self.snapshot.version[:12]}")
+        watcher = asyncio.create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def main():
+    MAP_DIR = os.path.dirname(os.path.abspath(__file__))
+    PROJECT_DIR = os.path.dirname(MAP_DIR)
+    parser = argparse.ArgumentParser(description='FSM查询服务（JSON lines）')
+    parser.add_argument('--fsm', default=os.path.join(PROJECT_DIR, "fsm_transition.json"), help='fsm_transition.json文件路径')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址，默认127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'监听端口，默认{DEFAULT_PORT}')
+    parser.add_argument('--unix', default=None, help='Unix socket路径，指定后忽略--host/--port')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help='检查FSM文件变化的间隔（秒）')
+    args = parser.parse_args()
+
+    server = FsmServer(args.fsm, args.poll_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("FSM查询服务已停止")
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@
 """
 
 import os
-import xml.etree.ElementTree as ET
 
 def find_kotlin_files(directory):
     """
@@ -85,6 +84,9 @@ def parse_xml_layout(xml_file_path):
     Returns:
         dict: 组件ID到visibleText的映射
     """
+    # ElementTree导入较慢，只在实际解析布局时加载
+    import xml.etree.ElementTree as ET
+
     component_visible_text = {}
     
     try:
@@ -124,6 +126,49 @@ def parse_xml_layout(xml_file_path):
     
     return component_visible_text
 
+def is_layout_file(xml_file_path):
+    """判断XML文件是否位于res/layout（含layout-land等限定符目录）下"""
+    return os.path.basename(os.path.dirname(xml_file_path)).startswith('layout')
+
+def parse_layout_views(xml_file_path):
+    """
+    解析XML布局文件中带android:id的View及其在布局树中的位置
+
+    Args:
+        xml_file_path (str): XML布局文件路径
+
+    Returns:
+        dict: {
+            'layout': 布局名（文件名，不含扩展名）,
+            'views': [{'resourceId': @+id/之后的名称, 'viewClass': 标签名, 'depth': 深度（根元素为0）}],
+            'includes': [[被include的布局名, include标签的深度]]
+        }
+    """
+    # ElementTree导入较慢，只在实际解析布局时加载
+    import xml.etree.ElementTree as ET
+
+    ANDROID_NS = '{http://schemas.android.com/apk/res/android}'
+    layout = {'layout': get_file_name(xml_file_path), 'views': [], 'includes': []}
+    try:
+        root = ET.parse(xml_file_path).getroot()
+    except Exception as e:
+        print(f"Error parsing XML file {xml_file_path}: {e}")
+        return layout
+
+    # 按文档顺序遍历，同时记录深度
+    stack = [(root, 0)]
+    while stack:
+        element, depth = stack.pop()
+        if element.tag == 'include':
+            included = element.attrib.get('layout', '')
+            if included.startswith('@layout/'):
+                layout['includes'].append([included[len('@layout/'):], depth])
+        android_id = element.attrib.get(f'{ANDROID_NS}id', '')
+        if android_id.startswith('@+id/'):
+            layout['views'].append({'resourceId': android_id[5:], 'viewClass': element.tag, 'depth': depth})
+        stack.extend((child, depth + 1) for child in reversed(list(element)))
+    return layout
+
 def parse_all_xml_layouts(xml_files):
     """
     解析所有XML布局文件，合并组件的visibleText映射
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+JSON产物输出层
+
+所有生成的JSON产物（ui_map.json、fsm_transition.json等）统一通过write_json写出：
+- 支持格式化（indent=2）或压缩（无空白）两种输出
+- 先写入同目录下的临时文件，再原子重命名，写入中途崩溃不会损坏原文件
+- 内容哈希未变化时跳过写入，文件的mtime保持不变
+- 可选gzip压缩，用于缩小APK中的asset
+
+gzip、hashlib和tempfile在实际压缩/计算哈希/写入时才导入，只读取JSON的查询工具不承担其导入开销。
+"""
+
+import json
+import os
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def dump_json_bytes(data, compact=False, use_gzip=False):
+    """
+    将数据序列化为JSON字节串
+
+    Args:
+        data: 要序列化的数据
+        compact (bool): 是否输出压缩格式
+        use_gzip (bool): 是否进行gzip压缩
+
+    Returns:
+        bytes: 序列化结果
+    """
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    content = text.encode('utf-8')
+    if use_gzip:
+        import gzip
+        # mtime固定为0，保证相同内容得到相同的压缩结果
+        content = gzip.compress(content, mtime=0)
+    return content
+
+def content_hash(content):
+    """计算内容的SHA-256哈希"""
+    import hashlib
+    return hashlib.sha256(content).hexdigest()
+
+def file_hash(file_path):
+    """计算文件内容的SHA-256哈希，文件不存在时返回None"""
+    if not os.path.exists(file_path):
+        return None
+    import hashlib
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_fsm_keyed_artifact(artifact_path, fsm_path):
+    """
+    读取以FSM内容哈希（fsm_hash字段）标记的产物，如规划缓存、页面指纹索引、View定位表
+
+    这些产物单独成文件，不写入fsm_transition.json（Kotlin端严格反序列化）。
+
+    Args:
+        artifact_path (str): 产物路径
+        fsm_path (str): 产物必须对应的fsm_transition.json路径
+
+    Returns:
+        dict: 产物内容；文件不存在或由其他版本的FSM生成时返回None
+    """
+    if not os.path.exists(artifact_path):
+        return None
+    artifact = read_json(artifact_path)
+    if artifact.get('fsm_hash') != file_hash(fsm_path):
+        return None
+    return artifact
+
+def write_bytes_atomic(content, output_path):
+    """
+    通过临时文件和原子重命名写入字节内容；内容未变化时跳过写入
+
+    Args:
+        content (bytes): 要写入的内容
+        output_path (str): 输出文件路径
+
+    Returns:
+        bool: 是否实际写入了文件
+    """
+    if file_hash(output_path) == content_hash(content):
+        return False
+
+    import tempfile
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix='.' + os.path.basename(output_path) + '.', suffix='.tmp')
+    try:
+        # mkstemp创建的文件权限为0600，改为与原文件（或默认umask）一致
+        if os.path.exists(output_path):
+            mode = os.stat(output_path).st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
+
+def write_json(data, output_path, compact=False, use_gzip=False):
+    """
+    原子写出JSON产物；内容哈希未变化时跳过写入
+
+    Args:
+        data: 要写出的数据
+        output_path (str): 输出文件路径
+        compact (bool): 是否输出压缩格式（默认indent=2格式化输出）
+        use_gzip (bool): 是否进行gzip压缩
+
+    Returns:
+        bool: 是否实际写入了文件
+    """
+    return write_bytes_atomic(dump_json_bytes(data, compact, use_gzip), output_path)
+
+def is_gzip_file(file_path):
+    """判断文件是否为gzip压缩格式"""
+    with open(file_path, 'rb') as f:
+        return f.read(2) == GZIP_MAGIC
+
+def open_json_text(file_path):
+    """
+    以文本方式打开JSON文件，自动识别gzip压缩
+
+    Args:
+        file_path (str): 文件路径
+
+    Returns:
+        文本流
+    """
+    if is_gzip_file(file_path):
+        import gzip
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    return open(file_path, 'r', encoding='utf-8')
+
+def read_json(file_path):
+    """读取JSON文件（可以是gzip压缩的）"""
+    with open_json_text(file_path) as f:
+        return json.load(f)
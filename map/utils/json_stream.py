@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+流式JSON读取工具，不依赖第三方库
+
+对大型ui_map.json按页面逐个读取，任一时刻只有当前页面对象驻留内存：
+- JsonTokenizer：基于分块缓冲（或内存映射）的增量JSON词法分析器
+- iter_json_array：逐个产出指定路径下数组的元素
+- iter_pages：逐个产出ui_map.json中的页面
+- load_pages：默认用json.load整体读取页面，streaming时改用iter_pages
+
+纯Python的词法分析比json.load慢约10倍，只在需要有界内存时使用流式读取。
+"""
+
+import codecs
+import functools
+import json
+import mmap
+
+from map.utils.json_output import is_gzip_file, open_json_text, read_json
+
+_LITERALS = {'true': True, 'false': False, 'null': None}
+_PUNCTUATION = '{}[]:,'
+
+@functools.lru_cache(maxsize=None)
+def _token_patterns():
+    """词法正则在首次分词时才编译（导入本模块时不加载re）"""
+    import re
+    whitespace = re.compile(r'[ \t\n\r]*')
+    string = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+    number = re.compile(r'[-+0-9.eE]+')
+    return whitespace, string, number
+
+class JsonTokenizer:
+    """
+    增量JSON词法分析器
+
+    逐个产出(kind, value)词法单元，kind取值：
+    '{', '}', '[', ']', ':', ',', 'string', 'number', 'literal'
+    """
+
+    def __init__(self, stream, chunk_size=65536):
+        """
+        Args:
+            stream: 文本流（具有read(size)方法）
+            chunk_size (int): 每次读取的字符数
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """读取下一块数据，丢弃已消费的缓冲区；读到文件末尾返回False"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _match(self, pattern):
+        """在当前位置匹配正则；若匹配可能被块边界截断则继续读取"""
+        while True:
+            match = pattern.match(self.buffer, self.pos)
+            if match and (match.end() < len(self.buffer) or self.eof):
+                return match
+            if not self._fill():
+                return pattern.match(self.buffer, self.pos)
+
+    def __iter__(self):
+        whitespace, string, number = _token_patterns()
+        while True:
+            self.pos = self._match(whitespace).end()
+            if self.pos >= len(self.buffer) and not self._fill():
+                return
+            char = self.buffer[self.pos]
+            if char in _PUNCTUATION:
+                self.pos += 1
+                yield char, None
+            elif char == '"':
+                match = self._match(string)
+                if not match:
+                    raise ValueError(f"Unterminated JSON string near: {self.buffer[self.pos:self.pos + 40]!r}")
+                self.pos = match.end()
+                yield 'string', json.loads(match.group(0))
+            elif char == '-' or char.isdigit():
+                match = self._match(number)
+                self.pos = match.end()
+                text = match.group(0)
+                try:
+                    yield 'number', float(text) if any(c in text for c in '.eE') else int(text)
+                except ValueError:
+                    raise ValueError(f"Invalid JSON number: {text!r}") from None
+            else:
+                while len(self.buffer) - self.pos < 5 and self._fill():
+                    pass
+                for literal, value in _LITERALS.items():
+                    if self.buffer.startswith(literal, self.pos):
+                        self.pos += len(literal)
+                        yield 'literal', value
+                        break
+                else:
+                    raise ValueError(f"Invalid JSON token near: {self.buffer[self.pos:self.pos + 40]!r}")
+
+def _build_value(tokens, kind, value):
+    """从词法单元流中构建一个完整的JSON值（非递归）"""
+    if kind not in ('{', '['):
+        return value
+
+    root = {} if kind == '{' else []
+    stack = [root]
+    key = None
+    for kind, value in tokens:
+        container = stack[-1]
+        if kind in (',', ':'):
+            continue
+        if kind in ('}', ']'):
+            stack.pop()
+            if not stack:
+                return root
+            continue
+        if isinstance(container, dict) and key is None:
+            key = value
+            continue
+        if kind in ('{', '['):
+            child = {} if kind == '{' else []
+        else:
+            child = value
+        if isinstance(container, dict):
+            container[key] = child
+            key = None
+        else:
+            container.append(child)
+        if kind in ('{', '['):
+            stack.append(child)
+    raise ValueError("Unexpected end of JSON input")
+
+def _skip_value(tokens, kind):
+    """跳过一个JSON值，不构建对象"""
+    if kind not in ('{', '['):
+        return
+    depth = 1
+    for kind, _ in tokens:
+        if kind in ('{', '['):
+            depth += 1
+        elif kind in ('}', ']'):
+            depth -= 1
+            if depth == 0:
+                return
+
+def iter_json_array(stream, path, chunk_size=65536):
+    """
+    流式产出JSON文档中指定路径下数组的各个元素
+
+    Args:
+        stream: 文本流
+        path (tuple): 从根对象到目标数组的键路径，例如('pages',)
+        chunk_size (int): 每次读取的字符数
+
+    Returns:
+        generator: 数组元素
+    """
+    tokens = iter(JsonTokenizer(stream, chunk_size))
+    kind, value = next(tokens)
+    for depth, expected_key in enumerate(path):
+        if kind != '{':
+            raise ValueError(f"Expected an object at {'.'.join(path[:depth]) or '<root>'}")
+        # 在当前对象中查找目标键，跳过其它键的值
+        for kind, value in tokens:
+            if kind == '}':
+                return
+            if kind != 'string':
+                continue
+            key = value
+            next(tokens)  # ':'
+            kind, value = next(tokens)
+            if key == expected_key:
+                break
+            _skip_value(tokens, kind)
+        else:
+            return
+
+    if kind != '[':
+        raise ValueError(f"Expected an array at {'.'.join(path)}")
+    for kind, value in tokens:
+        if kind == ']':
+            return
+        if kind == ',':
+            continue
+        yield _build_value(tokens, kind, value)
+
+def iter_pages(ui_map_file_path, use_mmap=False, chunk_size=65536):
+    """
+    逐个读取ui_map.json中的页面，只有当前页面驻留内存
+
+    Args:
+        ui_map_file_path (str): ui_map.json文件路径
+        use_mmap (bool): 是否通过内存映射读取文件（gzip压缩的文件忽略此参数）
+        chunk_size (int): 每次读取的字符数
+
+    Returns:
+        generator: 页面字典
+    """
+    if use_mmap and not is_gzip_file(ui_map_file_path):
+        with open(ui_map_file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                stream = codecs.getreader('utf-8')(mapped)
+                yield from iter_json_array(stream, ('pages',), chunk_size)
+    else:
+        with open_json_text(ui_map_file_path) as f:
+            yield from iter_json_array(f, ('pages',), chunk_size)
+
+def load_pages(ui_map_file_path, streaming=False):
+    """
+    读取ui_map.json中的页面
+
+    Args:
+        ui_map_file_path (str): ui_map.json文件路径
+        streaming (bool): 是否逐页流式读取（内存有界，但比json.load慢得多）
+
+    Returns:
+        iterator: 页面字典
+    """
+    if streaming:
+        return iter_pages(ui_map_file_path)
+    return iter(read_json(ui_map_file_path)['pages'])
+
+def iter_json_lines(file_paths):
+    """
+    逐行读取JSON lines文件（支持gzip），跳过空行
+
+    Args:
+        file_paths (iterable): 文件路径列表
+
+    Returns:
+        generator: 每行解析后的对象
+    """
+    for file_path in file_paths:
+        with open_json_text(file_path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+离线拼音表与繁简对照表
+
+只覆盖应用界面标签中出现的汉字和常见界面用字；拼音为无声调形式，
+多音字取界面中最常见的读音（例如"长按"中的"长"取chang）。
+新应用出现未收录的汉字时，直接在下表中补充即可。
+"""
+
+# 汉字 → 无声调拼音
+_PINYIN_SOURCE = """
+一yi 二er 三san 四si 五wu 六liu 七qi 八ba 九jiu 十shi 零ling
+上shang 下xia 左zuo 右you 前qian 后hou 中zhong 大da 小xiao 多duo 全quan 部bu
+专zhuan 个ge 主zhu 产chan 人ren 任ren 住zhu 体ti 作zuo 儿er 关guan 内nei 创chuang
+删shan 到dao 副fu 办ban 务wu 区qu 医yi 午wu 取qu 口kou 号hao 喉hou 回hui 图tu
+域yu 复fu 外wai 妇fu 完wan 家jia 就jiu 层ceng 工gong 已yi 师shi 建jian 开kai 待dai
+心xin 急ji 性xing 慢man 成cheng 择ze 挂gua 按an 搜sou 操cao 新xin 日ri 普pu 期qi
+查cha 标biao 检jian 治zhi 消xiao 生sheng 病bing 皮pi 看kan 眼yan 确que 神shen 科ke
+第di 管guan 索suo 紧jin 约yue 级ji 经jing 编bian 耳er 肤fu 腔qiang 血xue 认ren 诊zhen
+跳tiao 转zhuan 辑ji 返fan 选xuan 通tong 钮niu 长chang 门men 院yuan 除chu 项xiang
+预yu 鼻bi
+定ding 设she 置zhi 登deng 录lu 注zhu 册ce 首shou 页ye 我wo 的de 提ti 交jiao 保bao
+存cun 详xiang 情qing 列lie 表biao 退tui 出chu 分fen 享xiang 帮bang 助zhu 信xin 息xi
+改gai 密mi 码ma 用yong 户hu 名ming 支zhi 付fu 订ding 单dan 购gou 物wu 车che 收shou
+藏cang 更geng 步bu 发fa 送song 刷shua 加jia 载zai 添tian 请qing 输shu 入ru 时shi
+间jian 星xing 晚wan 服fu 客ke 电dian 话hua 地di 址zhi 位wei 文wen 件jian 夹jia
+照zhao 片pian 视shi 频pin 音yin 乐yue 声sheng 亮liang 度du 网wang 络luo 蓝lan 牙ya
+系xi 统tong 版ban 本ben 于yu 隐yin 私si 安an 账zhang 帐zhang 切qie 换huan 语yu 言yan
+进jin 打da 印yin 制zhi 粘zhan 贴tie 剪jian 撤che 销xiao 重chong 试shi 错cuo 误wu
+功gong 失shi 败bai 等deng 状zhuang 态tai 护hu 士shi 药yao 房fang 费fei 缴jiao 报bao
+告gao 结jie 果guo 排pai 队dui 候hou 是shi 否fou 好hao 了le 在zai 有you 无wu 不bu
+灭mie 实shi 为wei
+"""
+
+# 繁体 → 简体
+_TRADITIONAL_SOURCE = """
+預预 約约 掛挂 號号 層层 級级 確确 認认 醫医 診诊 專专 門门 內内 經经 產产 婦妇
+兒儿 膚肤 圖图 標标 鈕钮 長长 選选 擇择 開开 關关 刪删 編编 輯辑 務务 創创 緊紧
+個个 體体 檢检 轉转 複复 復复 區区 項项 師师 發发 設设 錄录 註注 冊册 頁页 詳详
+單单 訂订 購购 車车 時时 間间 電电 話话 網网 絡络 統统 帳帐 賬账 換换 語语 後后
+進进 試试 錯错 誤误 敗败 態态 狀状 護护 藥药 費费 繳缴 報报 結结 隊队 請请 輸输
+載载 聲声 視视 頻频 樂乐 藍蓝 係系 銷销 貼贴 幫帮 戶户 碼码 滅灭 實实 為为
+"""
+
+PINYIN_TABLE = {
+    entry[0]: entry[1:]
+    for entry in _PINYIN_SOURCE.split()
+}
+
+TRADITIONAL_TO_SIMPLIFIED = {
+    entry[0]: entry[1]
+    for entry in _TRADITIONAL_SOURCE.split()
+}
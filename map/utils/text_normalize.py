@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+中文标签规范化工具
+
+为visibleText和用户输入生成可直接做哈希匹配的规范化key：
+- fold_text：全角/半角折叠（NFKC）、去声调、转小写、去空白、繁体转简体
+- to_pinyin：无声调全拼，例如 预约挂号 → yuyueguahao
+- pinyin_initials：拼音首字母，例如 预约挂号 → yygh
+"""
+
+import unicodedata
+
+from map.utils.pinyin_table import PINYIN_TABLE, TRADITIONAL_TO_SIMPLIFIED
+
+def fold_text(text):
+    """
+    折叠文本：NFKC、去掉拉丁字母的声调符号、转小写、去空白、繁体转简体
+
+    Args:
+        text (str): 原始文本
+
+    Returns:
+        str: 折叠后的文本
+    """
+    text = unicodedata.normalize('NFKC', text)
+    # NFD分解后去掉组合附加符号（pinyin声调），汉字不受影响
+    text = ''.join(
+        char for char in unicodedata.normalize('NFD', text)
+        if not unicodedata.combining(char)
+    )
+    text = unicodedata.normalize('NFC', text).lower()
+    return ''.join(TRADITIONAL_TO_SIMPLIFIED.get(char, char) for char in text if not char.isspace())
+
+def to_pinyin(text):
+    """
+    将折叠后的文本转换为无声调全拼；拼音表中没有的字符原样保留
+
+    Args:
+        text (str): fold_text处理后的文本
+
+    Returns:
+        str: 拼音串
+    """
+    return ''.join(PINYIN_TABLE.get(char, char) for char in text)
+
+def pinyin_initials(text):
+    """
+    将折叠后的文本转换为拼音首字母；拼音表中没有的字符原样保留
+
+    Args:
+        text (str): fold_text处理后的文本
+
+    Returns:
+        str: 首字母串
+    """
+    return ''.join(PINYIN_TABLE[char][0] if char in PINYIN_TABLE else char for char in text)
+
+def has_pinyin(text):
+    """判断文本中是否含有可转换为拼音的汉字"""
+    return any(char in PINYIN_TABLE for char in text)
+
+def normalized_keys(text):
+    """
+    生成文本的全部规范化key
+
+    Args:
+        text (str): 原始文本
+
+    Returns:
+        dict: {'folded': ..., 'pinyin': ..., 'initials': ...}；不含汉字时只有folded
+    """
+    folded = fold_text(text)
+    keys = {'folded': folded}
+    if has_pinyin(folded):
+        keys['pinyin'] = to_pinyin(folded)
+        keys['initials'] = pinyin_initials(folded)
+    return keys
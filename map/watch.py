@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+监听模式：源码变化时增量重建UI地图和FSM产物（python -m map --watch）
+
+- 每个Kotlin/XML文件的解析结果按文件缓存，文件的(mtime, size)变化时才重新解析
+- Linux下通过inotify（ctypes直接调用libc，无额外依赖）等待变化，其他平台退化为stat轮询
+- 一连串保存操作在debounce时间内合并为一次重建
+- 重建时用缓存的解析结果拼出页面列表，依次写出ui_map.json、fsm_transition.json，
+  并同步到app/src/main/assets（完整的fsm_transition.json、页面指纹索引、View定位表和fsm/下的分片资源）；
+  所有文件都原子写入，内容未变化时不改动
+"""
+
+import copy
+import ctypes
+import os
+import select
+import sys
+import time
+
+from map.extractor.component_extractor import apply_visible_text
+from map.extractor.file_extractor import parse_kotlin_file
+from map.extractor.map_validator import validate_and_enhance_map
+from map.fsm.enhance_fsm_transition import enhance_fsm_transition
+from map.fsm.page_fingerprint import build_page_fingerprints
+from map.fsm.ui_map_to_fsm import UIMapToFSM
+from map.fsm.view_locator import build_view_locators
+from map.generator.asset_bundler import write_bundle
+from map.generator.json_generator import generate_ui_map
+from map.utils.file_utils import find_kotlin_files, find_xml_files, parse_xml_layout
+from map.utils.json_output import write_json
+
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_POLL_INTERVAL = 0.5
+# MainActivity从assets读取的文件名
+FSM_ASSET_NAME = 'fsm_transition.json'
+# 分片资源目录（索引 + 每个页面一个分片）
+FSM_BUNDLE_DIR = 'fsm'
+# 页面指纹索引（设备端识别当前页面）
+PAGE_FINGERPRINTS_NAME = 'page_fingerprints.json'
+# View定位表（执行器按action直接查找View）
+VIEW_LOCATORS_NAME = 'view_locators.json'
+
+class IncrementalBuilder:
+    """按文件缓存解析结果的UI地图/FSM构建器"""
+
+    def __init__(self, src_dir, ui_map_output, fsm_output, assets_dir=None, compact=False, use_gzip=False):
+        self.src_dir = src_dir
+        self.ui_map_output = ui_map_output
+        self.fsm_output = fsm_output
+        self.assets_dir = assets_dir
+        self.compact = compact
+        self.use_gzip = use_gzip
+        self.kotlin_files = []
+        self.xml_files = []
+        self.file_stats = {}
+        self.kotlin_pages = {}
+        self.xml_texts = {}
+
+    def scan(self):
+        """
+        遍历源码目录
+
+        Returns:
+            tuple: (kotlin文件列表, xml文件列表, {文件路径: (mtime_ns, size)})
+        """
+        kotlin_files = find_kotlin_files(self.src_dir)
+        xml_files = find_xml_files(self.src_dir)
+        file_stats = {}
+        for file_path in kotlin_files + xml_files:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            file_stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return kotlin_files, xml_files, file_stats
+
+    def has_changes(self):
+        return self.scan()[2] != self.file_stats
+
+    def update(self):
+        """
+        重新解析变化的文件，丢弃已删除文件的缓存
+
+        Returns:
+            list: 变化（新增、修改、删除）的文件路径
+        """
+        kotlin_files, xml_files, file_stats = self.scan()
+        changed = [path for path, stat in file_stats.items() if self.file_stats.get(path) != stat]
+        removed = [path for path in self.file_stats if path not in file_stats]
+
+        for file_path in changed:
+            if file_path.endswith('.kt'):
+                self.kotlin_pages[file_path] = parse_kotlin_file(file_path)
+            else:
+                self.xml_texts[file_path] = parse_xml_layout(file_path)
+        for file_path in removed:
+            self.kotlin_pages.pop(file_path, None)
+            self.xml_texts.pop(file_path, None)
+
+        self.kotlin_files = [path for path in kotlin_files if path in file_stats]
+        self.xml_files = [path for path in xml_files if path in file_stats]
+        self.file_stats = file_stats
+        return changed + removed
+
+    def build(self):
+        """
+        用缓存的解析结果生成ui_map.json和FSM产物
+
+        Returns:
+            bool: 是否生成成功
+        """
+        # validate_and_enhance_map会修改页面，使用缓存的副本
+        pages = [copy.deepcopy(page) for path in self.kotlin_files for page in self.kotlin_pages.get(path, [])]
+        component_visible_text_map = {}
+        for file_path in self.xml_files:
+            component_visible_text_map.update(self.xml_texts.get(file_path, {}))
+        apply_visible_text(pages, component_visible_text_map)
+
+        _, validated_pages, errors = validate_and_enhance_map(pages)
+        fatal_errors = [error for error in errors if "PAGE_TRANSITION targetPageId is empty" in error]
+        if fatal_errors:
+            print("错误：存在致命问题，无法生成有效地图")
+            for error in fatal_errors:
+                print(f"- {error}")
+            return False
+
+        generate_ui_map(validated_pages, self.ui_map_output, compact=self.compact, use_gzip=self.use_gzip)
+        # 在内存中转换并增强，fsm_transition.json只写一次
+        fsm_data = UIMapToFSM(self.ui_map_output).convert()
+        fsm_data = enhance_fsm_transition(self.fsm_output, self.ui_map_output, compact=self.compact,
+                                          use_gzip=self.use_gzip, fsm_data=fsm_data)
+
+        if self.assets_dir:
+            # MainActivity按普通JSON读取asset，--gzip只作用于fsm_output
+            asset_path = os.path.join(self.assets_dir, FSM_ASSET_NAME)
+            if write_json(fsm_data, asset_path, compact=self.compact):
+                print(f"已同步到 {asset_path}")
+            # 指纹索引、定位表和分片记录的fsm_hash对应设备上的asset
+            fingerprints_path = os.path.join(self.assets_dir, PAGE_FINGERPRINTS_NAME)
+            if write_json(build_page_fingerprints(asset_path, self.ui_map_output), fingerprints_path, compact=True):
+                print(f"已更新页面指纹索引 {fingerprints_path}")
+            locators_path = os.path.join(self.assets_dir, VIEW_LOCATORS_NAME)
+            if write_json(build_view_locators(asset_path, self.ui_map_output, [self.src_dir]), locators_path, compact=True):
+                print(f"已更新View定位表 {locators_path}")
+            bundle_dir = os.path.join(self.assets_dir, FSM_BUNDLE_DIR)
+            if write_bundle(asset_path, bundle_dir)[1]:
+                print(f"已更新分片资源 {bundle_dir}")
+        return True
+
+class InotifyNotifier:
+    """通过libc的inotify接口等待目录树中的文件变化"""
+
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.add_watches()
+
+    def add_watches(self):
+        """为目录树中的每个目录添加监听；已监听的目录重复添加不会产生新的watch"""
+        for root, _, _ in os.walk(self.directory):
+            self.libc.inotify_add_watch(self.fd, os.fsencode(root), self.WATCH_MASK)
+
+    def wait(self, timeout=None):
+        """
+        等待文件变化
+
+        Args:
+            timeout (float): 超时时间（秒），None表示一直等待
+
+        Returns:
+            bool: 超时前是否有变化
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # 读空事件队列，具体变化由stat对比得出
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+def create_notifier(directory):
+    """Linux下返回InotifyNotifier，不可用时返回None（使用stat轮询）"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return InotifyNotifier(directory)
+    except (OSError, AttributeError):
+        return None
+
+def watch(builder, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    首次完整构建后持续监听源码目录，变化时增量重建
+
+    Args:
+        builder (IncrementalBuilder): 构建器
+        debounce (float): 合并连续保存的静默时间（秒）
+        poll_interval (float): 无inotify时的轮询间隔（秒）
+    """
+    start = time.perf_counter()
+    builder.update()
+    builder.build()
+    print(f"首次构建完成，耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    notifier = create_notifier(builder.src_dir)
+    print(f"正在监听 {builder.src_dir}（{'inotify' if notifier else 'stat轮询'}），按Ctrl+C退出")
+    try:
+        while True:
+            # 等待第一个变化
+            if notifier:
+                notifier.wait()
+            else:
+                while not builder.has_changes():
+                    time.sleep(poll_interval)
+            # 防抖：直到debounce时间内没有新的变化
+            if notifier:
+                while notifier.wait(debounce):
+                    pass
+            else:
+                time.sleep(debounce)
+
+            start = time.perf_counter()
+            changed = builder.update()
+            if notifier:
+                notifier.add_watches()
+            if not changed:
+                continue
+            print(f"\n检测到 {len(changed)} 个文件变化: {', '.join(os.path.basename(path) for path in changed)}")
+            if builder.build():
+                print(f"增量重建完成，耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n已停止监听")
+    finally:
+        if notifier:
+            notifier.close()
@@ -0,0 +1,32 @@
+"""
+测试共用的夹具
+"""
+
+import json
+
+import pytest
+
+from map.fsm.enhance_fsm_transition import enhance_fsm_transition
+from map.fsm.ui_map_to_fsm import UIMapToFSM
+
+
+@pytest.fixture
+def write_ui_map(tmp_path):
+    """把页面列表写成ui_map.json，返回文件路径"""
+    def write(pages, name='ui_map.json'):
+        path = tmp_path / name
+        path.write_text(json.dumps({'pages': pages}, ensure_ascii=False, indent=2), encoding='utf-8')
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def write_fsm(tmp_path, write_ui_map):
+    """把页面列表转换为增强后的fsm_transition.json，返回(FSM文件路径, FSM)"""
+    def write(pages, infer_back_targets=False):
+        ui_map_path = write_ui_map(pages)
+        fsm_path = str(tmp_path / 'fsm_transition.json')
+        fsm = UIMapToFSM(ui_map_path, infer_back_targets=infer_back_targets).convert()
+        fsm = enhance_fsm_transition(fsm_path, ui_map_path, fsm_data=fsm)
+        return fsm_path, fsm
+    return write
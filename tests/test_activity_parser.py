@@ -0,0 +1,118 @@
+"""
+类体范围扫描（user-047）：随机生成带干扰代码的Kotlin源文件，与生成时记录的类体范围对比
+"""
+
+import random
+import re
+
+import pytest
+
+from map.parser.activity_parser import build_class_index, page_source, parse_page_classes
+
+# (类头模板, 父类型)；{name}处填类名
+HEADERS = [
+    ('class {name} : AppCompatActivity() {{', ['AppCompatActivity']),
+    ('class {name}(val onDone: () -> Unit = {{}}) : Fragment() {{', ['Fragment']),
+    ('class {name}<T : Any>(private val item: T) : Base<T>(), Callback {{', ['Base', 'Callback']),
+    ('private inner class {name} : RecyclerView.Adapter<Holder>() {{', ['Adapter']),
+    ('object {name} : Runnable {{', ['Runnable']),
+    ('interface {name} {{', []),
+    ('enum class {name} {{\n    RED, GREEN;', []),
+    ('class {name}(val listener: Any = object : Runnable {{ override fun run() {{}} }}) : Fragment() {{', ['Fragment']),
+]
+
+# 含有花括号、关键字或引号的干扰代码，都不是类声明
+NOISE = [
+    'val text = "class Fake { fun x() }"',
+    'val template = "${ if (ready) { "}" } else "{" } class Nope {"',
+    '/* class InComment { /* nested */ } */',
+    '// class LineComment {',
+    "val open = '{'",
+    "val close = '}'",
+    "val quote = '\\''",
+    'val raw = """class Raw { "quoted" }"""',
+    'val target = DetailActivity::class.java',
+    'fun handler() { listOf(1, 2).map { it * 2 }.forEach { println("}") } }',
+    'private val runnable = object : Runnable { override fun run() { println("object X {") } }',
+    'companion object { const val TAG = "companion" }',
+    'data class Point(val x: Int, val y: Int)',
+    'val `class` = 1',
+    'init { binding.root.setOnClickListener { finish() } }',
+]
+
+
+class SourceBuilder:
+    def __init__(self, rng):
+        self.rng = rng
+        self.parts = []
+        self.length = 0
+        self.spans = []
+        self.markers = []  # (标记, 所属类下标)
+
+    def write(self, text):
+        self.parts.append(text)
+        self.length += len(text)
+
+    def noise(self, indent):
+        for _ in range(self.rng.randrange(3)):
+            self.write(f"{indent}{self.rng.choice(NOISE)}\n")
+
+    def declare(self, depth, parent):
+        header, supertypes = self.rng.choice(HEADERS)
+        name = f"Class{len(self.spans)}"
+        indent = '    ' * depth
+        header = header.format(name=name)
+        self.write(indent + header.split('\n')[0])
+        span_idx = len(self.spans)
+        span = {'name': name, 'supertypes': supertypes, 'start': self.length, 'end': None, 'parent': parent}
+        self.spans.append(span)
+        for line in header.split('\n')[1:]:
+            self.write('\n' + line)
+        self.write('\n')
+        marker = f"marker{span_idx}"
+        self.markers.append((marker, span_idx))
+        self.write(f"{indent}    val {marker} = 0\n")
+        for _ in range(self.rng.randrange(4 if depth < 3 else 1)):
+            self.noise(indent + '    ')
+            if self.rng.random() < 0.5:
+                self.declare(depth + 1, span_idx)
+        self.noise(indent + '    ')
+        self.write(indent)
+        span['end'] = self.length
+        self.write('}\n')
+
+    def build(self):
+        self.write('package com.example.app\n\nimport android.os.Bundle\n\n')
+        for _ in range(self.rng.randrange(1, 4)):
+            self.noise('')
+            self.declare(0, None)
+        self.noise('')
+        return ''.join(self.parts)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_class_spans_match_generated_source(seed):
+    builder = SourceBuilder(random.Random(seed))
+    content = builder.build()
+    assert build_class_index(content) == builder.spans
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_page_source_owns_exactly_its_markers(seed):
+    builder = SourceBuilder(random.Random(seed))
+    content = builder.build()
+    spans = builder.spans
+
+    def owner(span_idx):
+        while span_idx is not None and spans[span_idx]['supertypes'][:1] not in (['AppCompatActivity'], ['Fragment']):
+            span_idx = spans[span_idx]['parent']
+        return span_idx
+
+    pages = parse_page_classes(content, 'Generated.kt')
+    page_spans = [idx for idx in range(len(spans)) if owner(idx) == idx]
+    assert [info['pageId'] for info, _ in pages] == [spans[idx]['name'] for idx in page_spans]
+    for (_, source), span_idx in zip(pages, page_spans):
+        assert source == page_source(content, build_class_index(content), span_idx)
+        assert set(re.findall(r'\bmarker\d+\b', source)) == {
+            marker for marker, marker_owner in builder.markers if owner(marker_owner) == span_idx
+        }
@@ -0,0 +1,77 @@
+"""
+FSM资源分片（user-042）：分片还原后与原FSM一致，距离表与逐对BFS一致
+"""
+
+import os
+from collections import deque
+
+import pytest
+
+from map.fsm.state_space import pages_to_bitmask
+from map.generator.asset_bundler import (SHARD_DIR, assemble_fsm, build_bundle, load_bundle_index, load_page_shard,
+                                         write_bundle)
+from map.utils.json_output import file_hash, write_json
+from ui_maps import random_pages
+
+
+def bfs_distance(fsm, start, target):
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        page_idx = queue.popleft()
+        for next_pages in fsm['transition'].get(str(page_idx), {}).values():
+            for next_page_idx in next_pages:
+                if next_page_idx not in distance:
+                    distance[next_page_idx] = distance[page_idx] + 1
+                    queue.append(next_page_idx)
+    return distance.get(target, -1)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_bundle_round_trip(write_fsm, tmp_path, seed):
+    fsm_path, fsm = write_fsm(random_pages(seed))
+    bundle_dir = str(tmp_path / 'assets' / 'fsm')
+    shard_count, written = write_bundle(fsm_path, bundle_dir)
+    assert shard_count == len(fsm['page_index']) and written == shard_count + 1
+
+    assembled = assemble_fsm(bundle_dir)
+    page_count = len(fsm['page_index'])
+    assert assembled['transition'] == {str(p): fsm['transition'].get(str(p), {}) for p in range(page_count)}
+    used_actions = {action_id for actions in fsm['transition'].values() for action_id in actions}
+    assert assembled['action_metadata'] == {
+        action_id: meta for action_id, meta in fsm['action_metadata'].items() if action_id in used_actions
+    }
+    for key in ('page_index', 'action_index', 'visible_text_index'):
+        assert assembled[key] == fsm[key]
+
+    index = load_bundle_index(bundle_dir)
+    assert index['fsm_hash'] == file_hash(fsm_path)
+    for from_idx in range(page_count):
+        for to_idx in range(page_count):
+            assert index['distance'][from_idx][to_idx] == bfs_distance(fsm, from_idx, to_idx)
+    for action_id, page_idx in index['action_page'].items():
+        assert fsm['page_index'][fsm['action_metadata'][action_id]['page']] == page_idx
+        if action_id in fsm['transition'].get(str(page_idx), {}):
+            assert action_id in load_page_shard(bundle_dir, index, page_idx)['action_metadata']
+
+
+def test_rewrite_skips_unchanged_and_removes_stale_shards(write_fsm, tmp_path):
+    fsm_path, fsm = write_fsm(random_pages(0))
+    bundle_dir = str(tmp_path / 'bundle')
+    write_bundle(fsm_path, bundle_dir)
+    stale = os.path.join(bundle_dir, SHARD_DIR, 'RemovedActivity.json')
+    write_json({}, stale)
+
+    assert write_bundle(fsm_path, bundle_dir) == (len(fsm['page_index']), 0)
+    assert not os.path.exists(stale)
+
+
+def test_bitmask_encoding_rejected(write_fsm):
+    _, fsm = write_fsm(random_pages(0))
+    fsm['transition_encoding'] = 'bitmask'
+    fsm['transition'] = {
+        page_idx: {action_id: pages_to_bitmask(next_pages) for action_id, next_pages in actions.items()}
+        for page_idx, actions in fsm['transition'].items()
+    }
+    with pytest.raises(ValueError):
+        build_bundle(fsm)
@@ -0,0 +1,70 @@
+"""
+BACK转换推断（user-026）：与按导航边直接计算的返回目标对比
+"""
+
+from collections import deque
+
+import pytest
+
+from map.fsm.ui_map_to_fsm import UIMapToFSM
+from ui_maps import back, component, navigate, page, random_pages
+
+
+def brute_force_back_targets(pages, back_stack_depth=None):
+    """pageId -> 可能位于其下方的页面：所有跳转到它的页面（可选按入口BFS深度过滤）"""
+    page_ids = {p['pageId'] for p in pages}
+    edges = {(p['pageId'], t['effect']['targetPageId'])
+             for p in pages for c in p['components'] for t in c['triggers']
+             if t['effect'].get('targetPageId') in page_ids}
+    depth = {p['pageId']: 1 for p in pages if p.get('entryPoint')}
+    queue = deque(depth)
+    while queue:
+        source = queue.popleft()
+        for edge_source, target in sorted(edges):
+            if edge_source == source and target not in depth:
+                depth[target] = depth[source] + 1
+                queue.append(target)
+    targets = {}
+    for page_id in page_ids:
+        targets[page_id] = {
+            source for source, target in edges
+            if target == page_id and (back_stack_depth is None or depth.get(source, back_stack_depth) < back_stack_depth)
+        }
+    return targets
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('back_stack_depth', [None, 2, 3])
+def test_back_transitions_match_reverse_navigation_graph(write_ui_map, seed, back_stack_depth):
+    pages = random_pages(seed)
+    fsm = UIMapToFSM(write_ui_map(pages), infer_back_targets=True, back_stack_depth=back_stack_depth).convert()
+    expected = brute_force_back_targets(pages, back_stack_depth)
+
+    checked = 0
+    for p in pages:
+        page_idx = fsm['page_index'][p['pageId']]
+        for c in p['components']:
+            trigger = c['triggers'][0]
+            if trigger['effect'].get('navigationRole') != 'BACK':
+                continue
+            action_id = fsm['action_index'][f"({c['componentId']}, {trigger['triggerType']})"]
+            # 同一动作在同一页面上只出现一次时，转换就是推断出的返回目标
+            if sum(other['componentId'] == c['componentId'] for other in p['components']) == 1:
+                next_pages = fsm['transition'][str(page_idx)][str(action_id)]
+                assert next_pages == sorted(fsm['page_index'][q] for q in expected[p['pageId']])
+                checked += 1
+    assert checked
+
+
+def test_back_without_inference_stays_empty(write_ui_map):
+    pages = [
+        page('MainActivity', [component('btnOpen', navigate('DetailActivity'))], entry=True),
+        page('DetailActivity', [component('btnBack', back())]),
+    ]
+    path = write_ui_map(pages)
+    plain = UIMapToFSM(path).convert()
+    inferred = UIMapToFSM(path, infer_back_targets=True).convert()
+    detail = str(plain['page_index']['DetailActivity'])
+    action = str(plain['action_index']['(btnBack, CLICK)'])
+    assert plain['transition'][detail][action] == []
+    assert inferred['transition'][detail][action] == [inferred['page_index']['MainActivity']]
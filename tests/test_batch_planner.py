@@ -0,0 +1,205 @@
+"""
+批量离线规划（user-035）：与逐个目标照搬Planner.plan（BFS）的实现对比
+"""
+
+import random
+from collections import deque
+
+import pytest
+
+from map.fsm.batch_planner import PlannerModel, plan, plan_batch
+from map.fsm.text_index import calculate_similarity
+from map.utils.json_output import write_json
+from ui_maps import VISIBLE_TEXTS, random_pages
+
+
+def kotlin_plan(fsm, start_page, target_visible_text):
+    """逐行对应Planner.plan（SearchStrategy.BFS），每个目标单独搜索"""
+    def actions(page_idx):
+        return [(int(a), list(t)) for a, t in fsm['transition'].get(str(page_idx), {}).items()]
+
+    def result(path=None, reason='NO_PATH_FOUND'):
+        if path is None:
+            return {'success': False, 'actionPath': [], 'reason': reason}
+        return {'success': True, 'actionPath': path, 'reason': None}
+
+    visible_text_index = fsm['visible_text_index']
+    target_actions = visible_text_index.get(target_visible_text)
+    if target_actions is None:
+        similar_text, highest = None, 0.7
+        for text in visible_text_index:
+            similarity = calculate_similarity(target_visible_text, text)
+            if similarity > highest:
+                similar_text, highest = text, similarity
+        if similar_text is not None:
+            target_actions = visible_text_index[similar_text]
+    if target_actions is None:
+        return result(reason='NO_TARGET_ACTION')
+
+    target_pages = {}
+    action_to_page = {}
+    for action_id in target_actions:
+        meta = fsm['action_metadata'].get(str(action_id))
+        if meta is not None and meta['page'] in fsm['page_index']:
+            target_pages[fsm['page_index'][meta['page']]] = None
+            action_to_page[action_id] = fsm['page_index'][meta['page']]
+    if not target_pages:
+        return result(reason='NO_TARGET_ACTION')
+    if start_page not in fsm['page_index']:
+        return result(reason='INVALID_START_PAGE')
+    start = fsm['page_index'][start_page]
+
+    def on_page(action_id, page_idx):
+        return action_id in target_actions and action_to_page.get(action_id) == page_idx
+
+    def expand(queue, visited, page_idx, path, action_id, to_pages):
+        if (page_idx, action_id) in visited:
+            return
+        visited.add((page_idx, action_id))
+        for to_page in to_pages or [page_idx]:
+            queue.append((to_page, path + [action_id]))
+
+    # enhancedBfs
+    queue, visited = deque([(start, [])]), set()
+    while queue:
+        page_idx, path = queue.popleft()
+        for action_id, to_pages in actions(page_idx):
+            if on_page(action_id, page_idx):
+                return result(path + [action_id])
+            expand(queue, visited, page_idx, path, action_id, to_pages)
+
+    def find_path_from_page(from_page, target_page, base_path):
+        if from_page == target_page:
+            return base_path
+        queue, seen = deque([(from_page, base_path)]), {from_page}
+        while queue:
+            page_idx, path = queue.popleft()
+            for action_id, to_pages in actions(page_idx):
+                if target_page in to_pages:
+                    return path + [action_id]
+                for to_page in to_pages:
+                    if to_page not in seen:
+                        seen.add(to_page)
+                        queue.append((to_page, path + [action_id]))
+        return None
+
+    def try_return_path(target_page):
+        main_page = fsm['page_index'].get('MainActivity')
+        if main_page is None:
+            return None
+        if start == main_page:
+            return find_path_from_page(main_page, target_page, [])
+        for steps in range(1, 11):
+            back = next((a for a, t in actions(start) if not t), None)
+            if back is not None:
+                path = find_path_from_page(main_page, target_page, [back] * steps)
+                if path is not None:
+                    return path
+        return None
+
+    def bfs_to_page(target_page):
+        queue, visited = deque([(start, [])]), set()
+        while queue:
+            page_idx, path = queue.popleft()
+            if page_idx == target_page:
+                return path
+            for action_id, to_pages in actions(page_idx):
+                if target_page in to_pages:
+                    return path + [action_id]
+                expand(queue, visited, page_idx, path, action_id, to_pages)
+        return try_return_path(target_page)
+
+    for target_page in target_pages:
+        path = bfs_to_page(target_page)
+        if path is not None:
+            for action_id, _ in actions(target_page):
+                if on_page(action_id, target_page):
+                    return result(path + [action_id])
+
+    # 原始bfs
+    queue, visited = deque([(start, [])]), set()
+    while queue:
+        page_idx, path = queue.popleft()
+        for action_id, to_pages in actions(page_idx):
+            if action_id in target_actions:
+                return result(path + [action_id])
+            expand(queue, visited, page_idx, path, action_id, to_pages)
+    return result()
+
+
+def goal_cases(fsm):
+    texts = [text for text in VISIBLE_TEXTS if text] + ['预约挂', 'Submitt', '不存在的按钮']
+    start_pages = list(fsm['page_index']) + ['UnknownActivity']
+    return [{'startPage': start_page, 'targetVisibleText': text} for start_page in start_pages for text in texts]
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('entry_page_id', ['MainActivity', 'HomeActivity'])
+def test_batch_matches_per_goal_planner(write_fsm, seed, entry_page_id):
+    fsm_path, fsm = write_fsm(random_pages(seed, entry_page_id=entry_page_id))
+    cases = goal_cases(fsm)
+    expected = [kotlin_plan(fsm, case['startPage'], case['targetVisibleText']) for case in cases]
+    assert plan_batch(fsm_path, cases, workers=1) == expected
+    assert any(result['success'] for result in expected)
+
+    model = PlannerModel(fsm)
+    for case, result in zip(cases[:20], expected):
+        assert plan(model, case['startPage'], case['targetVisibleText']) == result
+
+
+def test_process_pool_matches_serial(write_fsm):
+    fsm_path, fsm = write_fsm(random_pages(0, entry_page_id='MainActivity'))
+    cases = goal_cases(fsm)
+    assert plan_batch(fsm_path, cases, workers=2) == plan_batch(fsm_path, cases, workers=1)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_weighted_plan_has_minimum_cost(write_fsm, tmp_path, seed):
+    _, fsm = write_fsm(random_pages(seed, entry_page_id='MainActivity'))
+    rng = random.Random(seed)
+    fsm['transition_weights'] = {
+        page_idx: {action_id: rng.choice([0.5, 1, 2, 5]) for action_id in actions}
+        for page_idx, actions in fsm['transition'].items()
+    }
+    fsm_path = str(tmp_path / 'fsm_weighted.json')
+    write_json(fsm, fsm_path)
+    model = PlannerModel(fsm)
+
+    def weight(page_idx, action_id):
+        return fsm['transition_weights'][str(page_idx)][str(action_id)]
+
+    for start_page, start in fsm['page_index'].items():
+        # Bellman-Ford：到每个页面的最小代价
+        cost = {start: 0}
+        for _ in range(len(fsm['page_index'])):
+            for page_idx, page_cost in list(cost.items()):
+                for action_id, to_pages in fsm['transition'].get(str(page_idx), {}).items():
+                    for to_page in to_pages:
+                        new_cost = page_cost + weight(page_idx, action_id)
+                        if new_cost < cost.get(to_page, float('inf')):
+                            cost[to_page] = new_cost
+
+        for text in [text for text in VISIBLE_TEXTS if text]:
+            target_actions, target_pages = model.resolve_goal(text)
+            best = min((cost[page_idx] + weight(page_idx, action_id)
+                        for page_idx in target_pages if page_idx in cost
+                        for action_id in map(int, fsm['transition'].get(str(page_idx), {}))
+                        if action_id in target_actions and model.action_page.get(action_id) == page_idx),
+                       default=None)
+            result = plan_batch(fsm_path, [{'startPage': start_page, 'targetVisibleText': text}],
+                                workers=1, weighted=True)[0]
+            assert result['success'] == (best is not None)
+            if best is None:
+                continue
+            # 路径合法（沿路径可能到达的页面都执行得了下一个动作），且代价等于最小代价
+            reached = {start: 0}
+            for action_id in result['actionPath'][:-1]:
+                next_reached = {}
+                for page_idx, page_cost in reached.items():
+                    for to_page in fsm['transition'].get(str(page_idx), {}).get(str(action_id), []):
+                        next_cost = page_cost + weight(page_idx, action_id)
+                        next_reached[to_page] = min(next_cost, next_reached.get(to_page, next_cost))
+                reached = next_reached
+            last_action = result['actionPath'][-1]
+            assert min(page_cost + weight(page_idx, last_action) for page_idx, page_cost in reached.items()
+                       if str(last_action) in fsm['transition'].get(str(page_idx), {})) == pytest.approx(best)
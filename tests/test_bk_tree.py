@@ -0,0 +1,55 @@
+"""
+visibleText的BK树（user-032）：与对全部文本计算编辑距离的暴力结果对比
+"""
+
+import json
+import random
+
+import pytest
+
+from map.fsm.bk_tree import build_bk_tree, find_most_similar_text, search_bk_tree
+from map.fsm.text_index import calculate_similarity, levenshtein_distance
+
+ALPHABET = '预约挂号查询取消科室ab'
+
+
+def random_texts(rng, count):
+    return [''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(1, 8))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_search_matches_brute_force(seed):
+    rng = random.Random(seed)
+    texts = random_texts(rng, 60)
+    # 序列化后再读回，保证查询只依赖JSON中的内容
+    tree = json.loads(json.dumps(build_bk_tree(texts)))
+    assert sorted(tree['texts']) == sorted(set(texts))
+
+    for query in random_texts(rng, 15):
+        brute_force = sorted((levenshtein_distance(query, text), text) for text in set(texts))
+        for max_distance in range(4):
+            expected = [item for item in brute_force if item[0] <= max_distance]
+            assert search_bk_tree(tree, query, max_distance)[0] == expected
+            for k in (1, 3):
+                assert search_bk_tree(tree, query, max_distance, k)[0] == expected[:k]
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('threshold', [0.0, 0.5, 0.7])
+def test_most_similar_matches_linear_scan(seed, threshold):
+    rng = random.Random(seed)
+    texts = random_texts(rng, 60)
+    tree = build_bk_tree(texts)
+    for query in random_texts(rng, 15):
+        best = max(calculate_similarity(query, text) for text in texts)
+        match = find_most_similar_text(tree, query, threshold)
+        if best > threshold:
+            assert match is not None and calculate_similarity(query, match) == best
+        else:
+            assert match is None
+
+
+def test_empty_tree():
+    tree = build_bk_tree([])
+    assert search_bk_tree(tree, '预约', 3) == ([], 0)
+    assert find_most_similar_text(tree, '预约') is None
@@ -0,0 +1,91 @@
+"""
+可达性剪枝和SCC压缩（user-028）：与逐对BFS的暴力结果对比
+"""
+
+import random
+
+import pytest
+
+from map.fsm.fsm_analysis import (build_page_graph, condense, is_reachable, prune_fsm, reachable_pages,
+                                  strongly_connected_components)
+from map.fsm.state_space import pages_to_bitmask
+
+
+def random_fsm(seed, page_count=15, action_count=6, encoding='list'):
+    rng = random.Random(seed)
+    transition = {}
+    for p in range(page_count):
+        page_transitions = {}
+        for a in rng.sample(range(action_count), rng.randrange(action_count)):
+            next_pages = sorted(rng.sample(range(page_count), rng.choice([0, 1, 1, 2])))
+            page_transitions[str(a)] = pages_to_bitmask(next_pages) if encoding == 'bitmask' else next_pages
+        transition[str(p)] = page_transitions
+    fsm = {
+        'page_index': {f'Page{p}': p for p in range(page_count)},
+        'action_index': {f'(btn{a}, CLICK)': a for a in range(action_count)},
+        'transition': transition,
+    }
+    if encoding == 'bitmask':
+        fsm['transition_encoding'] = 'bitmask'
+    return fsm
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_components_match_mutual_reachability(seed):
+    graph = build_page_graph(random_fsm(seed))
+    reach = {p: reachable_pages(graph, p) for p in graph}
+    components = strongly_connected_components(graph)
+
+    assert sorted(p for members in components for p in members) == sorted(graph)
+    for members in components:
+        for p in graph:
+            mutual = p in reach[members[0]] and members[0] in reach[p]
+            assert mutual == (p in members)
+
+    # 反向拓扑序：组件之间的边总是指向更早的组件
+    position = {p: c for c, members in enumerate(components) for p in members}
+    for p, next_pages in graph.items():
+        for q in next_pages:
+            assert position[q] <= position[p]
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('encoding', ['list', 'bitmask'])
+def test_condensation_reachability_matches_bfs(seed, encoding):
+    fsm = random_fsm(seed, encoding=encoding)
+    graph = build_page_graph(fsm)
+    condensation = condense(fsm)
+    for p in graph:
+        reachable = reachable_pages(graph, p)
+        for q in graph:
+            assert is_reachable(condensation, p, q) == (q in reachable)
+
+
+def test_long_chain_does_not_recurse():
+    # 迭代实现：页面数远超递归深度上限也能完成
+    page_count = 5000
+    fsm = {
+        'page_index': {f'Page{p}': p for p in range(page_count)},
+        'action_index': {'(btnNext, CLICK)': 0},
+        'transition': {str(p): {'0': [(p + 1) % page_count]} for p in range(page_count)},
+    }
+    condensation = condense(fsm)
+    assert len(condensation['components']) == 1
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_prune_keeps_exactly_the_reachable_pages(seed):
+    fsm = random_fsm(seed)
+    graph = build_page_graph(fsm)
+    reachable = reachable_pages(graph, 0)
+    pruned = prune_fsm(fsm, 'Page0')
+
+    assert set(pruned['page_index']) == {f'Page{p}' for p in reachable}
+    new_to_old = {new: fsm['page_index'][page_id] for page_id, new in pruned['page_index'].items()}
+    old_action = {new: fsm['action_index'][key] for key, new in pruned['action_index'].items()}
+    for new_p, page_transitions in pruned['transition'].items():
+        old_p = new_to_old[int(new_p)]
+        for new_a, next_pages in page_transitions.items():
+            assert next_pages
+            original = fsm['transition'][str(old_p)][str(old_action[int(new_a)])]
+            assert sorted(new_to_old[q] for q in next_pages) == sorted(original)
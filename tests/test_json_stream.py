@@ -0,0 +1,84 @@
+"""
+流式JSON读取（user-029）：与json.load的结果对比，覆盖各种块边界
+"""
+
+import gzip
+import io
+import json
+import random
+
+import pytest
+
+from map.fsm.ui_map_to_fsm import UIMapToFSM
+from map.utils.json_stream import iter_json_array, iter_pages, load_pages
+from ui_maps import random_pages
+
+TRICKY_STRINGS = ['', 'a', '"', '\\', '\\"', '}', ']', ',', ':', '{"a": [1]}', '\n\t', '预约挂号',
+                  '\u0000\u001f', '😀', 'tail\\', 'null', 'true', '-1e5']
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(8 if depth < 4 else 4)
+    if kind == 0:
+        return rng.choice(TRICKY_STRINGS) + rng.choice(TRICKY_STRINGS)
+    if kind == 1:
+        return rng.choice([0, -1, 7, 10 ** 18, -123456789])
+    if kind == 2:
+        return rng.choice([0.5, -2.25, 1e-7, 3.0e10, -0.0])
+    if kind == 3:
+        return rng.choice([True, False, None])
+    if kind < 6:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {rng.choice(TRICKY_STRINGS) + str(k): random_value(rng, depth + 1) for k in range(rng.randrange(4))}
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 65536])
+def test_array_elements_match_json_loads(seed, chunk_size):
+    rng = random.Random(seed)
+    document = {
+        'before': random_value(rng),
+        'pages': [random_value(rng) for _ in range(rng.randrange(1, 6))],
+        'after': random_value(rng),
+    }
+    # 格式化和压缩两种输出，空白出现在不同的块边界上
+    for text in (json.dumps(document, ensure_ascii=False, indent=2),
+                 json.dumps(document, ensure_ascii=False, separators=(',', ':')),
+                 json.dumps(document)):
+        elements = list(iter_json_array(io.StringIO(text), ('pages',), chunk_size))
+        assert elements == json.loads(text)['pages']
+
+
+def test_nested_path_and_missing_key():
+    text = json.dumps({'meta': {'pages': 'ignored'}, 'data': {'items': [1, {'a': [2]}, 'x']}})
+    assert list(iter_json_array(io.StringIO(text), ('data', 'items'), 4)) == [1, {'a': [2]}, 'x']
+    assert list(iter_json_array(io.StringIO(text), ('missing',), 4)) == []
+
+
+def test_malformed_input_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"pages": [1, nope]}'), ('pages',)))
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"pages": [{"a": 1'), ('pages',)))
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_iter_pages_plain_and_gzip(write_ui_map, tmp_path, use_mmap):
+    pages = random_pages(3)
+    path = write_ui_map(pages)
+    assert list(iter_pages(path, use_mmap=use_mmap, chunk_size=5)) == pages
+
+    gzip_path = tmp_path / 'ui_map.json.gz'
+    with open(path, 'rb') as f:
+        gzip_path.write_bytes(gzip.compress(f.read()))
+    assert list(iter_pages(str(gzip_path), use_mmap=use_mmap)) == pages
+    assert list(load_pages(str(gzip_path))) == list(load_pages(str(gzip_path), streaming=True)) == pages
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_streaming_converter_matches_loaded(write_ui_map, seed):
+    path = write_ui_map(random_pages(seed))
+    for infer_back_targets in (False, True):
+        loaded = UIMapToFSM(path, infer_back_targets=infer_back_targets).convert()
+        streamed = UIMapToFSM(path, infer_back_targets=infer_back_targets, streaming=True).convert()
+        assert streamed == loaded
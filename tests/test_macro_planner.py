@@ -0,0 +1,130 @@
+"""
+多目标宏规划（user-037）：与枚举全部目标顺序的暴力结果对比
+"""
+
+import itertools
+import random
+
+import pytest
+
+from map.fsm.batch_planner import PlannerModel
+from map.fsm.macro_planner import DistanceTable, chain_precedence, solve_flow, target_candidates
+from ui_maps import VISIBLE_TEXTS, random_pages
+
+
+def weighted_fsm(fsm, seed):
+    rng = random.Random(seed)
+    fsm = dict(fsm)
+    fsm['transition_weights'] = {
+        page_idx: {action_id: rng.choice([0.5, 1, 2, 5]) for action_id in actions}
+        for page_idx, actions in fsm['transition'].items()
+    }
+    return fsm
+
+
+def all_distances(model, weighted):
+    """Bellman-Ford：每对页面之间的最小代价"""
+    def cost(page_idx, action_id):
+        return model.edge_weight(page_idx, action_id) if weighted else 1
+
+    distances = {}
+    for start in model.transition:
+        distance = {start: 0}
+        for _ in range(len(model.transition)):
+            for page_idx, page_cost in list(distance.items()):
+                for action_id, next_pages in model.transition.get(page_idx, ()):
+                    for next_page_idx in next_pages:
+                        if page_cost + cost(page_idx, action_id) < distance.get(next_page_idx, float('inf')):
+                            distance[next_page_idx] = page_cost + cost(page_idx, action_id)
+        distances[start] = distance
+    return distances, cost
+
+
+def brute_force_cost(distances, cost, start_page_idx, candidates, precedence):
+    """枚举满足先后约束的每个目标顺序、每个候选动作和每个可能的结果页面"""
+    best = None
+    for order in itertools.permutations(range(len(candidates))):
+        position = {target: k for k, target in enumerate(order)}
+        if any(position[before] > position[after] for before, after in precedence):
+            continue
+        states = {start_page_idx: 0}
+        for target in order:
+            next_states = {}
+            for page_idx, page_cost in states.items():
+                for action_id, target_page_idx, next_pages in candidates[target]:
+                    distance = distances[page_idx].get(target_page_idx)
+                    if distance is None:
+                        continue
+                    new_cost = page_cost + distance + cost(target_page_idx, action_id)
+                    for next_page_idx in next_pages:
+                        next_states[next_page_idx] = min(new_cost, next_states.get(next_page_idx, new_cost))
+            states = next_states
+        if states and (best is None or min(states.values()) < best):
+            best = min(states.values())
+    return best
+
+
+def executed_cost(model, cost, start_page_idx, solved, candidates):
+    """按解中的每一段实际执行，返回最小总代价；段不合法时断言失败"""
+    states = {start_page_idx: 0}
+    for target, segment in zip(solved['order'], solved['segments']):
+        *path, target_action = segment
+        for action_id in path:
+            next_states = {}
+            for page_idx, page_cost in states.items():
+                for next_page_idx in dict(model.transition.get(page_idx, ())).get(action_id, []):
+                    new_cost = page_cost + cost(page_idx, action_id)
+                    next_states[next_page_idx] = min(new_cost, next_states.get(next_page_idx, new_cost))
+            states = next_states
+        candidate = next(c for c in candidates[target] if c[0] == target_action)
+        assert candidate[1] in states
+        new_cost = states[candidate[1]] + cost(candidate[1], target_action)
+        states = {next_page_idx: new_cost for next_page_idx in candidate[2]}
+    return min(states.values())
+
+
+def random_precedence(rng, target_count):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return chain_precedence(target_count)
+    if kind == 1:
+        return []
+    return [[i, j] for i in range(target_count) for j in range(i + 1, target_count) if rng.random() < 0.3]
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('weighted', [False, True])
+def test_flow_cost_matches_brute_force(write_fsm, seed, weighted):
+    _, fsm = write_fsm(random_pages(seed, entry_page_id='MainActivity'))
+    model = PlannerModel(weighted_fsm(fsm, seed) if weighted else fsm)
+    table = DistanceTable(model, weighted)
+    rng = random.Random(seed)
+    texts = [text for text in VISIBLE_TEXTS if text and target_candidates(model, text)]
+    distances, cost = all_distances(model, weighted)
+
+    solved_count = 0
+    for _ in range(6):
+        targets = rng.sample(texts, min(len(texts), rng.randrange(1, 5)))
+        candidates = [target_candidates(model, text) for text in targets]
+        precedence = random_precedence(rng, len(targets))
+        for start_page_idx in model.transition:
+            expected = brute_force_cost(distances, cost, start_page_idx, candidates, precedence)
+            solved = solve_flow(table, start_page_idx, candidates, precedence)
+            if expected is None:
+                assert solved is None
+                continue
+            solved_count += 1
+            position = {target: k for k, target in enumerate(solved['order'])}
+            assert sorted(solved['order']) == list(range(len(targets)))
+            assert all(position[before] < position[after] for before, after in precedence)
+            assert solved['actionPath'] == [action_id for segment in solved['segments'] for action_id in segment]
+            assert executed_cost(model, cost, start_page_idx, solved, candidates) == pytest.approx(expected)
+    assert solved_count
+
+
+def test_too_many_targets_rejected(write_fsm):
+    _, fsm = write_fsm(random_pages(0))
+    model = PlannerModel(fsm)
+    candidates = [target_candidates(model, 'Login')] * 17
+    with pytest.raises(ValueError):
+        solve_flow(DistanceTable(model), 0, candidates, [])
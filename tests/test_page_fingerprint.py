@@ -0,0 +1,82 @@
+"""
+页面指纹（user-049）：对每个页面模拟探测，与按componentId集合直接比较的结果对比
+"""
+
+import itertools
+
+import pytest
+
+from map.fsm.page_fingerprint import (build_page_fingerprints, identify_page, identify_page_by_ids,
+                                      load_page_fingerprints, page_component_sets, select_probe_ids, verify_page)
+from map.utils.json_output import read_json, write_json
+from ui_maps import random_pages
+
+
+def fingerprint_pages(seed):
+    """随机页面，另外复制两个页面的组件（componentId集合相同，无法区分）"""
+    pages = random_pages(seed, page_count=16, components_per_page=4, shared_ids=5)
+    for i, source in enumerate(pages[1:3]):
+        pages.append(dict(source, pageId=f'Copy{i}Activity', entryPoint=False))
+    return pages
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('max_probes', [None, 2, 63])
+def test_every_page_identifies_itself(write_fsm, tmp_path, seed, max_probes):
+    fsm_path, fsm = write_fsm(fingerprint_pages(seed))
+    ui_map_path = str(tmp_path / 'ui_map.json')
+    index = build_page_fingerprints(fsm_path, ui_map_path, max_probes=max_probes)
+    id_sets = page_component_sets(fsm, ui_map_path)
+    page_ids = sorted(fsm['page_index'], key=fsm['page_index'].get)
+    if max_probes is not None:
+        assert len(index['probe_ids']) <= max_probes
+
+    for page_idx, component_ids in enumerate(id_sets):
+        same_set = [page_ids[other] for other, other_ids in enumerate(id_sets) if other_ids == component_ids]
+        probe = component_ids.__contains__
+        assert sorted(identify_page(index, probe)) == sorted(same_set)
+        assert sorted(identify_page_by_ids(index, component_ids)) == sorted(same_set)
+        assert sorted(index['pages'][str(page_idx)]['ambiguous_with']) == sorted(
+            fsm['page_index'][page_id] for page_id in same_set if page_id != page_ids[page_idx]
+        )
+        # 自己的探测全部通过，其他集合不同的页面至少有一个探测不通过
+        for other, other_ids in enumerate(id_sets):
+            assert verify_page(index, other, probe) == (other_ids == component_ids)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_probe_selection_is_greedy_and_complete(write_fsm, tmp_path, seed):
+    fsm_path, fsm = write_fsm(fingerprint_pages(seed))
+    classes = list(dict.fromkeys(page_component_sets(fsm, str(tmp_path / 'ui_map.json'))))
+    probe_ids = select_probe_ids(classes)
+
+    # 不限数量时所有类都被区分开
+    masks = {tuple(component_id in ids for component_id in probe_ids) for ids in classes}
+    assert len(masks) == len(classes)
+
+    # 每一步选择的id使仍未区分的类对被拆开的数量最多，平局取最小的id
+    all_ids = sorted(set().union(*classes))
+    for step, chosen in enumerate(probe_ids):
+        def split(component_id):
+            return sum(
+                1 for a, b in itertools.combinations(classes, 2)
+                if all((p in a) == (p in b) for p in probe_ids[:step]) and (component_id in a) != (component_id in b)
+            )
+        candidates = [component_id for component_id in all_ids if component_id not in probe_ids[:step]]
+        best = max(split(component_id) for component_id in candidates)
+        assert split(chosen) == best > 0
+        assert chosen == min(component_id for component_id in candidates if split(component_id) == best)
+
+
+def test_index_is_tied_to_its_fsm(write_fsm, tmp_path):
+    fsm_path, fsm = write_fsm(fingerprint_pages(0))
+    index_path = str(tmp_path / 'page_fingerprints.json')
+    assert load_page_fingerprints(index_path, fsm_path) is None
+
+    index = build_page_fingerprints(fsm_path, str(tmp_path / 'ui_map.json'))
+    write_json(index, index_path)
+    assert load_page_fingerprints(index_path, fsm_path) == read_json(index_path)
+
+    fsm['page_index']['ExtraActivity'] = len(fsm['page_index'])
+    write_json(fsm, fsm_path)
+    assert load_page_fingerprints(index_path, fsm_path) is None
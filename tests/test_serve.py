@@ -0,0 +1,141 @@
+"""
+FSM查询服务（user-040）：查询结果与直接计算的结果对比，协议层处理非法输入
+"""
+
+import asyncio
+import json
+from collections import deque
+
+import pytest
+
+from map.fsm.batch_planner import PlannerModel, plan
+from map.serve import MAX_LINE_BYTES, FsmServer, handle_query, load_snapshot
+from map.utils.json_output import file_hash, write_json
+from ui_maps import VISIBLE_TEXTS, random_pages
+
+
+def bfs_distances(fsm, start):
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        page_idx = queue.popleft()
+        for next_pages in fsm['transition'].get(str(page_idx), {}).values():
+            for next_page_idx in next_pages:
+                if next_page_idx not in distance:
+                    distance[next_page_idx] = distance[page_idx] + 1
+                    queue.append(next_page_idx)
+    return distance
+
+
+def follow(fsm, start, path):
+    """沿动作路径可能到达的页面集合"""
+    pages = {start}
+    for action_id in path:
+        pages = {q for p in pages for q in fsm['transition'].get(str(p), {}).get(str(action_id), [])}
+    return pages
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_queries_match_direct_computation(write_fsm, seed):
+    fsm_path, fsm = write_fsm(random_pages(seed, entry_page_id='MainActivity'))
+    snapshot = load_snapshot(fsm_path)
+    model = PlannerModel(fsm)
+    assert handle_query(snapshot, {'id': 1, 'op': 'version'}) == {'id': 1, 'result': file_hash(fsm_path)}
+
+    for from_page, from_idx in fsm['page_index'].items():
+        distance = bfs_distances(fsm, from_idx)
+        for to_page, to_idx in fsm['page_index'].items():
+            query = {'id': 'q', 'from': from_page, 'to': to_page}
+            reachable = handle_query(snapshot, dict(query, op='reachable'))['result']
+            path = handle_query(snapshot, dict(query, op='path'))['result']
+            next_hop = handle_query(snapshot, dict(query, op='next_hop'))['result']
+            assert reachable == (to_idx in distance)
+            if to_idx not in distance:
+                assert path is None and next_hop is None
+                continue
+            assert len(path) == distance[to_idx]
+            assert to_idx in follow(fsm, from_idx, path)
+            if path:
+                assert next_hop['actionId'] == path[0]
+                assert next_hop['pages'] == [to_page_id for to_page_id, idx in fsm['page_index'].items()
+                                             if idx in fsm['transition'][str(from_idx)][str(path[0])]]
+
+        for text in VISIBLE_TEXTS[:6]:
+            response = handle_query(snapshot, {'op': 'plan', 'startPage': from_page, 'targetVisibleText': text})
+            assert response['result'] == plan(model, from_page, text)
+
+
+def test_lookup_match_kinds(write_fsm):
+    fsm_path, fsm = write_fsm(random_pages(0))
+    snapshot = load_snapshot(fsm_path)
+    text = '预约挂号'
+    assert text in fsm['visible_text_index']
+    assert handle_query(snapshot, {'op': 'lookup', 'text': text})['result']['match'] == 'exact'
+    assert handle_query(snapshot, {'op': 'lookup', 'text': '預約掛號'})['result']['match'] == 'normalized'
+    assert handle_query(snapshot, {'op': 'lookup', 'text': 'yygh'})['result']['texts'] == [text]
+    assert handle_query(snapshot, {'op': 'lookup', 'text': '完全无关'})['result']['match'] is None
+
+
+def test_bad_queries_return_errors(write_fsm):
+    fsm_path, _ = write_fsm(random_pages(0))
+    snapshot = load_snapshot(fsm_path)
+    for query in ([1, 2], 'plan', None, {'id': 7, 'op': 'nope'}, {'id': 7, 'op': 'path', 'from': 'Page1Activity'},
+                  {'id': 7, 'op': 'path', 'from': 'NoSuchActivity', 'to': 'Page1Activity'}):
+        response = handle_query(snapshot, query)
+        assert 'error' in response and 'result' not in response
+
+
+def test_connection_protocol(write_fsm, tmp_path):
+    fsm_path, fsm = write_fsm(random_pages(0))
+    server = FsmServer(fsm_path, poll_interval=0.01)
+    socket_path = str(tmp_path / 'fsm.sock')
+    expected_plan = plan(PlannerModel(fsm), 'Page0Activity', 'Login')
+
+    async def exchange():
+        serving = asyncio.create_task(server.serve(unix_path=socket_path))
+        for _ in range(100):
+            if (tmp_path / 'fsm.sock').exists():
+                break
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        lines = [
+            b'{"id": 1, "op": "version"}\n',
+            b'\n',
+            b'{"id": 2, "op": \n',
+            b'\xff\xfe\n',
+            b'[1, 2]\n',
+            json.dumps({'id': 3, 'op': 'plan', 'startPage': 'Page0Activity',
+                        'targetVisibleText': 'Login'}).encode() + b'\n',
+        ]
+        responses = []
+        for line in lines:
+            writer.write(line)
+            await writer.drain()
+            if line.strip():
+                responses.append(json.loads(await reader.readline()))
+
+        # 热加载：文件内容变化后新查询使用新快照
+        fsm['page_index']['ExtraActivity'] = len(fsm['page_index'])
+        write_json(fsm, fsm_path)
+        for _ in range(200):
+            if server.snapshot.version == file_hash(fsm_path):
+                break
+            await asyncio.sleep(0.01)
+        writer.write(b'{"id": 4, "op": "version"}\n')
+        responses.append(json.loads(await reader.readline()))
+
+        # 超长请求行：回复错误并断开连接
+        writer.write(b'"' + b'x' * (MAX_LINE_BYTES + 10) + b'"\n')
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+        closed = await reader.read()
+        writer.close()
+        serving.cancel()
+        return responses, closed
+
+    responses, closed = asyncio.run(exchange())
+    assert responses[0]['id'] == 1 and 'result' in responses[0]
+    assert all('error' in response for response in responses[1:4])
+    assert responses[4]['id'] == 3 and responses[4]['result'] == expected_plan
+    assert responses[5] == {'id': 4, 'result': file_hash(fsm_path)}
+    assert 'error' in responses[6] and closed == b''
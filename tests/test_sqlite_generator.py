@@ -0,0 +1,83 @@
+"""
+SQLite导出（user-044）：可达性视图和距离表与BFS对比，表内容与JSON产物对比
+"""
+
+import os
+import sqlite3
+from collections import deque
+
+import pytest
+
+from map.fsm.state_space import pages_to_bitmask
+from map.generator.sqlite_generator import export_sqlite
+from map.utils.json_output import write_json
+from ui_maps import random_pages
+
+
+def bfs_distances(fsm, start):
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        page_idx = queue.popleft()
+        for next_pages in fsm['transition'].get(str(page_idx), {}).values():
+            for next_page_idx in next_pages:
+                if next_page_idx not in distance:
+                    distance[next_page_idx] = distance[page_idx] + 1
+                    queue.append(next_page_idx)
+    return distance
+
+
+def query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return set(conn.execute(sql).fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_reachability_and_distance_match_bfs(write_fsm, tmp_path, seed):
+    fsm_path, fsm = write_fsm(random_pages(seed, page_count=15))
+    db_path = str(tmp_path / 'ui_map.db')
+    counts = export_sqlite(str(tmp_path / 'ui_map.json'), fsm_path, db_path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    expected_distance = {
+        (from_idx, to_idx, depth)
+        for from_idx in fsm['page_index'].values()
+        for to_idx, depth in bfs_distances(fsm, from_idx).items()
+    }
+    assert query(db_path, "SELECT * FROM page_distance") == expected_distance
+    assert query(db_path, "SELECT * FROM reachable_pages") == {(f, t) for f, t, _ in expected_distance}
+    assert counts['page_distance'] == len(expected_distance)
+
+    expected_transitions = {
+        (int(page_idx), int(action_id), next_page_idx)
+        for page_idx, actions in fsm['transition'].items()
+        for action_id, next_pages in actions.items()
+        for next_page_idx in next_pages or [None]
+    }
+    assert query(db_path, "SELECT * FROM transitions") == expected_transitions
+    assert query(db_path, "SELECT text, action_id FROM text_entries") == {
+        (text, action_id) for text, action_ids in fsm['visible_text_index'].items() for action_id in action_ids
+    }
+    assert query(db_path, "SELECT page_idx, page_id FROM pages") == set(
+        (page_idx, page_id) for page_id, page_idx in fsm['page_index'].items()
+    )
+
+
+def test_bitmask_encoding_exports_same_rows(write_fsm, tmp_path):
+    fsm_path, fsm = write_fsm(random_pages(1))
+    ui_map_path = str(tmp_path / 'ui_map.json')
+    bitmask_fsm = dict(fsm, transition_encoding='bitmask', transition={
+        page_idx: {action_id: pages_to_bitmask(next_pages) for action_id, next_pages in actions.items()}
+        for page_idx, actions in fsm['transition'].items()
+    })
+    bitmask_path = str(tmp_path / 'fsm_bitmask.json')
+    write_json(bitmask_fsm, bitmask_path)
+
+    list_db = str(tmp_path / 'list.db')
+    bitmask_db = str(tmp_path / 'bitmask.db')
+    assert export_sqlite(ui_map_path, fsm_path, list_db) == export_sqlite(ui_map_path, bitmask_path, bitmask_db)
+    for table in ('transitions', 'page_distance', 'reachable_pages', 'actions'):
+        assert query(list_db, f"SELECT * FROM {table}") == query(bitmask_db, f"SELECT * FROM {table}")
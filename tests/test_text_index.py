@@ -0,0 +1,128 @@
+"""
+visibleText的n-gram倒排索引（user-031）和规范化key索引（user-034）：与对全部文本逐个计算的暴力结果对比
+"""
+
+import functools
+import random
+
+import pytest
+
+from map.fsm.text_index import (build_ngram_index, build_normalized_key_index, calculate_similarity, char_ngrams,
+                                find_most_similar_text, levenshtein_distance, lookup_normalized, query_candidates)
+from map.utils.pinyin_table import TRADITIONAL_TO_SIMPLIFIED
+from map.utils.text_normalize import normalized_keys, pinyin_initials, to_pinyin
+
+ALPHABET = '预约挂号查询取消科室医生ab'
+
+
+def random_texts(rng, count=40):
+    return [''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(1, 7))) for _ in range(count)]
+
+
+def mutate(rng, text):
+    """对文本做一次随机的插入、删除或替换"""
+    i = rng.randrange(len(text) + 1)
+    op = rng.randrange(3)
+    if op == 0 or not text:
+        return text[:i] + rng.choice(ALPHABET) + text[i:]
+    i = min(i, len(text) - 1)
+    if op == 1:
+        return text[:i] + text[i + 1:]
+    return text[:i] + rng.choice(ALPHABET) + text[i + 1:]
+
+
+def recursive_distance(s1, s2):
+    @functools.lru_cache(maxsize=None)
+    def distance(i, j):
+        if i == 0 or j == 0:
+            return i + j
+        return min(distance(i - 1, j) + 1, distance(i, j - 1) + 1,
+                   distance(i - 1, j - 1) + (s1[i - 1] != s2[j - 1]))
+    return distance(len(s1), len(s2))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_levenshtein_matches_recursive_definition(seed):
+    rng = random.Random(seed)
+    texts = random_texts(rng, 15)
+    for s1 in texts:
+        for s2 in texts:
+            assert levenshtein_distance(s1, s2) == recursive_distance(s1, s2)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('n', [1, 2, 3])
+def test_candidates_match_brute_force_dice(seed, n):
+    rng = random.Random(seed)
+    index = build_ngram_index(random_texts(rng), n)
+    for text_id, norm in enumerate(index['normalized']):
+        for gram in char_ngrams(norm, n):
+            assert text_id in index['postings'][gram]
+
+    for query in random_texts(rng, 20):
+        query_grams = char_ngrams(query, n)
+        expected = []
+        for text_id, norm in enumerate(index['normalized']):
+            grams = char_ngrams(norm, n)
+            if query_grams & grams:
+                expected.append((text_id, 2.0 * len(query_grams & grams) / (len(query_grams) + len(grams))))
+        expected.sort(key=lambda item: (-item[1], item[0]))
+        assert query_candidates(index, query, limit=len(index['texts'])) == expected
+        assert query_candidates(index, query) == expected[:8]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_most_similar_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    texts = [text for text in random_texts(rng) if len(text) >= 4]
+    index = build_ngram_index(texts)
+    for query in (mutate(rng, rng.choice(texts)) for _ in range(20)):
+        # Planner.findMostSimilarVisibleText：对每个文本计算相似度，取严格大于阈值的最大值
+        best = max(calculate_similarity(query, text) for text in texts)
+        match = find_most_similar_text(index, query, limit=len(index['texts']))
+        if best > 0.7:
+            assert match is not None and calculate_similarity(query, match) == best
+        else:
+            assert match is None
+
+
+def test_normalization_ignores_width_case_and_spaces():
+    index = build_ngram_index(['预约挂号', 'Submit'])
+    assert index['texts'][query_candidates(index, '预约 挂号')[0][0]] == '预约挂号'
+    assert index['texts'][query_candidates(index, 'ＳＵＢＭＩＴ')[0][0]] == 'Submit'
+
+
+SIMPLIFIED_TO_TRADITIONAL = {simplified: traditional for traditional, simplified in TRADITIONAL_TO_SIMPLIFIED.items()}
+
+
+def variants(text):
+    """同一标签的不同写法：繁体、全角、大写、插入空白、全拼、拼音首字母"""
+    folded = normalized_keys(text)['folded']
+    return [
+        ''.join(SIMPLIFIED_TO_TRADITIONAL.get(char, char) for char in text),
+        ''.join(chr(ord(char) + 0xFEE0) if '!' <= char <= '~' else char for char in text),
+        text.upper(),
+        ' '.join(text),
+        to_pinyin(folded),
+        pinyin_initials(folded),
+    ]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_normalized_lookup_matches_brute_force(seed):
+    rng = random.Random(seed)
+    labels = ['预约挂号', '取消预约', '确认', '返回', '检查报告', '缴费', 'Submit', 'OK', '医生诊室']
+    texts = rng.sample(labels, 6) + random_texts(rng, 20)
+    index = build_normalized_key_index(texts)
+
+    for query in random_texts(rng, 20) + [v for text in texts for v in variants(text)]:
+        expected = []
+        for key in normalized_keys(query).values():
+            expected = [text for text in sorted(set(texts)) if key in normalized_keys(text).values()]
+            if expected:
+                break
+        assert lookup_normalized(index, query) == expected
+
+    for text in texts:
+        for query in variants(text):
+            assert text in lookup_normalized(index, query)
@@ -0,0 +1,74 @@
+"""
+测试用UI地图的构造函数
+
+random_pages生成的页面覆盖页面跳转、返回、状态变化和界面交互四类效果，
+组件ID在页面之间部分共享，用于与暴力计算的结果对比。
+"""
+
+import random
+
+VISIBLE_TEXTS = ['预约挂号', '确认预约', '取消预约', '我的订单', '个人中心', '设置', '返回首页', '搜索医生',
+                 'Login', 'Submit', 'Next Step', '', '']
+
+
+def component(component_id, effect, visible_text='', trigger_type='CLICK'):
+    """UI地图中的组件，只有一个触发器"""
+    return {
+        'componentId': component_id,
+        'viewType': 'BUTTON',
+        'semanticRole': 'ACTION',
+        'visibleText': visible_text,
+        'intentTags': [component_id.lower()],
+        'triggers': [{'triggerType': trigger_type, 'effect': effect}],
+    }
+
+
+def navigate(target_page_id):
+    return {'effectType': 'NAVIGATION', 'targetPageId': target_page_id, 'navigationRole': 'FORWARD'}
+
+
+def back():
+    return {'effectType': 'NAVIGATION', 'navigationRole': 'BACK'}
+
+
+def state_change():
+    return {'effectType': 'STATE_CHANGE', 'stateKey': 'checked'}
+
+
+def page(page_id, components, entry=False):
+    return {'pageId': page_id, 'pageRole': 'DETAIL', 'components': components, 'entryPoint': entry}
+
+
+def random_pages(seed, page_count=12, components_per_page=5, shared_ids=6, entry_page_id='Page0Activity'):
+    """
+    随机UI地图页面：第一个页面（entry_page_id）为入口，每个页面若干组件，组件ID从页面私有ID和共享ID中抽取
+
+    Returns:
+        list: 页面列表
+    """
+    rng = random.Random(seed)
+    page_ids = [entry_page_id] + [f'Page{i}Activity' for i in range(1, page_count)]
+    pages = []
+    for i, page_id in enumerate(page_ids):
+        components = []
+        seen = set()
+        for k in range(components_per_page):
+            if rng.random() < 0.4:
+                component_id = f'btnShared{rng.randrange(shared_ids)}'
+            else:
+                component_id = f'btnPage{i}Item{k}'
+            if component_id in seen:
+                continue
+            seen.add(component_id)
+            roll = rng.random()
+            if roll < 0.5:
+                effect = navigate(rng.choice(page_ids))
+            elif roll < 0.65:
+                effect = back()
+            elif roll < 0.85:
+                effect = state_change()
+            else:
+                effect = {'effectType': 'UI_INTERACTION'}
+            components.append(component(component_id, effect, rng.choice(VISIBLE_TEXTS)))
+        pages.append(page(page_id, components, entry=(i == 0)))
+    return pages